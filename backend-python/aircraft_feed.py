@@ -0,0 +1,317 @@
+import threading  # Importuje threading pre beh pollera na pozadí
+import time  # Importuje time pre meranie času a plánovanie
+import logging  # Importuje logging pre logovanie
+import requests  # Importuje requests modul na vykonávanie HTTP požiadaviek
+import metrics  # Importuje metriky back-endu
+from collections import OrderedDict  # Importuje OrderedDict pre históriu posledných snímkov
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: aircraft_feed.py
+Poller na pozadí, ktorý udržiava jeden zdieľaný snímok aircraft.json pre všetky požiadavky,
+pri viacerých prijímačoch zlučuje ich dáta podľa hex kódu lietadla
+"""
+
+# Prijímače, z ktorých sa načítava aircraft.json (rovnaké ako v tabuľke 'sources' loggera)
+# Voliteľný kľúč 'timeout' nastaví časový limit požiadavky pre konkrétny prijímač
+sources = [
+    {"name": "your_skyaware_server", "url": 'http://your_skyaware_server/data/aircraft.json'},
+    # {"name": "second_receiver", "url": 'http://second_receiver/data/aircraft.json', "timeout": 2.0},
+]
+# Interval obnovy snímku v sekundách (SkyAware prepisuje aircraft.json každú sekundu)
+poll_interval = 1.0
+# Časový limit jednej HTTP požiadavky v sekundách
+request_timeout = 5.0
+# Vek snímku v sekundách, po ktorom sa snímok považuje za zastaraný
+stale_after = 15.0
+# Počet posledných verzií snímku, voči ktorým je možné počítať rozdiely
+history_size = 30
+
+# Zdieľaný snímok, nahrádza sa vždy celý (čitatelia ho nikdy nemenia)
+snapshot = {
+    "version": 0,  # Poradové číslo snímku, zvyšuje sa pri každej zmene obsahu
+    "data": None,  # Posledné prijaté dáta vo formáte aircraft.json
+    "etag": None,  # ETag poslednej odpovede pre podmienený GET
+    "last_modified": None,  # Last-Modified poslednej odpovede pre podmienený GET
+    "updated_at": None,  # Čas poslednej zmeny obsahu (time.time())
+    "checked_at": None,  # Čas posledného úspešného kontaktu so serverom
+    "error": None,  # Posledná chyba pri načítaní, None ak je všetko v poriadku
+    "sources": {}  # Stav jednotlivých prijímačov (počet lietadiel, čas kontaktu, chyba)
+}
+
+# Posledné dáta a stav podmieneného GET pre každý prijímač (meno -> dictionary)
+source_states = {}
+
+# História posledných verzií (verzia -> dáta) pre rozdielové odpovede
+history = OrderedDict()
+
+snapshot_lock = threading.Lock()
+# Podmienka, na ktorej čakajú odberatelia nových verzií snímku
+snapshot_changed = threading.Condition(snapshot_lock)
+# Zámok zabezpečí, že zlučovanie snímkov z viacerých prijímačov prebieha postupne
+merge_lock = threading.Lock()
+poller_threads = []
+stop_event = threading.Event()
+
+
+# Funkcia na získanie aktuálneho snímku bez sieťovej komunikácie
+def get_snapshot():
+    return snapshot
+
+
+# Funkcia na zistenie veku snímku v sekundách (None, ak ešte žiadny snímok nie je)
+def snapshot_age(current=None):
+    current = current or snapshot
+    if current["checked_at"] is None:
+        return None
+    return time.time() - current["checked_at"]
+
+
+# Funkcia na zistenie, či je snímok zastaraný alebo ešte neexistuje
+def is_stale(current=None):
+    age = snapshot_age(current)
+    return age is None or age > stale_after
+
+
+# Funkcia na získanie dát staršej verzie snímku z histórie (None, ak už v histórii nie je)
+def get_version_data(version):
+    with snapshot_lock:
+        return history.get(version)
+
+
+# Funkcia na čakanie na novú verziu snímku (vráti aktuálny snímok aj po uplynutí timeoutu)
+def wait_for_update(version, timeout=None):
+    with snapshot_changed:
+        snapshot_changed.wait_for(lambda: snapshot["version"] != version, timeout)
+        return snapshot
+
+
+# Funkcia na nahradenie zdieľaného snímku novou verziou
+def publish(**changes):
+    global snapshot
+    with snapshot_changed:
+        updated = dict(snapshot)
+        updated.update(changes)
+        if updated["version"] != snapshot["version"]:
+            history[updated["version"]] = updated["data"]
+            while len(history) > history_size:
+                history.popitem(last=False)
+            snapshot_changed.notify_all()
+        snapshot = updated
+    return updated
+
+
+# Polia, ktoré sa menia pri každom načítaní aj bez pohybu lietadla (pri porovnaní záznamov sa ignorujú)
+volatile_keys = frozenset(('seen', 'seen_pos', 'messages', 'rssi'))
+
+
+# Funkcia na porovnanie dvoch záznamov lietadla bez nestálych polí
+def aircraft_changed(previous, current):
+    if previous.keys() - volatile_keys != current.keys() - volatile_keys:
+        return True
+    return any(previous[key] != value for key, value in current.items() if key not in volatile_keys)
+
+
+# Funkcia na výpočet rozdielu medzi dvoma snímkami aircraft.json (podľa hex kódu lietadla)
+def snapshot_delta(old_data, new_data):
+    """
+    Rozdiel dvoch snímkov vo formáte aircraft.json
+    Lietadlo je zmenené, len ak sa zmenilo iné pole ako volatile_keys, pri nezmenených lietadlách
+    tak klient ponechá staršie hodnoty 'seen', 'seen_pos', 'messages' a 'rssi'
+    :param old_data: Predchádzajúci snímok, ktorý klient už má
+    :param new_data: Nový snímok
+    :return: Dictionary s kľúčmi 'now', 'added', 'changed' (celé záznamy lietadiel) a 'removed' (hex kódy)
+    """
+    old_aircraft = {ac.get('hex'): ac for ac in old_data.get("aircraft", [])}
+    added, changed = [], []
+    seen = set()
+    for ac in new_data.get("aircraft", []):
+        hex_code = ac.get('hex')
+        seen.add(hex_code)
+        previous = old_aircraft.get(hex_code)
+        if previous is None:
+            added.append(ac)
+        elif aircraft_changed(previous, ac):
+            changed.append(ac)
+    removed = [hex_code for hex_code in old_aircraft if hex_code not in seen]
+    return {
+        "now": new_data.get("now"),
+        "messages": new_data.get("messages"),
+        "added": added,
+        "changed": changed,
+        "removed": removed
+    }
+
+
+# Funkcia na výber najčerstvejšej polohy lietadla zo záznamov viacerých prijímačov
+def position_rank(ac, source_now):
+    has_position = 'lat' in ac and 'lon' in ac
+    seen_pos = ac.get('seen_pos', ac.get('seen'))
+    position_time = source_now - seen_pos if seen_pos is not None else float('-inf')
+    message_time = source_now - ac['seen'] if ac.get('seen') is not None else float('-inf')
+    return has_position, position_time, message_time
+
+
+# Funkcia na zlúčenie snímkov aircraft.json z viacerých prijímačov podľa hex kódu lietadla
+def merge_sources(datas):
+    """
+    Zlúčenie snímkov z viacerých prijímačov, pre každé lietadlo sa ponechá záznam s najčerstvejšou polohou
+    :param datas: Zoznam snímkov vo formáte aircraft.json
+    :return: Zlúčený snímok vo formáte aircraft.json, 'seen' a 'seen_pos' sú prepočítané na spoločný čas 'now'
+    """
+    if len(datas) == 1:
+        return datas[0]
+
+    now = max(data.get("now", 0) for data in datas)
+    best = {}
+    for data in datas:
+        source_now = data.get("now", now)
+        for ac in data.get("aircraft", []):
+            hex_code = ac.get('hex')
+            rank = position_rank(ac, source_now)
+            if hex_code not in best or rank > best[hex_code][0]:
+                best[hex_code] = (rank, ac, now - source_now)
+
+    aircraft = []
+    for _, ac, offset in best.values():
+        if offset:
+            # Časy od poslednej správy sa posunú na spoločný čas zlúčeného snímku
+            ac = dict(ac)
+            for key in ('seen', 'seen_pos'):
+                if ac.get(key) is not None:
+                    ac[key] = ac[key] + offset
+        aircraft.append(ac)
+
+    return {
+        "now": now,
+        "messages": sum(data.get("messages", 0) or 0 for data in datas),
+        "aircraft": aircraft
+    }
+
+
+# Funkcia na zlúčenie aktuálnych dát prijímačov a zverejnenie nového snímku
+def publish_merged(changed):
+    with merge_lock:
+        now = time.time()
+        fresh = [state for state in source_states.values()
+                 if state["data"] is not None and state["checked_at"] is not None
+                 and now - state["checked_at"] <= stale_after]
+        status = {name: {"aircraft": len((state["data"] or {}).get("aircraft", [])),
+                         "checked_at": state["checked_at"], "error": state["error"]}
+                  for name, state in source_states.items()}
+        checked = [state["checked_at"] for state in fresh]
+        errors = [f"{name}: {state['error']}" for name, state in source_states.items() if state["error"]]
+        error = "; ".join(errors) or None
+
+        if not fresh:
+            publish(error=error, sources=status)
+        elif changed:
+            publish(version=snapshot["version"] + 1, data=merge_sources([state["data"] for state in fresh]),
+                    updated_at=now, checked_at=max(checked), error=error, sources=status)
+        else:
+            publish(checked_at=max(checked), error=error, sources=status)
+
+
+# Funkcia na jedno načítanie aircraft.json z jedného prijímača s podmieneným GET
+def fetch_source(session, source, state):
+    headers = {}
+    if state["etag"]:
+        headers["If-None-Match"] = state["etag"]
+    if state["last_modified"]:
+        headers["If-Modified-Since"] = state["last_modified"]
+
+    labels = {"source": source["name"]}
+    try:
+        with metrics.Timer("aeroguardian_upstream_fetch_seconds", labels):
+            response = session.get(source["url"], headers=headers, timeout=source.get("timeout", request_timeout))
+    except requests.exceptions.RequestException as e:
+        state["error"] = str(e)
+        metrics.inc("aeroguardian_upstream_fetch_total", {**labels, "result": "error"})
+        logging.warning(f"Failed to fetch {source['url']}: {e}")
+        return False
+
+    if response.status_code == 304:
+        # Súbor sa nezmenil, stačí potvrdiť čerstvosť dát prijímača
+        state.update(checked_at=time.time(), error=None)
+        metrics.inc("aeroguardian_upstream_fetch_total", {**labels, "result": "not_modified"})
+        return False
+    if response.status_code != 200:
+        state["error"] = f"HTTP {response.status_code}"
+        metrics.inc("aeroguardian_upstream_fetch_total", {**labels, "result": "error"})
+        return False
+
+    try:
+        data = response.json()
+    except ValueError as e:
+        state["error"] = f"Invalid JSON: {e}"
+        metrics.inc("aeroguardian_upstream_fetch_total", {**labels, "result": "error"})
+        return False
+    metrics.inc("aeroguardian_upstream_fetch_total", {**labels, "result": "ok"})
+
+    # Ak server nepodporuje podmienený GET, rovnaký obsah sa nepovažuje za zmenu
+    changed = state["data"] is None or data.get("now") is None or data.get("now") != state["data"].get("now")
+    state.update(data=data, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"),
+                 checked_at=time.time(), error=None)
+    return changed
+
+
+# Slučka pollera jedného prijímača, plánuje požiadavky na absolútne časové značky
+def poll_loop(source, interval):
+    session = requests.Session()  # Session udržiava keep-alive spojenie s prijímačom
+    state = source_states[source["name"]]
+    next_tick = time.monotonic()
+    while not stop_event.is_set():
+        changed = fetch_source(session, source, state)
+        # Pomalý alebo nedostupný prijímač zdržiava len vlastnú slučku, zlúčený snímok zverejnia ostatné
+        publish_merged(changed)
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay < 0:
+            # Požiadavka trvala dlhšie ako interval, preskočí zmeškané značky
+            next_tick = time.monotonic()
+            delay = 0
+        stop_event.wait(delay)
+    session.close()
+
+
+# Funkcia na spustenie pollerov na pozadí, jeden pre každý prijímač (opakované volanie nič nerobí)
+def start_polling(feed_sources=None, interval=None):
+    global poller_threads
+    if any(thread.is_alive() for thread in poller_threads):
+        return poller_threads
+    stop_event.clear()
+
+    feed_sources = feed_sources or sources
+    source_states.clear()
+    poller_threads = []
+    for source in feed_sources:
+        source_states[source["name"]] = {"data": None, "etag": None, "last_modified": None,
+                                         "checked_at": None, "error": None}
+        thread = threading.Thread(target=poll_loop, args=(source, interval or poll_interval),
+                                  name=f"aircraft-feed-{source['name']}", daemon=True)
+        poller_threads.append(thread)
+    for thread in poller_threads:
+        thread.start()
+    return poller_threads
+
+
+# Funkcia na zastavenie pollerov
+def stop_polling():
+    stop_event.set()
+    for thread in poller_threads:
+        thread.join()
@@ -0,0 +1,254 @@
+import threading  # Importuje threading pre beh monitora na pozadí
+import time  # Importuje time pre časové značky udalostí
+import logging  # Importuje logging pre logovanie
+import itertools  # Importuje itertools pre generovanie identifikátorov zón
+from collections import deque  # Importuje deque pre ohraničenú frontu udalostí
+import aircraft_feed  # Importuje poller zdieľaného snímku aircraft.json
+import drone_store  # Importuje úložisko telemetrie dronov
+from check_breach import check_multiple_zone_violations, zone_parameters  # Importuje vlastné funkcie na kontrolu narušení zóny lietadlami
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: breach_monitor.py
+Monitor na pozadí, ktorý pri každom novom snímku vyhodnotí všetky registrované zóny
+a zmeny varovaní (nové, zrušené, eskalované) zverejní do fronty udalostí. Pri zastaranom snímku
+zverejní udalosť 'stale', aktívne varovania zruší a po obnovení dát ('resumed') vyhodnotí zóny odznova.
+"""
+
+# Maximálny počet udalostí, ktoré sa držia vo fronte
+events_size = 1000
+
+# Registrované zóny: identifikátor -> dictionary s kľúčmi 'zoneData' alebo 'drone_id' a 'settings'
+zones = {}
+# Stav vyhodnotenia zón: identifikátor -> {'params': parametre výpočtu, 'alerts': hex -> narušenie}
+zone_states = {}
+zones_lock = threading.Lock()
+zone_ids = itertools.count(1)
+
+# Fronta udalostí s poradovými číslami a podmienka na čakanie na nové udalosti
+events = deque(maxlen=events_size)
+events_changed = threading.Condition()
+event_sequence = itertools.count(1)
+
+monitor_thread = None
+stop_event = threading.Event()
+
+
+# Funkcia na registráciu zóny, stred je pevný ('zoneData') alebo sleduje dron ('drone_id')
+def register_zone(settings, zone_info=None, drone_id=None, zone_id=None):
+    """
+    Registrácia zóny do monitora
+    :param settings: Nastavenia zóny rovnako ako pri /check_breach
+    :param zone_info: Pevný stred zóny, dictionary s kľúčmi 'lat', 'lng'
+    :param drone_id: Identifikátor dronu, ktorého posledná poloha je stredom zóny
+    :param zone_id: Voliteľný identifikátor, existujúca zóna s rovnakým identifikátorom sa nahradí
+    :return: Identifikátor zóny
+    """
+    with zones_lock:
+        zone_id = str(zone_id) if zone_id is not None else str(next(zone_ids))
+        zones[zone_id] = {"zoneData": zone_info, "drone_id": drone_id, "settings": settings}
+    return zone_id
+
+
+# Funkcia na odregistrovanie zóny, jej aktívne varovania sa zverejnia ako zrušené
+def unregister_zone(zone_id):
+    with zones_lock:
+        removed = zones.pop(zone_id, None)
+        state = zone_states.pop(zone_id, None)
+    if state:
+        publish_events(zone_id, state["alerts"], {}, None)
+    return removed is not None
+
+
+# Funkcia na zoznam zón s ich aktuálnymi varovaniami
+def list_zones():
+    with zones_lock:
+        return {zone_id: {**zone, "alerts": list(zone_states.get(zone_id, {}).get("alerts", {}).values())}
+                for zone_id, zone in zones.items()}
+
+
+# Funkcia na získanie stredu zóny (pri zóne viazanej na dron jeho posledná poloha)
+def zone_center(zone):
+    if zone["drone_id"] is None:
+        return zone["zoneData"]
+    latest = drone_store.latest(zone["drone_id"])
+    if latest is None:
+        return None
+    return {"lat": latest["latitude"], "lng": latest["longitude"]}
+
+
+# Funkcia na zverejnenie zmien varovaní jednej zóny do fronty udalostí
+def publish_events(zone_id, previous, current, version):
+    new_events = []
+    for hex_code, breach in current.items():
+        before = previous.get(hex_code)
+        if before is None:
+            new_events.append(("new", hex_code, breach))
+        elif before[1] != breach[1] and breach[1] == 'Flight zone breach':
+            new_events.append(("escalated", hex_code, breach))
+    for hex_code, breach in previous.items():
+        if hex_code not in current:
+            new_events.append(("cleared", hex_code, breach))
+
+    if not new_events:
+        return
+    with events_changed:
+        for kind, hex_code, breach in new_events:
+            events.append({"seq": next(event_sequence), "time": time.time(), "version": version,
+                           "zone_id": zone_id, "type": kind, "hex": hex_code, "breach": breach})
+        events_changed.notify_all()
+
+
+# Funkcia na zverejnenie udalosti o stave snímku ('stale' alebo 'resumed'), nepatrí žiadnej zóne
+def publish_feed_event(kind, version):
+    with events_changed:
+        events.append({"seq": next(event_sequence), "time": time.time(), "version": version,
+                       "zone_id": None, "type": kind, "hex": None, "breach": None})
+        events_changed.notify_all()
+
+
+# Funkcia na pozastavenie varovaní pri zastaranom snímku (varovania sa zrušia, zóny sa potom vyhodnotia odznova)
+def suspend_alerts(version):
+    publish_feed_event("stale", version)
+    with zones_lock:
+        states = dict(zone_states)
+        zone_states.clear()
+    for zone_id, state in states.items():
+        publish_events(zone_id, state["alerts"], {}, version)
+
+
+# Funkcia na získanie udalostí s poradovým číslom väčším ako since (voliteľne čaká na nové)
+def get_events(since=0, timeout=None):
+    with events_changed:
+        if timeout:
+            events_changed.wait_for(lambda: events and events[-1]["seq"] > since, timeout)
+        return [event for event in events if event["seq"] > since]
+
+
+# Funkcia na prírastkové vyhodnotenie zón s nezmenenými parametrami
+def evaluate_incremental(zone_requests, previous_alerts, delta):
+    touched = {ac.get('hex') for ac in delta["added"]} | {ac.get('hex') for ac in delta["changed"]} \
+        | set(delta["removed"])
+    if not touched:
+        return previous_alerts
+
+    # Prepočítajú sa len pridané a zmenené lietadlá, výsledky nezmenených lietadiel sa prevezmú
+    moved = {"aircraft": delta["added"] + delta["changed"]}
+    zone_ids_list = list(zone_requests)
+    results = check_multiple_zone_violations([zone_requests[zone_id] for zone_id in zone_ids_list], moved)
+    updated = {}
+    for zone_id, result in zip(zone_ids_list, results):
+        alerts = {hex_code: breach for hex_code, breach in previous_alerts[zone_id].items()
+                  if hex_code not in touched}
+        for breach in result or []:
+            alerts[breach[0]] = breach
+        updated[zone_id] = alerts
+    return updated
+
+
+# Funkcia na vyhodnotenie všetkých registrovaných zón nad novým snímkom
+def evaluate_snapshot(snapshot, delta):
+    with zones_lock:
+        current_zones = dict(zones)
+        states = dict(zone_states)
+
+    full, incremental = {}, {}
+    params = {}
+    for zone_id, zone in current_zones.items():
+        center = zone_center(zone)
+        zone_request = {"zoneData": center, "settings": zone["settings"] or {}}
+        zone_params = zone_parameters(center, zone_request["settings"]) if center else None
+        params[zone_id] = zone_params
+        if zone_params is None:
+            continue
+        state = states.get(zone_id)
+        # Zóna s rovnakými parametrami sa vyhodnotí len nad zmenenými lietadlami
+        if delta is not None and state is not None and state["params"] == zone_params:
+            incremental[zone_id] = zone_request
+        else:
+            full[zone_id] = zone_request
+
+    alerts = {}
+    if full:
+        full_ids = list(full)
+        results = check_multiple_zone_violations([full[zone_id] for zone_id in full_ids], snapshot["data"],
+                                                 snapshot_id=snapshot["version"])
+        for zone_id, result in zip(full_ids, results):
+            alerts[zone_id] = {breach[0]: breach for breach in result or []}
+    if incremental:
+        alerts.update(evaluate_incremental(incremental, {zone_id: states[zone_id]["alerts"] for zone_id in incremental},
+                                           delta))
+
+    for zone_id in current_zones:
+        previous = states.get(zone_id, {}).get("alerts", {})
+        current = alerts.get(zone_id, {})
+        publish_events(zone_id, previous, current, snapshot["version"])
+        with zones_lock:
+            if zone_id in zones:
+                zone_states[zone_id] = {"params": params[zone_id], "alerts": current}
+
+
+# Hlavná slučka monitora, vyhodnocuje zóny pri každej novej verzii snímku
+def monitor_loop():
+    version = None
+    previous_data = None
+    stale = False
+    while not stop_event.is_set():
+        snapshot = aircraft_feed.wait_for_update(version, timeout=1.0)
+        # Zastaraný snímok sa nevyhodnocuje, varovania by inak zostali aktívne aj po výpadku zdroja
+        if snapshot["data"] is None or aircraft_feed.is_stale(snapshot):
+            if not stale:
+                stale = True
+                suspend_alerts(snapshot["version"])
+                previous_data = None
+            continue
+        if stale:
+            # Po obnovení sa aktuálny snímok vyhodnotí celý, aj keď sa jeho verzia nezmenila
+            stale = False
+            version = None
+            publish_feed_event("resumed", snapshot["version"])
+        if snapshot["version"] == version:
+            continue
+        version = snapshot["version"]
+        try:
+            delta = aircraft_feed.snapshot_delta(previous_data, snapshot["data"]) if previous_data else None
+            evaluate_snapshot(snapshot, delta)
+        except Exception as e:
+            logging.error(f"Breach monitor failed on snapshot {version}: {e}")
+            # Rozdiel voči ďalšiemu snímku by vynechal zmeny tohto snímku, ďalšie vyhodnotenie bude úplné
+            previous_data = None
+            continue
+        previous_data = snapshot["data"]
+
+
+# Funkcia na spustenie monitora na pozadí (opakované volanie nič nerobí)
+def start_monitor():
+    global monitor_thread
+    if monitor_thread is not None and monitor_thread.is_alive():
+        return monitor_thread
+    stop_event.clear()
+    monitor_thread = threading.Thread(target=monitor_loop, name="breach-monitor", daemon=True)
+    monitor_thread.start()
+    return monitor_thread
+
+
+# Funkcia na zastavenie monitora
+def stop_monitor():
+    stop_event.set()
+    if monitor_thread is not None:
+        monitor_thread.join()
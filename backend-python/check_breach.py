@@ -1,4 +1,10 @@
 from math import radians, sin, cos, sqrt, pi, atan2 # Použité matematické funkcie
+import numpy as np  # Importuje numpy pre vektorové výpočty nad všetkými lietadlami naraz
+import threading  # Importuje threading pre zámok nad cache snímkov a výsledkov
+import time  # Importuje time pre meranie času vyhodnotenia zón
+import logging  # Importuje logging pre logovanie neplatných zón
+import metrics  # Importuje metriky back-endu
+from collections import OrderedDict  # Importuje OrderedDict pre ohraničenú cache výsledkov
 
 """
 Technická univerzita v Košiciach
@@ -25,11 +31,22 @@ Funkcia na kontrolu narušenia zón s predpoveďou vývoja prevádzky
 # Bezpečný vertikálny odstup v metroch
 vertical_overhead = 500
 
+# Polomer Zeme v metroch
+earth_radius = 6371000
 
-# Funkcia na kontrolu narušení zóny lietadlami
-def check_aircraft_zone_violations(zone_info, settings, aircraft_data):
+# Počet výsledkov (snímok, zóna, nastavenia), ktoré sa držia v pamäti
+result_cache_size = 1024
+
+# Spracovaný posledný snímok a cache výsledkov kontroly zón
+snapshot_state_cache = {"snapshot_id": None, "state": None}
+result_cache = OrderedDict()
+cache_lock = threading.Lock()
+
+
+# Funkcia na kontrolu narušení zóny lietadlami (pôvodná skalárna implementácia, slúži ako referencia)
+def check_aircraft_zone_violations_scalar(zone_info, settings, aircraft_data):
     """
-    Funkcia na kontrolu narušení zóny lietadlami s predpoveďou vývoja prevádzky
+    Funkcia na kontrolu narušení zóny lietadlami s predpoveďou vývoja prevádzky, lietadlá spracúva po jednom
     :param zone_info: Informácie o zóne, dictionary s kľúčmi 'lat', 'lng'
     :param settings: Nastavenia zóny, dictionary s kľúčmi 'flightRange' a 'warningOverhead'
     :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
@@ -44,8 +61,8 @@ def check_aircraft_zone_violations(zone_info, settings, aircraft_data):
         warning_overhead = settings['flightRange'] + settings['warningOverhead'] * 2000  # WarningOverhead je v km, konvertuje na metre
         duration = settings['duration']
         altitude = settings['altitude']
-    except KeyError:
-        print("Key error")
+    except KeyError as e:
+        logging.debug(f"Zone is missing parameter {e}")
         return
 
     # Funkcia na konverziu lat/lon na súradnice x/y
@@ -93,9 +110,6 @@ def check_aircraft_zone_violations(zone_info, settings, aircraft_data):
                 return True, min(times) * duration * 60  # Konvertuje časový podiel na sekundy
         return False, None
 
-    # Získanie zoznamu najbližších lietadiel
-    # print(list_closest_aircraft(lat, lon, aircraft_data))
-
     violations = []  # Zoznam na uloženie narušení
     for ac in aircraft_data["aircraft"]:
         if 'lat' in ac and 'lon' in ac:
@@ -155,6 +169,497 @@ def check_aircraft_zone_violations(zone_info, settings, aircraft_data):
     return violations
 
 
+# Funkcia na extrahovanie zón a nastavení do jednotných parametrov výpočtu
+def zone_parameters(zone_info, settings):
+    """
+    Prevod informácií o zóne a nastavení na parametre výpočtu
+    :param zone_info: Informácie o zóne, dictionary s kľúčmi 'lat', 'lng'
+    :param settings: Nastavenia zóny, dictionary s kľúčmi 'flightRange', 'warningOverhead', 'duration', 'altitude'
+    :return: Dictionary s parametrami výpočtu, alebo None pri chýbajúcom kľúči
+    """
+    try:
+        return {
+            "lat": zone_info['lat'],
+            "lon": zone_info['lng'],
+            "flight_range": settings['flightRange'] * 2,
+            "warning_overhead": settings['flightRange'] + settings['warningOverhead'] * 2000,  # WarningOverhead je v km
+            "duration": settings['duration'],
+            "altitude": settings['altitude']
+        }
+    except KeyError as e:
+        # Neplatná zóna sa len započíta, výpis na stdout by blokoval spracovanie požiadavky
+        metrics.inc("aeroguardian_invalid_zones_total")
+        logging.debug(f"Zone is missing parameter {e}")
+        return None
+
+
+# Funkcia na zistenie, či je hodnota číslo použiteľné vo výpočte výšky
+def is_number(value):
+    return isinstance(value, (int, float))
+
+
+# Funkcia na prevod aircraft.json na polia numpy (jedno pole pre každú veličinu)
+def aircraft_arrays(aircraft_data):
+    """
+    Prevod zoznamu lietadiel na polia numpy s rovnakými náhradnými hodnotami ako skalárna implementácia,
+    veličiny nezávislé od zóny (jednotky, goniometrické funkcie) sú už prepočítané
+    :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
+    :return: Dictionary s poľami 'hex', 'lat', 'lon', 'speed_mps', 'cos_track', 'sin_track', 'cos_lat',
+            'altitude_m', 'vertical_speed' a 'alt_valid'
+    """
+    hexes, lats, lons, speeds, tracks, altitudes, rates, alt_valid = [], [], [], [], [], [], [], []
+
+    for ac in aircraft_data["aircraft"]:
+        if 'lat' not in ac or 'lon' not in ac:
+            continue
+
+        # Chýbajúca rýchlosť sa berie ako 1 uzol, hodnota None ako 0
+        speed = ac['gs'] if 'gs' in ac else 1
+        # Smer letu s náhradou nav_heading, mag_heading a nakoniec 0
+        if 'track' in ac:
+            track = ac['track']
+        elif 'nav_heading' in ac:
+            track = ac['nav_heading']
+        else:
+            track = ac.get('mag_heading', 0)
+        # Výška 'ground' alebo None znamená, že výšku nie je možné vyhodnotiť
+        altitude = ac.get('alt_baro', 0)
+        rate = ac.get('baro_rate', 0)
+        valid = is_number(altitude) and is_number(rate)
+
+        hexes.append(ac.get('hex'))
+        lats.append(ac['lat'])
+        lons.append(ac['lon'])
+        speeds.append(0 if speed is None else speed)
+        tracks.append(track)
+        altitudes.append(altitude if valid else 0)
+        rates.append(rate if valid else 0)
+        alt_valid.append(valid)
+
+    lat = np.array(lats, dtype=np.float64)
+    track_rad = np.radians(np.array(tracks, dtype=np.float64))
+    return {
+        "hex": hexes,
+        "lat": lat,
+        "lon": np.array(lons, dtype=np.float64),
+        "speed_mps": np.array(speeds, dtype=np.float64) * 0.514444,  # Konverzia z uzlov na metre za sekundu
+        "cos_track": np.cos(track_rad),
+        "sin_track": np.sin(track_rad),
+        "cos_lat": np.cos(np.radians(lat)),
+        "altitude_m": np.array(altitudes, dtype=np.float64) * 0.3048,  # Konverzia z výšky v stopách na metre
+        "vertical_speed": np.array(rates, dtype=np.float64) * 0.3048 / 60,  # Vertikálna rýchlosť v m/s
+        "alt_valid": np.array(alt_valid, dtype=bool)
+    }
+
+
+# Funkcia na kontrolu prieniku úsečiek pohybu s kruhom a času do prieniku pre všetky lietadlá naraz
+def intersection_times(x0, y0, x1, y1, radius, duration):
+    """
+    Vektorová verzia kontroly prieniku so stredom kruhu v počiatku súradníc
+    :return: Pole príznakov prieniku, pole príznakov 'už vo vnútri' a pole časov do prieniku v sekundách
+    """
+    inside = x0 ** 2 + y0 ** 2 <= radius ** 2
+    dx = x1 - x0
+    dy = y1 - y0
+    a = dx * dx + dy * dy
+    b = 2 * (x0 * dx + y0 * dy)
+    c = (x0 * x0 + y0 * y0) - radius * radius
+    discriminant = b * b - 4 * a * c
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant_sqrt = np.sqrt(discriminant)
+        t1 = (-b - discriminant_sqrt) / (2 * a)
+        t2 = (-b + discriminant_sqrt) / (2 * a)
+    t1_valid = (t1 >= 0) & (t1 <= 1)
+    t2_valid = (t2 >= 0) & (t2 <= 1)
+
+    # Pri a > 0 platí t1 <= t2, takže platné t1 je vždy menší z časov
+    crossing = (a != 0) & (discriminant >= 0) & (t1_valid | t2_valid)
+    times = np.where(inside, 0.0, np.where(t1_valid, t1, t2) * duration * 60)
+    return inside | crossing, inside, times
+
+
+# Maximálny počet dvojíc lietadlo × zóna vyhodnotených v jednom bloku (obmedzuje pamäť medzivýsledkov)
+batch_cells = 1000000
+
+# Veľkosť bunky priestorového indexu v stupňoch
+grid_cell_size = 0.25
+
+
+# Funkcia na vytvorenie priestorového indexu (mriežky) nad poľami lietadiel
+def build_spatial_index(arrays, cell_size=grid_cell_size):
+    """
+    Rozdelenie lietadiel do buniek mriežky podľa zemepisnej šírky a dĺžky, vytvára sa raz pre snímok
+    :param arrays: Polia lietadiel z funkcie aircraft_arrays
+    :param cell_size: Veľkosť bunky v stupňoch
+    :return: Dictionary s bunkami (riadok, stĺpec) -> indexy lietadiel a maximálnou rýchlosťou v snímke
+    """
+    lat, lon = arrays["lat"], arrays["lon"]
+    indices = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+    rows = np.floor(lat[indices] / cell_size).astype(np.int64)
+    cols = np.floor(lon[indices] / cell_size).astype(np.int64)
+
+    # Zoradenie podľa bunky, indexy v rámci bunky ostávajú vzostupné
+    order = np.lexsort((indices, cols, rows))
+    indices, rows, cols = indices[order], rows[order], cols[order]
+    boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+    starts = np.concatenate(([0], boundaries)).tolist() if len(indices) else []
+    ends = np.concatenate((boundaries, [len(indices)])).tolist()
+
+    cells = {}
+    for start, end in zip(starts, ends):
+        cells[(int(rows[start]), int(cols[start]))] = indices[start:end]
+
+    speeds = np.abs(arrays["speed_mps"][indices])
+    return {
+        "cell_size": cell_size,
+        "cells": cells,
+        "max_speed_mps": float(speeds.max()) if len(speeds) else 0.0
+    }
+
+
+# Funkcia na výber kandidátov, ktoré môžu zónu dosiahnuť počas predikčnej doby
+def query_spatial_index(index, params):
+    """
+    Konzervatívny výber lietadiel podľa dosahu (maximálna rýchlosť × predikčná doba + polomer zóny)
+    :param index: Priestorový index z funkcie build_spatial_index
+    :param params: Parametre zóny z funkcie zone_parameters
+    :return: Vzostupne zoradené indexy kandidátov, alebo None ak sa obmedziť nedá
+    """
+    lat, lon = params["lat"], params["lon"]
+    radius = max(params["flight_range"], params["warning_overhead"])
+    travel = index["max_speed_mps"] * abs(params["duration"]) * 60
+    # Rezerva pokrýva zaokrúhľovacie chyby na hranici kruhu
+    margin = 1.001
+
+    # Severojužná zložka premietnutého posunu je presne travel
+    lat_reach = (radius + travel) * margin / earth_radius * (180 / pi)
+    max_abs_lat = abs(lat) + lat_reach
+    if max_abs_lat >= 89:
+        return None
+    # Východozápadná zložka sa premieta s pomerom cos(šírka zóny) / cos(šírka lietadla)
+    stretch = max(1.0, cos(radians(lat)) / cos(radians(max_abs_lat)))
+    lon_reach = (radius + travel * stretch) * margin / (earth_radius * cos(radians(lat))) * (180 / pi)
+
+    cell_size = index["cell_size"]
+    row_range = range(int(np.floor((lat - lat_reach) / cell_size)), int(np.floor((lat + lat_reach) / cell_size)) + 1)
+    col_range = range(int(np.floor((lon - lon_reach) / cell_size)), int(np.floor((lon + lon_reach) / cell_size)) + 1)
+
+    cells = index["cells"]
+    if len(row_range) * len(col_range) <= len(cells):
+        selected = [cells[key] for key in ((row, col) for row in row_range for col in col_range) if key in cells]
+    else:
+        selected = [indices for (row, col), indices in cells.items() if row in row_range and col in col_range]
+    if not selected:
+        return np.empty(0, dtype=np.int64)
+    return np.sort(np.concatenate(selected))
+
+
+# Funkcia na prípravu snímku na vyhodnocovanie zón (polia a priestorový index)
+def prepare_aircraft(aircraft_data):
+    arrays = aircraft_arrays(aircraft_data)
+    arrays["index"] = build_spatial_index(arrays)
+    return arrays
+
+
+# Funkcia na vektorové vyhodnotenie viacerých zón naraz nad poľami lietadiel
+def evaluate_zones(arrays, params_list):
+    """
+    Predikcia polohy, projekcia a kontrola prieniku pre všetky dvojice lietadlo × zóna naraz
+    :param arrays: Polia lietadiel z funkcie aircraft_arrays alebo prepare_aircraft
+    :param params_list: Zoznam parametrov zón z funkcie zone_parameters
+    :return: Zoznam zoznamov narušení (jeden pre každú zónu) vo formáte check_aircraft_zone_violations_scalar
+    """
+    results = [[] for _ in params_list]
+    all_indices = np.arange(len(arrays["hex"]))
+    index = arrays.get("index")
+
+    # Dvojice zóna × lietadlo, s priestorovým indexom len kandidáti v dosahu zóny
+    pair_zones, pair_aircraft = [], []
+    for z, params in enumerate(params_list):
+        candidates = query_spatial_index(index, params) if index is not None else None
+        if candidates is None:
+            candidates = all_indices
+        pair_zones.append(np.full(len(candidates), z, dtype=np.int64))
+        pair_aircraft.append(candidates)
+    if not params_list:
+        return results
+    pair_zones = np.concatenate(pair_zones)
+    pair_aircraft = np.concatenate(pair_aircraft)
+
+    # Dvojice sa spracúvajú po blokoch, aby medzivýsledky neprekročili batch_cells prvkov
+    for start in range(0, len(pair_zones), batch_cells):
+        evaluate_pairs(arrays, params_list, pair_zones[start:start + batch_cells],
+                       pair_aircraft[start:start + batch_cells], results)
+    return results
+
+
+# Funkcia na vyhodnotenie bloku dvojíc zóna × lietadlo, narušenia pridáva do results
+def evaluate_pairs(arrays, params_list, zones, aircraft, results):
+    def column(key):
+        return np.array([params[key] for params in params_list], dtype=np.float64)[zones]
+
+    lat, lon, duration = column("lat"), column("lon"), column("duration")
+    ac_lat, ac_lon = arrays["lat"][aircraft], arrays["lon"][aircraft]
+
+    # Predikcia budúcej polohy (rovnaká konvencia smeru ako predict_position)
+    speed_mps = arrays["speed_mps"][aircraft]
+    dx = speed_mps * duration * 60 * arrays["cos_track"][aircraft]
+    dy = speed_mps * duration * 60 * arrays["sin_track"][aircraft]
+    future_lat = ac_lat + (dy / earth_radius) * (180 / pi)
+    future_lon = ac_lon + (dx / (earth_radius * arrays["cos_lat"][aircraft])) * (180 / pi)
+
+    # Projekcia na lokálne súradnice x/y so stredom v zóne
+    cos_center = np.cos(np.radians(lat))
+    x0 = earth_radius * np.radians(ac_lon - lon) * cos_center
+    y0 = earth_radius * np.radians(ac_lat - lat)
+    x1 = earth_radius * np.radians(future_lon - lon) * cos_center
+    y1 = earth_radius * np.radians(future_lat - lat)
+
+    flight_breach, flight_inside, flight_time = intersection_times(x0, y0, x1, y1, column("flight_range"), duration)
+    warning_breach, warning_inside, warning_time = intersection_times(x0, y0, x1, y1, column("warning_overhead"),
+                                                                      duration)
+
+    # Výšková podmienka, lietadlá s nevyhodnotiteľnou výškou sa hlásia vždy s výškou 0
+    alt_valid = arrays["alt_valid"][aircraft]
+    current_altitude = arrays["altitude_m"][aircraft]
+    future_altitude = current_altitude + (arrays["vertical_speed"][aircraft] * duration * 60)
+    limit = column("altitude") + vertical_overhead
+    altitude_match = ~alt_valid | (current_altitude <= limit) | ((0 <= future_altitude) & (future_altitude <= limit))
+
+    hexes = arrays["hex"]
+    for p in np.flatnonzero(altitude_match & (flight_breach | warning_breach)).tolist():
+        reported_altitude = float(future_altitude[p]) if alt_valid[p] else 0
+        hex_code = hexes[aircraft[p]]
+        if flight_breach[p]:
+            time_to_breach = 0 if flight_inside[p] else float(flight_time[p])
+            results[zones[p]].append((hex_code, 'Flight zone breach', reported_altitude, time_to_breach))
+        else:
+            time_to_breach = 0 if warning_inside[p] else float(warning_time[p])
+            results[zones[p]].append((hex_code, 'Warning zone proximity', reported_altitude, time_to_breach))
+
+
+# Funkcia na získanie spracovaného stavu snímku, pre každý snímok sa stav vytvorí len raz
+def snapshot_state(snapshot_id, aircraft_data):
+    """
+    Stav snímku v tvare polí (struct-of-arrays) s priestorovým indexom, uložený podľa identifikátora snímku
+    :param snapshot_id: Identifikátor snímku (verzia), None znamená snímok bez identifikátora
+    :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
+    :return: Polia lietadiel z funkcie prepare_aircraft
+    """
+    if snapshot_id is None:
+        return prepare_aircraft(aircraft_data or {"aircraft": []})
+    with cache_lock:
+        if snapshot_state_cache["snapshot_id"] != snapshot_id:
+            snapshot_state_cache["state"] = prepare_aircraft(aircraft_data or {"aircraft": []})
+            snapshot_state_cache["snapshot_id"] = snapshot_id
+        return snapshot_state_cache["state"]
+
+
+# Funkcia na vytvorenie kľúča cache z identifikátora snímku a parametrov zóny
+def result_key(snapshot_id, params):
+    key = (snapshot_id, params["lat"], params["lon"], params["flight_range"], params["warning_overhead"],
+           params["duration"], params["altitude"])
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+# Funkcia na vyhodnotenie zón s využitím cache výsledkov, počíta sa len to, čo v cache nie je
+def cached_evaluate_zones(snapshot_id, aircraft_data, params_list):
+    keys = [result_key(snapshot_id, params) if snapshot_id is not None else None for params in params_list]
+    results = [None] * len(params_list)
+    with cache_lock:
+        for i, key in enumerate(keys):
+            if key is not None and key in result_cache:
+                result_cache.move_to_end(key)
+                results[i] = result_cache[key]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if len(missing) < len(results):
+        metrics.inc("aeroguardian_breach_zones_total", {"cache": "hit"}, len(results) - len(missing))
+    if missing:
+        start = time.perf_counter()
+        state = snapshot_state(snapshot_id, aircraft_data)
+        evaluated = evaluate_zones(state, [params_list[i] for i in missing])
+        # Čas na jednu zónu pri dávkovom vyhodnotení (vrátane prípadného spracovania snímku)
+        metrics.observe("aeroguardian_breach_zone_seconds", (time.perf_counter() - start) / len(missing))
+        metrics.inc("aeroguardian_breach_zones_total", {"cache": "miss"}, len(missing))
+        with cache_lock:
+            for i, result in zip(missing, evaluated):
+                results[i] = result
+                if keys[i] is not None:
+                    result_cache[keys[i]] = result
+            while len(result_cache) > result_cache_size:
+                result_cache.popitem(last=False)
+    # Výsledky z cache sa vracajú ako kópie zoznamov, aby ich volajúci nemohol zmeniť
+    return [list(result) for result in results]
+
+
+# Funkcia na kontrolu narušení zóny lietadlami
+def check_aircraft_zone_violations(zone_info, settings, aircraft_data, snapshot_id=None):
+    """
+    Funkcia na kontrolu narušení zóny lietadlami s predpoveďou vývoja prevádzky, počíta nad všetkými lietadlami naraz
+    :param zone_info: Informácie o zóne, dictionary s kľúčmi 'lat', 'lng'
+    :param settings: Nastavenia zóny, dictionary s kľúčmi 'flightRange' a 'warningOverhead'
+    :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
+    :param snapshot_id: Voliteľný identifikátor snímku, s ním sa spracovaný snímok aj výsledky ukladajú do cache
+    :return: Zoznam narušení zón vo formáte 'hex kód lietadla', 'typ narušenia',
+            'budúca výška v metroch', 'čas do narušenia v sekundách'
+    """
+    params = zone_parameters(zone_info, settings)
+    if params is None:
+        return
+    return cached_evaluate_zones(snapshot_id, aircraft_data, [params])[0]
+
+
+# Funkcia na kontrolu narušení viacerých zón nad jedným snímkom
+def check_multiple_zone_violations(zones, aircraft_data, snapshot_id=None):
+    """
+    Dávková kontrola narušení, všetky zóny sa vyhodnotia v jednom prechode cez lietadlá
+    :param zones: Zoznam zón, každá ako dictionary s kľúčmi 'zoneData' a 'settings' (rovnako ako pri /check_breach)
+    :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
+    :param snapshot_id: Voliteľný identifikátor snímku, s ním sa spracovaný snímok aj výsledky ukladajú do cache
+    :return: Zoznam výsledkov v poradí zón, pre neplatnú zónu None, inak zoznam narušení
+    """
+    params_list = [zone_parameters(zone.get('zoneData') or {}, zone.get('settings') or {}) for zone in zones]
+    valid = [params for params in params_list if params is not None]
+    evaluated = iter(cached_evaluate_zones(snapshot_id, aircraft_data, valid))
+    return [None if params is None else next(evaluated) for params in params_list]
+
+
+# Predvolené predikčné horizonty v minútach pre výpočet najbližšieho priblíženia
+default_horizons = (1, 2, 5)
+
+
+# Funkcia na výpočet časového intervalu, počas ktorého je lietadlo vo vodorovnom kruhu s polomerom radius
+def circle_interval(x0, y0, vx, vy, radius):
+    """
+    Uzavretý tvar riešenia |p0 + v t| = radius pre priamočiary pohyb v lokálnych súradniciach zóny
+    :return: Polia časov vstupu a výstupu v sekundách (vstup je nan, ak lietadlo kruh nikdy nepretne)
+    """
+    a = vx * vx + vy * vy
+    b = x0 * vx + y0 * vy
+    c = x0 * x0 + y0 * y0 - radius * radius
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant_sqrt = np.sqrt(b * b - a * c)
+        t_in = (-b - discriminant_sqrt) / a
+        t_out = (-b + discriminant_sqrt) / a
+    # Stojace lietadlo je v kruhu stále alebo nikdy
+    standing = a == 0
+    t_in = np.where(standing, np.where(c <= 0, -np.inf, np.nan), t_in)
+    t_out = np.where(standing, np.where(c <= 0, np.inf, np.nan), t_out)
+    return t_in, t_out
+
+
+# Funkcia na výpočet najbližšieho priblíženia (CPA) a časov vstupu do zón pre viac horizontov naraz
+def closest_approach(arrays, params, horizons):
+    """
+    Vektorový výpočet najbližšieho priblíženia v 3D voči stredu zóny vo výške 'altitude' nad všetkými lietadlami
+    :param arrays: Polia lietadiel z funkcie aircraft_arrays alebo prepare_aircraft
+    :param params: Parametre zóny z funkcie zone_parameters
+    :param horizons: Predikčné horizonty v minútach
+    :return: Zoznam lietadiel, ktoré do varovnej zóny vstúpia v najdlhšom horizonte, zoradený podľa času vstupu
+    """
+    horizons = sorted(horizons)
+    index = arrays.get("index")
+    # Kandidáti sa vyberajú pre najdlhší horizont, kratšie horizonty sú jeho podmnožinou
+    candidates = query_spatial_index(index, {**params, "duration": horizons[-1]}) if index is not None else None
+    if candidates is None:
+        candidates = np.arange(len(arrays["hex"]))
+    if not len(candidates):
+        return []
+
+    # Poloha a rýchlosť v lokálnych súradniciach x/y so stredom v zóne (rovnaká konvencia smeru ako evaluate_pairs)
+    ac_lat, ac_lon = arrays["lat"][candidates], arrays["lon"][candidates]
+    cos_center = cos(radians(params["lat"]))
+    x0 = earth_radius * np.radians(ac_lon - params["lon"]) * cos_center
+    y0 = earth_radius * np.radians(ac_lat - params["lat"])
+    speed_mps = arrays["speed_mps"][candidates]
+    vx = speed_mps * arrays["cos_track"][candidates] * cos_center / arrays["cos_lat"][candidates]
+    vy = speed_mps * arrays["sin_track"][candidates]
+
+    # Výška voči výške zóny, lietadlá s nevyhodnotiteľnou výškou sa porovnávajú len vodorovne
+    alt_valid = arrays["alt_valid"][candidates]
+    altitude = arrays["altitude_m"][candidates]
+    vz = np.where(alt_valid, arrays["vertical_speed"][candidates], 0.0)
+    z0 = np.where(alt_valid, altitude - params["altitude"], 0.0)
+
+    # Čas najbližšieho priblíženia bez obmedzenia horizontu, minimum |p0 + v t|^2
+    a = vx * vx + vy * vy + vz * vz
+    b = x0 * vx + y0 * vy + z0 * vz
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_cpa = np.where(a > 0, -b / a, 0.0)
+
+    # Časový interval, keď je lietadlo pod hornou hranicou zóny (z <= limit)
+    limit = params["altitude"] + vertical_overhead
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_limit = (limit - altitude) / vz
+    below = altitude <= limit
+    z_lo = np.where(~alt_valid | (vz == 0), np.where(~alt_valid | below, -np.inf, np.inf),
+                    np.where(vz < 0, t_limit, -np.inf))
+    z_hi = np.where(~alt_valid | (vz == 0), np.where(~alt_valid | below, np.inf, -np.inf),
+                    np.where(vz > 0, t_limit, np.inf))
+
+    # Čas vstupu do valca zóny (vodorovný kruh × výškový interval), nan ak lietadlo do zóny nevstúpi
+    entries = {}
+    for name, radius in (("flight", params["flight_range"]), ("warning", params["warning_overhead"])):
+        t_in, t_out = circle_interval(x0, y0, vx, vy, radius)
+        start = np.maximum(np.maximum(t_in, z_lo), 0.0)
+        end = np.minimum(t_out, z_hi)
+        entries[name] = np.where(start <= end, start, np.nan)
+
+    horizon_seconds = np.array(horizons, dtype=np.float64) * 60
+    # Matica horizont × lietadlo, čas CPA sa orezáva na interval <0, horizont>
+    t_clipped = np.clip(t_cpa[None, :], 0, horizon_seconds[:, None])
+    separation = np.sqrt((x0 + vx * t_clipped) ** 2 + (y0 + vy * t_clipped) ** 2 + (z0 + vz * t_clipped) ** 2)
+
+    warning_entry = entries["warning"]
+    hexes = arrays["hex"]
+    output = []
+    for p in np.flatnonzero(warning_entry <= horizon_seconds[-1]).tolist():
+        # Časy vstupu nezávisia od horizontu, horizont len určuje, či sa vstup ešte stihne
+        flight_time = float(entries["flight"][p])
+        warning_time = float(warning_entry[p])
+        per_horizon = []
+        for h, horizon in enumerate(horizons):
+            per_horizon.append({
+                "horizon": horizon,
+                "min_separation": float(separation[h, p]),
+                "time_to_cpa": float(t_clipped[h, p]),
+                "flight_entry": flight_time if flight_time <= horizon_seconds[h] else None,
+                "warning_entry": warning_time if warning_time <= horizon_seconds[h] else None
+            })
+        output.append({
+            "hex": hexes[candidates[p]],
+            "altitude": float(altitude[p]) if alt_valid[p] else None,
+            "horizons": per_horizon
+        })
+    output.sort(key=lambda entry: entry["horizons"][-1]["warning_entry"])
+    return output
+
+
+# Funkcia na výpočet rizika priblíženia lietadiel k zóne pre viac predikčných horizontov v jednej požiadavke
+def check_aircraft_cpa(zone_info, settings, aircraft_data, horizons=None, snapshot_id=None):
+    """
+    Najbližšie priblíženie lietadiel k zóne a časy vstupu do letovej a varovnej zóny pre každý horizont
+    :param zone_info: Informácie o zóne, dictionary s kľúčmi 'lat', 'lng'
+    :param settings: Nastavenia zóny ako pri check_aircraft_zone_violations ('duration' sa nepoužíva)
+    :param aircraft_data: Prijaté dáta o letovej prevádzke vo formáte aircraft.json
+    :param horizons: Predikčné horizonty v minútach, predvolene default_horizons
+    :param snapshot_id: Voliteľný identifikátor snímku, s ním sa spracovaný snímok ukladá do cache
+    :return: Zoznam lietadiel s kľúčmi 'hex', 'altitude' (m) a 'horizons' (pre každý horizont 'min_separation' v m,
+            'time_to_cpa', 'flight_entry' a 'warning_entry' v sekundách, None ak lietadlo do zóny v horizonte nevstúpi)
+    """
+    params = zone_parameters(zone_info, {"duration": None, **(settings or {})})
+    if params is None:
+        return
+    horizons = horizons or default_horizons
+    return closest_approach(snapshot_state(snapshot_id, aircraft_data), params, horizons)
+
+
 # Funkcia na zobrazenie zoznamu najbližších lietadiel (nepoužívaná vo finálnej aplikácii)
 def list_closest_aircraft(lat, lon, aircraft_data):
     def haversine(lat1, lon1, lat2, lon2):
@@ -0,0 +1,197 @@
+import threading  # Importuje threading pre zámky jednotlivých dronov
+import time  # Importuje time pre časové značky vzoriek
+import numpy as np  # Importuje numpy pre polia kruhových bufferov
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: drone_store.py
+Úložisko telemetrie viacerých dronov, história každého dronu je v kruhovom bufferi pevnej veľkosti
+"""
+
+# Identifikátor dronu pre požiadavky bez 'drone_id' (pôvodný formát s jedným dronom)
+default_drone_id = 'default'
+# Počet vzoriek histórie uložených pre jeden dron
+history_capacity = 3600
+# Najväčší počet dronov v pamäti (každý má buffer history_capacity x 4 hodnôt, približne 115 kB)
+max_drones = 256
+# Čas v sekundách bez telemetrie, po ktorom sa dron uvoľní, ak treba miesto pre nový dron
+drone_expiry = 3600
+# Najdlhší povolený identifikátor dronu
+max_drone_id_length = 64
+
+# Stĺpce kruhového buffera
+columns = ('timestamp', 'latitude', 'longitude', 'altitude')
+
+# Registre dronov (identifikátor -> dictionary s bufferom) a zámok na ich vytváranie
+drones = {}
+registry_lock = threading.Lock()
+
+
+# Funkcia na validáciu dát prichádzajúcich z dronu
+# Bez kľúča 'drone_id' ide vzorka pôvodnému jedinému dronu, zadaný identifikátor nesmie byť null ani prázdny
+def validate_data(data):
+    required_fields = ['latitude', 'longitude', 'altitude']
+    if not isinstance(data, dict):
+        return False
+    if 'drone_id' in data:
+        drone_id = data['drone_id']
+        if isinstance(drone_id, bool) or not isinstance(drone_id, (str, int)):
+            return False
+        if not str(drone_id).strip() or len(str(drone_id)) > max_drone_id_length:
+            return False
+    for field in required_fields:
+        if field not in data or not isinstance(data[field], (float, int)):
+            return False
+    if 'timestamp' in data and not isinstance(data['timestamp'], (float, int)):
+        return False
+    return True
+
+
+# Funkcia na získanie identifikátora dronu zo vzorky
+def drone_id_of(data):
+    return str(data.get('drone_id', default_drone_id))
+
+
+# Funkcia na uvoľnenie dronov bez telemetrie dlhšej ako drone_expiry (volá sa pod registry_lock)
+def expire_drones(now):
+    for drone_id in [drone_id for drone_id, drone in drones.items() if now - drone["updated_at"] > drone_expiry]:
+        del drones[drone_id]
+
+
+# Funkcia na získanie (alebo vytvorenie) záznamu dronu (None, ak dron neexistuje alebo je register plný)
+def get_drone(drone_id, create=False):
+    drone_id = str(drone_id)
+    drone = drones.get(drone_id)
+    if drone is None and create:
+        with registry_lock:
+            drone = drones.get(drone_id)
+            if drone is None:
+                now = time.monotonic()
+                if len(drones) >= max_drones:
+                    expire_drones(now)
+                if len(drones) >= max_drones:
+                    return None
+                drone = {
+                    "lock": threading.Lock(),
+                    "buffer": np.zeros((history_capacity, len(columns)), dtype=np.float64),  # Alokuje sa raz
+                    "position": 0,  # Index, na ktorý sa zapíše ďalšia vzorka
+                    "count": 0,  # Počet platných vzoriek v bufferi
+                    "latest": None,  # Posledná prijatá vzorka v pôvodnom tvare
+                    "updated_at": now  # Čas poslednej telemetrie (time.monotonic) pre uvoľnenie nečinných dronov
+                }
+                drones[drone_id] = drone
+    return drone
+
+
+# Funkcia na zápis vzoriek jedného dronu do jeho kruhového buffera (jeden zámok na celú dávku)
+# Vráti False, ak je register dronov plný a nový dron sa nedá vytvoriť
+def write_samples(drone_id, samples, received_at):
+    drone = get_drone(drone_id, create=True)
+    if drone is None:
+        return False
+    with drone["lock"]:
+        buffer = drone["buffer"]
+        capacity = len(buffer)
+        for sample in samples:
+            row = buffer[drone["position"]]
+            row[0] = sample.get('timestamp', received_at)
+            row[1] = sample['latitude']
+            row[2] = sample['longitude']
+            row[3] = sample['altitude']
+            drone["position"] = (drone["position"] + 1) % capacity
+            drone["count"] = min(drone["count"] + 1, capacity)
+        drone["latest"] = samples[-1]
+        drone["updated_at"] = time.monotonic()
+    return True
+
+
+# Funkcia na uloženie jednej vzorky telemetrie
+def ingest(data):
+    """
+    Uloženie jednej vzorky telemetrie
+    :param data: Vzorka s kľúčmi 'latitude', 'longitude', 'altitude' a voliteľne 'drone_id', 'timestamp'
+    :return: True, ak bola vzorka platná a uložená
+    """
+    if not validate_data(data):
+        return False
+    return write_samples(drone_id_of(data), [data], time.time())
+
+
+# Funkcia na uloženie dávky vzoriek viacerých dronov
+def ingest_batch(samples):
+    """
+    Uloženie dávky vzoriek telemetrie, neplatné vzorky sa preskočia
+    :param samples: Zoznam vzoriek v rovnakom formáte ako pri funkcii ingest
+    :return: Dvojica (počet uložených vzoriek, indexy neplatných vzoriek a vzoriek nových dronov nad limit)
+    """
+    received_at = time.time()
+    grouped = {}
+    rejected = []
+    for i, sample in enumerate(samples):
+        if validate_data(sample):
+            grouped.setdefault(drone_id_of(sample), []).append((i, sample))
+        else:
+            rejected.append(i)
+
+    for drone_id, indexed in grouped.items():
+        if not write_samples(drone_id, [sample for _, sample in indexed], received_at):
+            rejected.extend(i for i, _ in indexed)
+    rejected.sort()
+    return len(samples) - len(rejected), rejected
+
+
+# Funkcia na získanie poslednej vzorky dronu (None, ak dron neexistuje)
+def latest(drone_id=default_drone_id):
+    drone = get_drone(drone_id)
+    return drone["latest"] if drone is not None else None
+
+
+# Funkcia na získanie histórie dronu v časovom okne
+def window(drone_id, since=None, until=None):
+    """
+    História polôh dronu zoradená podľa času
+    :param drone_id: Identifikátor dronu
+    :param since: Voliteľný začiatok okna (unixový čas, vrátane)
+    :param until: Voliteľný koniec okna (unixový čas, vrátane)
+    :return: Zoznam vzoriek ako dictionary s kľúčmi zo 'columns', alebo None ak dron neexistuje
+    """
+    drone = get_drone(drone_id)
+    if drone is None:
+        return None
+
+    with drone["lock"]:
+        count, position = drone["count"], drone["position"]
+        # Vzorky od najstaršej po najnovšiu (kópia, aby sa buffer mohol ďalej prepisovať)
+        if count == len(drone["buffer"]):
+            rows = np.roll(drone["buffer"], -position, axis=0)
+        else:
+            rows = drone["buffer"][:count].copy()
+
+    mask = np.ones(len(rows), dtype=bool)
+    if since is not None:
+        mask &= rows[:, 0] >= since
+    if until is not None:
+        mask &= rows[:, 0] <= until
+    rows = rows[mask]
+    rows = rows[np.argsort(rows[:, 0], kind='stable')]
+    return [dict(zip(columns, row)) for row in rows.tolist()]
+
+
+# Funkcia na zoznam dronov s ich poslednou vzorkou
+def all_latest():
+    return {drone_id: drone["latest"] for drone_id, drone in list(drones.items())}
@@ -0,0 +1,155 @@
+import sys  # Importuje sys pre cestu k modulu archívu loggera
+import threading  # Importuje threading pre beh prehrávania na pozadí
+import time  # Importuje time pre plánovanie prehrávania
+import json  # Importuje json modul na čítanie záznamov
+import logging  # Importuje logging pre logovanie
+from datetime import datetime, timedelta  # Importuje datetime a timedelta pre výber hodinových súborov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+import aircraft_feed  # Importuje poller zdieľaného snímku aircraft.json
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: feed_replay.py
+Prehrávanie zaznamenanej prevádzky zo záloh loggera (BASE_DIR/<YYYYMMDD>/aircraft_<HH>.json alebo .agc)
+namiesto živého prijímača, JSON súbory sa čítajú po riadkoch, stĺpcový archív po dávkach (archive.py loggera)
+"""
+
+# Adresár loggera s modulom archive.py na čítanie stĺpcového archívu .agc
+logger_directory = Path(__file__).resolve().parent.parent / 'utilities' / 'logger'
+
+replay_thread = None
+stop_event = threading.Event()
+
+
+# Funkcia na načítanie modulu archive.py loggera (len ak sa prehráva stĺpcový archív)
+def archive_module():
+    if str(logger_directory) not in sys.path:
+        sys.path.append(str(logger_directory))
+    import archive
+    return archive
+
+
+# Funkcia na výber hodinových súborov zálohy v časovom poradí
+def archive_files(base_dir, start=None, end=None):
+    """
+    Hodinové súbory zálohy loggera zoradené podľa času
+    :param base_dir: Základný adresár záloh (BASE_DIR loggera)
+    :param start: Voliteľný začiatok (datetime v lokálnom čase ako v loggeri)
+    :param end: Voliteľný koniec (datetime, bez hodiny začínajúcej v tomto čase)
+    :return: Generátor ciest k súborom
+    """
+    for day_dir in sorted(path for path in Path(base_dir).iterdir() if path.is_dir() and path.name.isdigit()):
+        for file in sorted(path for path in day_dir.glob('aircraft_*') if path.suffix in ('.json', '.agc')):
+            try:
+                hour = datetime.strptime(f"{day_dir.name}{file.stem.split('_')[-1]}", '%Y%m%d%H')
+            except ValueError:
+                continue
+            if start is not None and hour + timedelta(hours=1) <= start:
+                continue
+            if end is not None and hour >= end:
+                continue
+            yield file
+
+
+# Funkcia na postupné čítanie snímkov zo súborov zálohy (v pamäti je vždy len jeden riadok alebo jedna dávka)
+def read_snapshots(files, start=None, end=None):
+    start_ts = start.timestamp() if start is not None else None
+    end_ts = end.timestamp() if end is not None else None
+    for path in files:
+        if path.suffix == '.agc':
+            # Stĺpcový archív vynechá dávky mimo časového rozsahu bez dekompresie
+            yield from archive_module().read_snapshots(path, start=start, end=end)
+            continue
+        with open(path) as file:
+            for line_number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    # Posledný riadok môže byť neúplný, ak logger práve zapisoval
+                    logging.warning(f"Skipping invalid line {line_number} in {path}")
+                    continue
+                now = data.get("now")
+                if now is None or (start_ts is not None and now < start_ts) or (end_ts is not None and now >= end_ts):
+                    continue
+                yield data
+
+
+# Funkcia na zverejnenie jedného zaznamenaného snímku ako dát prijímača
+def publish_snapshot(data):
+    # Záznamy z rôznych prijímačov (source_id loggera) sa zlučujú rovnako ako živé prijímače
+    name = f"replay-{data.get('source_id', 'archive')}"
+    data = {key: value for key, value in data.items() if key != 'source_id'}
+    state = aircraft_feed.source_states.setdefault(name, {"data": None, "etag": None, "last_modified": None,
+                                                          "checked_at": None, "error": None})
+    changed = state["data"] is None or state["data"].get("now") != data.get("now")
+    state.update(data=data, checked_at=time.time(), error=None)
+    aircraft_feed.publish_merged(changed)
+
+
+# Slučka prehrávania, snímky sa plánujú na absolútne časy podľa ich 'now' a rýchlosti prehrávania
+def replay_loop(base_dir, speed, start, end, repeat):
+    while not stop_event.is_set():
+        first_now = None
+        wall_start = None
+        count = 0
+        for data in read_snapshots(archive_files(base_dir, start, end), start, end):
+            if speed:
+                if first_now is None:
+                    first_now, wall_start = data["now"], time.monotonic()
+                delay = wall_start + (data["now"] - first_now) / speed - time.monotonic()
+                if delay > 0 and stop_event.wait(delay):
+                    return
+            elif stop_event.is_set():
+                return
+            publish_snapshot(data)
+            count += 1
+        logging.info(f"Replay of {base_dir} finished after {count} snapshots")
+        if not repeat or count == 0:
+            return
+
+
+# Funkcia na spustenie prehrávania na pozadí namiesto pollera (opakované volanie nič nerobí)
+def start_replay(base_dir, speed=1.0, start=None, end=None, repeat=False):
+    """
+    Spustenie prehrávania záloh loggera ako zdroja snímku aircraft.json
+    :param base_dir: Základný adresár záloh (BASE_DIR loggera)
+    :param speed: Rýchlosť prehrávania (1.0 = reálny čas, N = N-krát rýchlejšie, 0 alebo None = čo najrýchlejšie)
+    :param start: Voliteľný začiatok prehrávaného úseku (datetime)
+    :param end: Voliteľný koniec prehrávaného úseku (datetime)
+    :param repeat: Po skončení prehrávať znova od začiatku
+    :return: Vlákno prehrávania
+    """
+    global replay_thread
+    if replay_thread is not None and replay_thread.is_alive():
+        return replay_thread
+    stop_event.clear()
+    aircraft_feed.source_states.clear()
+    replay_thread = threading.Thread(target=replay_loop, args=(base_dir, speed, start, end, repeat),
+                                     name="aircraft-feed-replay", daemon=True)
+    replay_thread.start()
+    return replay_thread
+
+
+# Funkcia na zastavenie prehrávania
+def stop_replay():
+    stop_event.set()
+    if replay_thread is not None:
+        replay_thread.join()
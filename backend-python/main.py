@@ -1,8 +1,17 @@
-from flask import Flask, request, jsonify, send_from_directory  # Importuje potrebné moduly a funkcie z Flask framework
+from flask import Flask, Response, request, jsonify, g  # Importuje potrebné moduly a funkcie z Flask framework
 from flask_cors import CORS, cross_origin  # Importuje modul Flask-CORS na povolenie CORS (Cross-Origin Resource Sharing)
-import requests  # Importuje requests modul na vykonávanie HTTP požiadaviek
-from check_breach import check_aircraft_zone_violations  # Importuje vlastnú funkciu na kontrolu narušení zóny lietadlami
-import os  # Importuje os modul na prácu so súborovým systémom
+from check_breach import check_aircraft_zone_violations, check_multiple_zone_violations, check_aircraft_cpa  # Importuje vlastné funkcie na kontrolu narušení zóny lietadlami
+import aircraft_feed  # Importuje poller zdieľaného snímku aircraft.json
+import tile_store  # Importuje úložisko heatmapových dlaždíc s cache
+import drone_store  # Importuje úložisko telemetrie dronov
+import breach_monitor  # Importuje monitor narušení zón na pozadí
+import feed_replay  # Importuje prehrávanie záloh loggera
+import metrics  # Importuje metriky back-endu
+import time  # Importuje time pre meranie latencie požiadaviek
+import threading  # Importuje threading pre zámok nad cache zakódovaných odpovedí
+import json  # Importuje json modul na serializáciu udalostí streamu
+import gzip  # Importuje gzip modul na kompresiu odpovedí
+from collections import OrderedDict  # Importuje OrderedDict pre cache zakódovaných odpovedí
 
 """
 Technická univerzita v Košiciach
@@ -34,98 +43,231 @@ CORS(app, resources={r"/data/*": {"origins": "*"}})
 # Nastav na False pri deploymente
 debug = True
 
-# Premenné na ukladanie najnovšej polohy dronu a dát o lietadlách
-latest_drone_location = {}
-aircraft_data = {}
+# Prehrávanie záloh loggera namiesto živého prijímača, None = živý prijímač
+# Príklad: {"base_dir": '/path/to/save/JSON/backups', "speed": 10.0} (speed 0 = čo najrýchlejšie)
+replay = None
 
+# Telemetriu dronov drží modul drone_store, dáta o lietadlách zdieľaný snímok v module aircraft_feed
 
-# Funkcia na validáciu dát prichádzajúcich z dronu
-def validate_data(data):
-    required_fields = ['latitude', 'longitude', 'altitude']
-    for field in required_fields:
-        if field not in data or not isinstance(data[field], (float, int)):
-            return False
-    return True
+# Interval v sekundách, po ktorom stream pošle keep-alive komentár, ak neprišiel nový snímok
+stream_keepalive = 15
+
+# Počet vlákien servera Waitress (predvolene len 4). Každý odberateľ /stream a každé čakanie /monitor/events
+# drží jedno vlákno po celý čas spojenia, preto musí počet vlákien pokryť očakávaný počet otvorených kariet
+# s rezervou pre /data, /check_breach a /drone_location. Pri veľkom počte klientov použite main_async.py.
+server_threads = 64
+
+# Minimálna veľkosť odpovede v bajtoch, od ktorej sa odpoveď komprimuje
+compress_min_size = 1024
+# Počet zakódovaných odpovedí /data (plných aj rozdielových), ktoré sa držia v pamäti
+encoded_cache_size = 64
+encoded_cache = OrderedDict()
+encoded_lock = threading.Lock()
+
+
+# Funkcia na spustenie zdroja snímku aircraft.json (poller živých prijímačov alebo prehrávanie záloh)
+def start_feed():
+    if replay:
+        feed_replay.start_replay(**replay)
+    else:
+        aircraft_feed.start_polling()
+
+
+# Funkcia na zber aktuálnych hodnôt metrík zo snímku, cache dlaždíc, dronov a monitora
+def backend_metrics():
+    snapshot = aircraft_feed.get_snapshot()
+    age = aircraft_feed.snapshot_age(snapshot)
+    if age is not None:
+        yield "aeroguardian_snapshot_age_seconds", None, age
+    yield "aeroguardian_snapshot_version", None, snapshot["version"]
+    yield "aeroguardian_aircraft", None, len((snapshot["data"] or {}).get("aircraft", []))
+    for name, status in snapshot["sources"].items():
+        yield "aeroguardian_source_aircraft", {"source": name}, status["aircraft"]
+
+    hits, misses = tile_store.cache_stats["hits"], tile_store.cache_stats["misses"]
+    yield "aeroguardian_tile_cache_requests_total", {"result": "hit"}, hits
+    yield "aeroguardian_tile_cache_requests_total", {"result": "miss"}, misses
+    yield "aeroguardian_tile_cache_hit_ratio", None, hits / (hits + misses) if hits + misses else None
+    yield "aeroguardian_tile_cache_bytes", None, tile_store.cache_bytes
+    yield "aeroguardian_drones", None, len(drone_store.drones)
+    yield "aeroguardian_monitor_zones", None, len(breach_monitor.zones)
+
+
+metrics.register_collector(backend_metrics)
+
+
+# Meranie latencie požiadaviek podľa cesty (pri streame čas do odoslania hlavičiek)
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request_latency(response):
+    if 'request_start' in g:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe("aeroguardian_request_seconds", time.perf_counter() - g.request_start,
+                        {"route": route, "method": request.method})
+    return response
+
+
+# Endpoint s metrikami vo formáte Prometheus
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
 # Endpoint na poskytovanie heatmapových dlaždíc
 @app.route('/heatmap/<string:included>/res_<int:resolution>/<int:height>/<int:z>/<int:x>/<int:y>.png')
 @cross_origin()
 def serve_tile(included, resolution, height, z, x, y):
-    # Definovanie základného adresára
-    base_folder = 'path/to/your/root/tiles/folder'
+    if included not in ('airport_included', 'airport_excluded'):
+        return "File not found", 404
 
-    # Vytvorenie relatívnej cesty správne s použitím lomiek
-    tile_path = f'{included}/res_{resolution}/{height}/{z}/{x}/{y}.png'
+    tile, etag = tile_store.get_tile(included, resolution, height, z, x, y)
+    if tile is None:
+        return "File not found", 404
 
-    # Kontrola, či súbor existuje (pre ladenie)
-    full_path = os.path.join(base_folder, tile_path)
-    if os.path.exists(full_path):
-        print("Súbor nájdený, pokus o poskytnutie:", full_path)
-        return send_from_directory(base_folder, tile_path)
+    # Dlaždice sa menia len pri pregenerovaní, prehliadač ich môže cachovať a overovať cez ETag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
     else:
-        print("Súbor nebol nájdený na ceste:", full_path)
-        return "File not found", 404
+        response = Response(tile, mimetype='image/png')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
 
 
-# Endpoint na prijímanie dát o polohe dronu
+# Endpoint na prijímanie dát o polohe dronu (voliteľný kľúč 'drone_id' pre viac dronov)
 @app.route('/drone_location', methods=['POST'])
 @cross_origin()
 def receive_drone_data():
-    global latest_drone_location
-
     if request.is_json:
         data = request.get_json()
-        print(data)
-        if validate_data(data):
-            latest_drone_location = data
+        if drone_store.ingest(data):
             return jsonify({"status": "success", "message": "Data received and validated"}), 200
         else:
-            return jsonify({"status": "error", "message": "Invalid data"}), 400
+            return jsonify({"status": "error", "message": "Invalid data or drone limit reached"}), 400
     else:
         return jsonify({"status": "error", "message": "Request must be JSON"}), 400
 
 
+# Endpoint na dávkový príjem telemetrie viacerých vzoriek a dronov v jednej požiadavke
+@app.route('/drone_location/batch', methods=['POST'])
+@cross_origin()
+def receive_drone_batch():
+    data = request.get_json(silent=True)
+    samples = data.get('samples') if isinstance(data, dict) else data
+    if not isinstance(samples, list):
+        return jsonify({"status": "error", "message": "Request must be a JSON list of samples"}), 400
+
+    accepted, rejected = drone_store.ingest_batch(samples)
+    status = 200 if not rejected else 207
+    return jsonify({"status": "success" if not rejected else "partial", "accepted": accepted,
+                    "rejected": rejected}), status
+
+
+# Funkcia na zakódovanie odpovede /data, každá kombinácia (since, verzia) sa serializuje a komprimuje len raz
+def encoded_data_payload(snapshot, since):
+    key = (since, snapshot["version"])
+    with encoded_lock:
+        if key in encoded_cache:
+            encoded_cache.move_to_end(key)
+            return encoded_cache[key]
+
+    previous = aircraft_feed.get_version_data(since) if since is not None else None
+    if since is None:
+        # Bez parametra since ostáva formát odpovede pôvodný aircraft.json
+        payload = snapshot["data"]
+    elif previous is None:
+        payload = {"version": snapshot["version"], "full": True, **snapshot["data"]}
+    else:
+        payload = {"version": snapshot["version"], "since": since, "full": False,
+                   **aircraft_feed.snapshot_delta(previous, snapshot["data"])}
+
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    compressed = gzip.compress(body, compresslevel=5) if len(body) >= compress_min_size else None
+
+    with encoded_lock:
+        encoded_cache[key] = (body, compressed)
+        while len(encoded_cache) > encoded_cache_size:
+            encoded_cache.popitem(last=False)
+    return body, compressed
+
+
+# Funkcia na overenie, či je snímok použiteľný (chybová odpoveď pri chýbajúcom alebo zastaranom snímku, inak None)
+# Kontrola narušení nad zastaranými dátami by ukazovala staré narušenia ako aktuálne a prázdny výsledok ako bezpečný stav
+def snapshot_error(snapshot):
+    if snapshot["data"] is None or aircraft_feed.is_stale(snapshot):
+        return {"error": "Nepodarilo sa načítať dáta", "detail": snapshot["error"]}
+    return None
+
+
 # Endpoint na získavanie dát o lietadlách
+# Voliteľný parameter since=<verzia> vráti len pridané, zmenené a odstránené lietadlá od danej verzie
 @app.route('/data')
 @cross_origin()
 def data():
-    global aircraft_data
-    url = 'http://your_skyaware_server/data/aircraft.json'
-    # url = 'local_path_to_aircraft.json'
+    # Dáta sa čítajú zo zdieľaného snímku, požiadavka nekomunikuje so SkyAware serverom
+    snapshot = aircraft_feed.get_snapshot()
+
+    error = snapshot_error(snapshot)
+    if error:
+        return jsonify(error), 503
+
+    since = request.args.get('since', type=int)
+    if since is None and 'since' in request.args:
+        since = 0  # Klient bez predchádzajúcej verzie dostane celý snímok s číslom verzie
+    etag = f'{snapshot["version"]}-{since}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body, compressed = encoded_data_payload(snapshot, since)
+        response = Response(body, mimetype='application/json')
+        if compressed is not None and 'gzip' in request.accept_encodings:
+            response.set_data(compressed)
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            aircraft_data = response.json()
-            return jsonify(aircraft_data)
-        else:
-            return jsonify({"error": "Nepodarilo sa načítať dáta"}), response.status_code
-    except requests.exceptions.RequestException as e:
-        return jsonify({"error": str(e)}), 500
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Snapshot-Version'] = str(snapshot["version"])
+    response.headers['X-Snapshot-Age'] = f"{aircraft_feed.snapshot_age(snapshot):.1f}"
+    return response
 
 
 # Endpoint na poskytovanie najnovších dát o polohe dronu
+# Parametre: drone_id (predvolene pôvodný jediný dron), since/until vrátia históriu v časovom okne
 @app.route('/drone_data')
 @cross_origin()
 def drone_data():
-    global latest_drone_location
-
-    print(latest_drone_location)
-
-    # Nová trasa na poskytovanie najnovšej polohy dronu pre vašu webovú aplikáciu.
-    if latest_drone_location:
-        return jsonify(latest_drone_location)
+    drone_id = request.args.get('drone_id', drone_store.default_drone_id)
+
+    if 'since' in request.args or 'until' in request.args:
+        samples = drone_store.window(drone_id, request.args.get('since', type=float),
+                                     request.args.get('until', type=float))
+        if samples is None:
+            return jsonify({"error": "Nie sú dostupné dáta o polohe dronu"}), 404
+        return jsonify({"drone_id": drone_id, "samples": samples})
+
+    latest = drone_store.latest(drone_id)
+    if latest:
+        return jsonify(latest)
     else:
         return jsonify({"error": "Nie sú dostupné dáta o polohe dronu"}), 404
 
 
+# Endpoint na zoznam dronov s ich poslednou polohou
+@app.route('/drones')
+@cross_origin()
+def drones():
+    return jsonify(drone_store.all_latest())
+
+
 # Endpoint na kontrolu narušení zóny
 @app.route('/check_breach', methods=['POST'])
 @cross_origin()
 def check_breach():
-    global aircraft_data
-
     data = request.get_json()
     zone_info = data.get('zoneData')
     settings = data.get('settings')
@@ -133,18 +275,176 @@ def check_breach():
     if not zone_info:
         return jsonify({"error": "Žiadna zóna nebola špecifikovaná"}), 404
 
-    print(zone_info)
-    output = check_aircraft_zone_violations(zone_info, settings, aircraft_data)
-    print(output)
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return jsonify(error), 503
+    output = check_aircraft_zone_violations(zone_info, settings, snapshot["data"], snapshot_id=snapshot["version"])
     return jsonify(output)
 
 
+# Endpoint na dávkovú kontrolu narušení viacerých zón nad jedným snímkom
+@app.route('/check_breach_batch', methods=['POST'])
+@cross_origin()
+def check_breach_batch():
+    data = request.get_json()
+    zones = data.get('zones') if isinstance(data, dict) else None
+
+    if not zones or not isinstance(zones, list):
+        return jsonify({"error": "Žiadna zóna nebola špecifikovaná"}), 404
+    if not all(isinstance(zone, dict) for zone in zones):
+        return jsonify({"error": "Neplatný formát zón"}), 400
+
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return jsonify(error), 503
+    results = check_multiple_zone_violations(zones, snapshot["data"], snapshot_id=snapshot["version"])
+
+    # Výsledky sa vracajú v poradí zón, s voliteľným identifikátorom zóny od klienta
+    return jsonify({
+        "version": snapshot["version"],
+        "results": [{"id": zone.get('id'), "breaches": result} for zone, result in zip(zones, results)]
+    })
+
+
+# Funkcia na načítanie predikčných horizontov z požiadavky (None pri neplatnom formáte)
+def parse_horizons(horizons):
+    if horizons is None:
+        return []
+    if not isinstance(horizons, list) or not all(isinstance(h, (int, float)) and h > 0 for h in horizons):
+        return None
+    return horizons
+
+
+# Endpoint na výpočet najbližšieho priblíženia lietadiel k zóne pre viac predikčných horizontov
+# Telo: {"zoneData", "settings", "horizons"?: [minúty]}, predvolené horizonty sú 1, 2 a 5 minút
+@app.route('/check_cpa', methods=['POST'])
+@cross_origin()
+def check_cpa():
+    data = request.get_json()
+    zone_info = data.get('zoneData') if isinstance(data, dict) else None
+    horizons = parse_horizons(data.get('horizons')) if isinstance(data, dict) else []
+
+    if not zone_info:
+        return jsonify({"error": "Žiadna zóna nebola špecifikovaná"}), 404
+    if horizons is None:
+        return jsonify({"error": "Neplatné predikčné horizonty"}), 400
+
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return jsonify(error), 503
+    output = check_aircraft_cpa(zone_info, data.get('settings'), snapshot["data"], horizons=horizons,
+                                snapshot_id=snapshot["version"])
+    return jsonify({"version": snapshot["version"], "aircraft": output})
+
+
+# Funkcia na naformátovanie jednej Server-Sent Events udalosti
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+# Generátor udalostí streamu pre jedného odberateľa
+def stream_events(zone_info, settings):
+    yield "retry: 3000\n\n"
+    sent_data = None
+    version = None
+
+    while True:
+        snapshot = aircraft_feed.wait_for_update(version, timeout=stream_keepalive)
+        if snapshot["version"] == version or snapshot["data"] is None:
+            if aircraft_feed.is_stale(snapshot):
+                yield sse_event('stale', {"version": snapshot["version"], "error": snapshot["error"]})
+            else:
+                yield ": keepalive\n\n"
+            continue
+        version = snapshot["version"]
+
+        # Prvý snímok sa posiela celý, ďalej už len rozdiel voči poslednému odoslanému
+        if sent_data is None:
+            yield sse_event('snapshot', {"version": version, **snapshot["data"]})
+        else:
+            yield sse_event('delta', {"version": version, **aircraft_feed.snapshot_delta(sent_data, snapshot["data"])})
+        sent_data = snapshot["data"]
+
+        if zone_info:
+            breaches = check_aircraft_zone_violations(zone_info, settings, snapshot["data"], snapshot_id=version)
+            yield sse_event('breaches', {"version": version, "breaches": breaches or []})
+
+
+# Endpoint na streamovanie zmien snímku a narušení zóny (Server-Sent Events)
+@app.route('/stream')
+@cross_origin()
+def stream():
+    # EventSource podporuje len GET, zóna a nastavenia prichádzajú ako JSON v parametroch
+    try:
+        zone_info = json.loads(request.args.get('zoneData', 'null'))
+        settings = json.loads(request.args.get('settings', 'null'))
+    except ValueError:
+        return jsonify({"error": "Neplatný formát zóny alebo nastavení"}), 400
+
+    if zone_info and not settings:
+        return jsonify({"error": "Chýbajú nastavenia zóny"}), 400
+
+    return Response(stream_events(zone_info, settings), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# Endpoint na registráciu zóny do monitora narušení na pozadí
+# Telo: {"id"?, "zoneData"?: {lat, lng}, "drone_id"?, "settings"}, zóna s 'drone_id' sa posúva s dronom
+@app.route('/monitor/zones', methods=['POST'])
+@cross_origin()
+def register_monitor_zone():
+    data = request.get_json()
+    if not isinstance(data, dict) or not (data.get('zoneData') or data.get('drone_id') is not None):
+        return jsonify({"error": "Žiadna zóna nebola špecifikovaná"}), 404
+    if not data.get('settings'):
+        return jsonify({"error": "Chýbajú nastavenia zóny"}), 400
+
+    zone_id = breach_monitor.register_zone(data['settings'], zone_info=data.get('zoneData'),
+                                           drone_id=data.get('drone_id'), zone_id=data.get('id'))
+    return jsonify({"id": zone_id})
+
+
+# Endpoint na zoznam zón monitora s ich aktuálnymi varovaniami
+@app.route('/monitor/zones')
+@cross_origin()
+def list_monitor_zones():
+    return jsonify(breach_monitor.list_zones())
+
+
+# Endpoint na odstránenie zóny z monitora
+@app.route('/monitor/zones/<string:zone_id>', methods=['DELETE'])
+@cross_origin()
+def unregister_monitor_zone(zone_id):
+    if not breach_monitor.unregister_zone(zone_id):
+        return jsonify({"error": "Zóna neexistuje"}), 404
+    return jsonify({"id": zone_id})
+
+
+# Endpoint na čítanie udalostí monitora (nové, zrušené a eskalované varovania)
+# Parametre: since (poradové číslo poslednej prijatej udalosti), wait (voliteľné čakanie na nové udalosti v sekundách)
+@app.route('/monitor/events')
+@cross_origin()
+def monitor_events():
+    since = request.args.get('since', 0, type=int)
+    wait = min(request.args.get('wait', 0, type=float), stream_keepalive)
+    return jsonify(breach_monitor.get_events(since, timeout=wait))
+
+
 # Spustenie aplikácie
 if __name__ == '__main__':
+    # Spustenie pollera aircraft.json (alebo prehrávania záloh) na pozadí
+    start_feed()
+    # Spustenie monitora narušení registrovaných zón
+    breach_monitor.start_monitor()
+
     if debug:
         # Použitie vstavaného Flask servera pre vývojové účely
-        app.run(debug=True, host="0.0.0.0", port=4000)
+        # Bez reloadera, ten by spustil aplikáciu v druhom procese a poller aj monitor by bežali dvakrát
+        app.run(debug=True, use_reloader=False, host="0.0.0.0", port=4000)
     else:
         # Použitie Waitress servera pre produkčné prostredie
         from waitress import serve
-        serve(app, host="0.0.0.0", port=4000)
+        serve(app, host="0.0.0.0", port=4000, threads=server_threads)
@@ -0,0 +1,436 @@
+import asyncio  # Importuje asyncio pre asynchrónny server
+import json  # Importuje json modul na spracovanie požiadaviek
+from concurrent.futures import ThreadPoolExecutor  # Importuje ThreadPoolExecutor pre výpočty mimo event loopu
+from aiohttp import web  # Importuje aiohttp web server
+import aircraft_feed  # Importuje poller zdieľaného snímku aircraft.json
+import tile_store  # Importuje úložisko heatmapových dlaždíc s cache
+import drone_store  # Importuje úložisko telemetrie dronov
+import breach_monitor  # Importuje monitor narušení zón na pozadí
+import metrics  # Importuje metriky back-endu
+import time  # Importuje time pre meranie latencie požiadaviek
+from check_breach import check_aircraft_zone_violations, check_multiple_zone_violations, check_aircraft_cpa  # Importuje vlastné funkcie na kontrolu narušení zóny lietadlami
+from main import encoded_data_payload, parse_horizons, snapshot_error, sse_event, start_feed, stream_keepalive  # Importuje zdieľané funkcie Flask back-endu
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: main_async.py
+Asynchrónny režim back-endu (aiohttp) s rovnakými endpointmi ako main.py,
+určený pre tisíce súčasných pripojení a streamov
+"""
+
+# Počet vlákien na výpočty narušení a kódovanie odpovedí /data
+# Pool je viazaný na GIL: numpy uvoľňuje GIL len počas vektorových operácií, prevod aircraft.json na polia,
+# zostavenie výsledkov a kódovanie JSON bežia v Pythone. Vlákna teda len odľahčujú event loop a nevyužijú viac
+# jadier. ProcessPoolExecutor sa nepoužíva, lebo cache snímku a výsledkov v check_breach je v pamäti procesu
+# a snímok by sa pri každom volaní serializoval. Na viac jadier treba spustiť viac procesov back-endu.
+breach_workers = 4
+# Počet vlákien na čítanie dlaždíc z disku
+tile_workers = 8
+
+breach_pool = ThreadPoolExecutor(max_workers=breach_workers, thread_name_prefix="breach")
+tile_pool = ThreadPoolExecutor(max_workers=tile_workers, thread_name_prefix="tile")
+# Vlastné vlákna pre blokujúce čakanie na snímok a na udalosti monitora (nie predvolený executor,
+# ktorý môžu zaplniť iné úlohy, a nie jedno vlákno na klienta)
+notifier_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notifier")
+
+# Najnovší snímok pre streamy a podmienka, ktorou sa odberatelia budia pri novej verzii
+stream_state = {"snapshot": aircraft_feed.get_snapshot()}
+stream_condition = None
+
+# Posledné poradové číslo udalosti monitora a podmienka, ktorou sa budia čakajúce požiadavky /monitor/events
+events_state = {"seq": 0}
+events_condition = None
+
+
+# Middleware na povolenie CORS pre všetky endpointy (ako flask_cors cross_origin)
+@web.middleware
+async def cors_middleware(request, handler):
+    if request.method == 'OPTIONS':
+        response = web.Response(status=200)
+    else:
+        response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
+    return response
+
+
+# Middleware na meranie latencie požiadaviek podľa cesty (pri streame čas do ukončenia streamu)
+@web.middleware
+async def metrics_middleware(request, handler):
+    start = time.perf_counter()
+    try:
+        return await handler(request)
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else 'unmatched'
+        metrics.observe("aeroguardian_request_seconds", time.perf_counter() - start,
+                        {"route": route, "method": request.method})
+
+
+# Endpoint s metrikami vo formáte Prometheus (zberače registruje main.py)
+async def metrics_endpoint(request):
+    return web.Response(body=metrics.render().encode(),
+                        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+
+# Funkcia na vytvorenie JSON odpovede
+def json_response(payload, status=200):
+    return web.json_response(payload, status=status, dumps=lambda value: json.dumps(value, separators=(',', ':')))
+
+
+# Funkcia na načítanie JSON tela požiadavky (None pri neplatnom JSON)
+async def read_json(request):
+    try:
+        return await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# Endpoint na poskytovanie heatmapových dlaždíc
+async def serve_tile(request):
+    info = request.match_info
+    if info['included'] not in ('airport_included', 'airport_excluded'):
+        return web.Response(status=404, text="File not found")
+
+    loop = asyncio.get_running_loop()
+    tile, etag = await loop.run_in_executor(tile_pool, tile_store.get_tile, info['included'],
+                                            int(info['resolution']), int(info['height']),
+                                            int(info['z']), int(info['x']), int(info['y']))
+    if tile is None:
+        return web.Response(status=404, text="File not found")
+
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'public, max-age=86400'}
+    if f'"{etag}"' in request.headers.get('If-None-Match', ''):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=tile, content_type='image/png', headers=headers)
+
+
+# Endpoint na prijímanie dát o polohe dronu (voliteľný kľúč 'drone_id' pre viac dronov)
+async def receive_drone_data(request):
+    data = await read_json(request)
+    if data is None:
+        return json_response({"status": "error", "message": "Request must be JSON"}, 400)
+    if drone_store.ingest(data):
+        return json_response({"status": "success", "message": "Data received and validated"})
+    return json_response({"status": "error", "message": "Invalid data or drone limit reached"}, 400)
+
+
+# Endpoint na dávkový príjem telemetrie viacerých vzoriek a dronov v jednej požiadavke
+async def receive_drone_batch(request):
+    data = await read_json(request)
+    samples = data.get('samples') if isinstance(data, dict) else data
+    if not isinstance(samples, list):
+        return json_response({"status": "error", "message": "Request must be a JSON list of samples"}, 400)
+
+    accepted, rejected = drone_store.ingest_batch(samples)
+    return json_response({"status": "success" if not rejected else "partial", "accepted": accepted,
+                          "rejected": rejected}, 200 if not rejected else 207)
+
+
+# Endpoint na poskytovanie najnovších dát o polohe dronu alebo histórie v časovom okne
+async def drone_data(request):
+    drone_id = request.query.get('drone_id', drone_store.default_drone_id)
+
+    if 'since' in request.query or 'until' in request.query:
+        try:
+            since = float(request.query['since']) if 'since' in request.query else None
+            until = float(request.query['until']) if 'until' in request.query else None
+        except ValueError:
+            return json_response({"error": "Neplatné časové okno"}, 400)
+        samples = drone_store.window(drone_id, since, until)
+        if samples is None:
+            return json_response({"error": "Nie sú dostupné dáta o polohe dronu"}, 404)
+        return json_response({"drone_id": drone_id, "samples": samples})
+
+    latest = drone_store.latest(drone_id)
+    if latest:
+        return json_response(latest)
+    return json_response({"error": "Nie sú dostupné dáta o polohe dronu"}, 404)
+
+
+# Endpoint na zoznam dronov s ich poslednou polohou
+async def drones(request):
+    return json_response(drone_store.all_latest())
+
+
+# Endpoint na získavanie dát o lietadlách (rovnaký protokol ako /data v main.py)
+async def data(request):
+    snapshot = aircraft_feed.get_snapshot()
+
+    error = snapshot_error(snapshot)
+    if error:
+        return json_response(error, 503)
+
+    since_param = request.query.get('since')
+    since = int(since_param) if since_param and since_param.isdigit() else None
+    if since is None and since_param is not None:
+        since = 0  # Klient bez predchádzajúcej verzie dostane celý snímok s číslom verzie
+    etag = f'"{snapshot["version"]}-{since}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',
+        'X-Snapshot-Version': str(snapshot["version"]),
+        'X-Snapshot-Age': f"{aircraft_feed.snapshot_age(snapshot):.1f}"
+    }
+    if etag in request.headers.get('If-None-Match', ''):
+        return web.Response(status=304, headers=headers)
+
+    # Serializácia sa deje raz na verziu, ďalšie požiadavky ju berú z cache
+    loop = asyncio.get_running_loop()
+    body, compressed = await loop.run_in_executor(breach_pool, encoded_data_payload, snapshot, since)
+    headers['Vary'] = 'Accept-Encoding'
+    if compressed is not None and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        body = compressed
+    return web.Response(body=body, content_type='application/json', headers=headers)
+
+
+# Endpoint na kontrolu narušení zóny
+async def check_breach(request):
+    data = await read_json(request)
+    zone_info = data.get('zoneData') if isinstance(data, dict) else None
+    settings = data.get('settings') if isinstance(data, dict) else None
+
+    if not zone_info:
+        return json_response({"error": "Žiadna zóna nebola špecifikovaná"}, 404)
+
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return json_response(error, 503)
+    loop = asyncio.get_running_loop()
+    output = await loop.run_in_executor(breach_pool, lambda: check_aircraft_zone_violations(
+        zone_info, settings, snapshot["data"], snapshot_id=snapshot["version"]))
+    return json_response(output)
+
+
+# Endpoint na dávkovú kontrolu narušení viacerých zón nad jedným snímkom
+async def check_breach_batch(request):
+    data = await read_json(request)
+    zones = data.get('zones') if isinstance(data, dict) else None
+
+    if not zones or not isinstance(zones, list):
+        return json_response({"error": "Žiadna zóna nebola špecifikovaná"}, 404)
+    if not all(isinstance(zone, dict) for zone in zones):
+        return json_response({"error": "Neplatný formát zón"}, 400)
+
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return json_response(error, 503)
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(breach_pool, lambda: check_multiple_zone_violations(
+        zones, snapshot["data"], snapshot_id=snapshot["version"]))
+    return json_response({
+        "version": snapshot["version"],
+        "results": [{"id": zone.get('id'), "breaches": result} for zone, result in zip(zones, results)]
+    })
+
+
+# Endpoint na výpočet najbližšieho priblíženia lietadiel k zóne pre viac predikčných horizontov
+async def check_cpa(request):
+    data = await read_json(request)
+    zone_info = data.get('zoneData') if isinstance(data, dict) else None
+    horizons = parse_horizons(data.get('horizons')) if isinstance(data, dict) else []
+
+    if not zone_info:
+        return json_response({"error": "Žiadna zóna nebola špecifikovaná"}, 404)
+    if horizons is None:
+        return json_response({"error": "Neplatné predikčné horizonty"}, 400)
+
+    snapshot = aircraft_feed.get_snapshot()
+    error = snapshot_error(snapshot)
+    if error:
+        return json_response(error, 503)
+    loop = asyncio.get_running_loop()
+    output = await loop.run_in_executor(breach_pool, lambda: check_aircraft_cpa(
+        zone_info, data.get('settings'), snapshot["data"], horizons=horizons, snapshot_id=snapshot["version"]))
+    return json_response({"version": snapshot["version"], "aircraft": output})
+
+
+# Úloha na pozadí, ktorá čaká na nové verzie snímku a budí všetky streamy naraz
+async def snapshot_notifier():
+    loop = asyncio.get_running_loop()
+    version = None
+    while True:
+        # Blokujúce čakanie na podmienku pollera prebieha v jedinom vlákne, nie v každom streame
+        snapshot = await loop.run_in_executor(notifier_pool, aircraft_feed.wait_for_update, version, 1.0)
+        if snapshot["version"] != version:
+            version = snapshot["version"]
+            async with stream_condition:
+                stream_state["snapshot"] = snapshot
+                stream_condition.notify_all()
+
+
+# Úloha na pozadí, ktorá čaká na nové udalosti monitora narušení a budí všetky čakajúce požiadavky naraz
+async def events_notifier():
+    loop = asyncio.get_running_loop()
+    while True:
+        new_events = await loop.run_in_executor(notifier_pool, breach_monitor.get_events, events_state["seq"], 1.0)
+        if new_events:
+            async with events_condition:
+                events_state["seq"] = new_events[-1]["seq"]
+                events_condition.notify_all()
+
+
+# Endpoint na streamovanie zmien snímku a narušení zóny (Server-Sent Events)
+async def stream(request):
+    try:
+        zone_info = json.loads(request.query.get('zoneData', 'null'))
+        settings = json.loads(request.query.get('settings', 'null'))
+    except ValueError:
+        return json_response({"error": "Neplatný formát zóny alebo nastavení"}, 400)
+
+    if zone_info and not settings:
+        return json_response({"error": "Chýbajú nastavenia zóny"}, 400)
+
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                                           'X-Accel-Buffering': 'no', 'Access-Control-Allow-Origin': '*'})
+    await response.prepare(request)
+    await response.write(b"retry: 3000\n\n")
+
+    loop = asyncio.get_running_loop()
+    sent_data = None
+    version = None
+    try:
+        while True:
+            async with stream_condition:
+                try:
+                    await asyncio.wait_for(
+                        stream_condition.wait_for(lambda: stream_state["snapshot"]["version"] != version),
+                        stream_keepalive)
+                except asyncio.TimeoutError:
+                    pass
+                snapshot = stream_state["snapshot"]
+
+            if snapshot["version"] == version or snapshot["data"] is None:
+                current = aircraft_feed.get_snapshot()
+                if aircraft_feed.is_stale(current):
+                    await response.write(sse_event('stale', {"version": current["version"],
+                                                             "error": current["error"]}).encode('utf-8'))
+                else:
+                    await response.write(b": keepalive\n\n")
+                continue
+            version = snapshot["version"]
+
+            # Prvý snímok sa posiela celý, ďalej už len rozdiel voči poslednému odoslanému
+            if sent_data is None:
+                event = sse_event('snapshot', {"version": version, **snapshot["data"]})
+            else:
+                event = sse_event('delta', {"version": version,
+                                            **aircraft_feed.snapshot_delta(sent_data, snapshot["data"])})
+            await response.write(event.encode('utf-8'))
+            sent_data = snapshot["data"]
+
+            if zone_info:
+                breaches = await loop.run_in_executor(breach_pool, lambda: check_aircraft_zone_violations(
+                    zone_info, settings, snapshot["data"], snapshot_id=version))
+                await response.write(sse_event('breaches', {"version": version,
+                                                            "breaches": breaches or []}).encode('utf-8'))
+    except ConnectionResetError:
+        # Klient sa odpojil počas zápisu
+        pass
+    # Zrušenie úlohy (odpojenie klienta alebo vypínanie servera) sa nezachytáva, aby aiohttp úlohu ukončil
+    return response
+
+
+# Endpoint na registráciu zóny do monitora narušení (rovnaký formát ako v main.py)
+async def register_monitor_zone(request):
+    data = await read_json(request)
+    if not isinstance(data, dict) or not (data.get('zoneData') or data.get('drone_id') is not None):
+        return json_response({"error": "Žiadna zóna nebola špecifikovaná"}, 404)
+    if not data.get('settings'):
+        return json_response({"error": "Chýbajú nastavenia zóny"}, 400)
+
+    zone_id = breach_monitor.register_zone(data['settings'], zone_info=data.get('zoneData'),
+                                           drone_id=data.get('drone_id'), zone_id=data.get('id'))
+    return json_response({"id": zone_id})
+
+
+# Endpoint na zoznam zón monitora s ich aktuálnymi varovaniami
+async def list_monitor_zones(request):
+    return json_response(breach_monitor.list_zones())
+
+
+# Endpoint na odstránenie zóny z monitora
+async def unregister_monitor_zone(request):
+    zone_id = request.match_info['zone_id']
+    if not breach_monitor.unregister_zone(zone_id):
+        return json_response({"error": "Zóna neexistuje"}, 404)
+    return json_response({"id": zone_id})
+
+
+# Endpoint na čítanie udalostí monitora, čakanie prebieha v event loope bez vlákna na požiadavku
+async def monitor_events(request):
+    try:
+        since = int(request.query.get('since', 0))
+        wait = min(float(request.query.get('wait', 0)), stream_keepalive)
+    except ValueError:
+        return json_response({"error": "Neplatné parametre"}, 400)
+    if wait > 0:
+        async with events_condition:
+            try:
+                await asyncio.wait_for(events_condition.wait_for(lambda: events_state["seq"] > since), wait)
+            except asyncio.TimeoutError:
+                pass
+    return json_response(breach_monitor.get_events(since))
+
+
+# Funkcia na spustenie a zastavenie úloh na pozadí spolu so serverom
+async def background_tasks(app):
+    global stream_condition, events_condition
+    stream_condition = asyncio.Condition()
+    events_condition = asyncio.Condition()
+    start_feed()
+    breach_monitor.start_monitor()
+    notifiers = [asyncio.create_task(snapshot_notifier()), asyncio.create_task(events_notifier())]
+    yield
+    for notifier in notifiers:
+        notifier.cancel()
+    breach_pool.shutdown(wait=False)
+    notifier_pool.shutdown(wait=False)
+    tile_pool.shutdown(wait=False)
+
+
+# Funkcia na vytvorenie aiohttp aplikácie
+def create_app():
+    app = web.Application(middlewares=[metrics_middleware, cors_middleware])
+    app.router.add_get(r'/heatmap/{included}/res_{resolution:\d+}/{height:\d+}/{z:\d+}/{x:\d+}/{y:\d+}.png',
+                       serve_tile)
+    app.router.add_post('/drone_location', receive_drone_data)
+    app.router.add_post('/drone_location/batch', receive_drone_batch)
+    app.router.add_get('/drone_data', drone_data)
+    app.router.add_get('/drones', drones)
+    app.router.add_get('/data', data)
+    app.router.add_post('/check_breach', check_breach)
+    app.router.add_post('/check_breach_batch', check_breach_batch)
+    app.router.add_post('/check_cpa', check_cpa)
+    app.router.add_get('/stream', stream)
+    app.router.add_post('/monitor/zones', register_monitor_zone)
+    app.router.add_get('/monitor/zones', list_monitor_zones)
+    app.router.add_delete('/monitor/zones/{zone_id}', unregister_monitor_zone)
+    app.router.add_get('/monitor/events', monitor_events)
+    app.router.add_get('/metrics', metrics_endpoint)
+    app.cleanup_ctx.append(background_tasks)
+    return app
+
+
+# Spustenie aplikácie v asynchrónnom režime
+if __name__ == '__main__':
+    web.run_app(create_app(), host="0.0.0.0", port=4000)
@@ -0,0 +1,160 @@
+import threading  # Importuje threading pre zámok nad metrikami
+import time  # Importuje time pre meranie času
+import logging  # Importuje logging pre chyby zberačov metrík
+from bisect import bisect_left  # Importuje bisect_left pre výber koša histogramu
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: metrics.py
+Metriky back-endu (počítadlá, hodnoty a histogramy) vo formáte Prometheus text exposition
+"""
+
+# Predvolené hranice košov histogramov v sekundách
+default_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Popis metrík: meno -> (typ, popis)
+descriptions = {
+    "aeroguardian_upstream_fetch_seconds": ("histogram", "Latency of aircraft.json requests to receivers"),
+    "aeroguardian_upstream_fetch_total": ("counter", "Aircraft.json requests to receivers by result"),
+    "aeroguardian_snapshot_age_seconds": ("gauge", "Seconds since the last successful contact with a receiver"),
+    "aeroguardian_snapshot_version": ("gauge", "Version of the shared aircraft snapshot"),
+    "aeroguardian_aircraft": ("gauge", "Aircraft in the shared snapshot"),
+    "aeroguardian_source_aircraft": ("gauge", "Aircraft reported by each receiver"),
+    "aeroguardian_breach_zone_seconds": ("histogram", "Breach evaluation time per zone"),
+    "aeroguardian_breach_zones_total": ("counter", "Zones evaluated by the breach engine by cache result"),
+    "aeroguardian_invalid_zones_total": ("counter", "Zones rejected because of missing parameters"),
+    "aeroguardian_tile_cache_requests_total": ("counter", "Heatmap tile cache lookups by result"),
+    "aeroguardian_tile_cache_hit_ratio": ("gauge", "Share of heatmap tile requests served from the cache"),
+    "aeroguardian_tile_cache_bytes": ("gauge", "Estimated size of the heatmap tile cache"),
+    "aeroguardian_drones": ("gauge", "Drones with stored telemetry"),
+    "aeroguardian_monitor_zones": ("gauge", "Zones registered in the breach monitor"),
+    "aeroguardian_request_seconds": ("histogram", "HTTP request latency by route"),
+}
+
+# Hodnoty metrík: (meno, štítky) -> hodnota, pri histogramoch [počty v košoch, súčet, počet]
+counters = {}
+histograms = {}
+metrics_lock = threading.Lock()
+
+# Funkcie, ktoré pri každom čítaní /metrics vrátia aktuálne hodnoty (meno, štítky, hodnota)
+collectors = []
+
+
+# Funkcia na prevod štítkov na hashovateľný kľúč
+def label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+# Funkcia na zvýšenie počítadla
+def inc(name, labels=None, amount=1):
+    key = (name, label_key(labels))
+    with metrics_lock:
+        counters[key] = counters.get(key, 0) + amount
+
+
+# Funkcia na zaznamenanie hodnoty do histogramu
+def observe(name, value, labels=None, buckets=default_buckets):
+    key = (name, label_key(labels))
+    with metrics_lock:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = {"buckets": buckets, "counts": [0] * (len(buckets) + 1), "sum": 0.0,
+                                           "count": 0}
+        histogram["counts"][bisect_left(histogram["buckets"], value)] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+
+# Kontextový manažér na meranie času bloku kódu do histogramu
+class Timer:
+    def __init__(self, name, labels=None):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start, self.labels)
+
+
+# Funkcia na registráciu zberača aktuálnych hodnôt (volá sa pri každom čítaní metrík)
+def register_collector(collector):
+    if collector not in collectors:
+        collectors.append(collector)
+
+
+# Funkcia na escapovanie hodnoty štítku (spätné lomítko, úvodzovky a nový riadok)
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Funkcia na naformátovanie štítkov vo formáte Prometheus
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+# Funkcia na naformátovanie čísla vo formáte Prometheus
+def format_value(value):
+    if value is None:
+        return "NaN"
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Funkcia na vytvorenie textovej podoby všetkých metrík
+def render():
+    """
+    Metriky vo formáte Prometheus text exposition 0.0.4
+    :return: Text odpovede endpointu /metrics
+    """
+    samples = {}
+    for collector in collectors:
+        try:
+            for name, labels, value in collector():
+                samples.setdefault(name, []).append((label_key(labels), value))
+        except Exception as e:
+            logging.error(f"Metrics collector {collector.__name__} failed: {e}")
+
+    with metrics_lock:
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, []).append((labels, value))
+        histogram_copy = {key: dict(value, counts=list(value["counts"])) for key, value in histograms.items()}
+
+    lines = []
+    names = sorted(set(samples) | {name for name, _ in histogram_copy})
+    for name in names:
+        kind, description = descriptions.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(samples.get(name, []), key=lambda sample: sample[0]):
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for (histogram_name, labels), histogram in sorted(histogram_copy.items(), key=lambda item: item[0][1]):
+            if histogram_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(histogram["buckets"]) + [float('inf')], histogram["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(float(bound))),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram['sum'])}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,243 @@
+import copy  # Importuje copy pre kópie testovacích snímkov
+import sys  # Importuje sys pre cestu k modulom back-endu
+import time  # Importuje time pre časy kontaktu so serverom
+from collections import OrderedDict  # Importuje OrderedDict pre prázdnu históriu verzií
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import aircraft_feed  # noqa: E402
+import main  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_aircraft_feed.py
+Testy rozdielov snímkov aircraft.json, odpovedí /data s parametrom since a zlučovania viacerých prijímačov
+"""
+
+old_data = {"now": 100.0, "messages": 500, "aircraft": [
+    {"hex": "a1", "lat": 48.0, "lon": 21.0, "alt_baro": 3000, "gs": 200, "track": 90, "flight": "OK123",
+     "seen": 0.1, "seen_pos": 0.2, "messages": 40, "rssi": -20.1},
+    {"hex": "a2", "lat": 48.5, "lon": 21.5, "alt_baro": 5000, "seen": 0.5, "messages": 10, "rssi": -25.0},
+    {"hex": "a3", "lat": 49.0, "lon": 22.0, "alt_baro": "ground", "seen": 1.0},
+]}
+
+
+# Funkcia na aplikovanie rozdielu na starší snímok rovnako ako klient (ProcessData.jsx)
+def apply_delta(data, delta):
+    aircraft = {ac["hex"]: ac for ac in data["aircraft"]}
+    for ac in delta["added"] + delta["changed"]:
+        aircraft[ac["hex"]] = ac
+    for hex_code in delta["removed"]:
+        del aircraft[hex_code]
+    return aircraft
+
+
+# Funkcia na odstránenie nestálych polí (porovnanie stavu, ktorý klient po rozdiele zobrazuje)
+def stable(aircraft):
+    return {hex_code: {key: value for key, value in ac.items() if key not in aircraft_feed.volatile_keys}
+            for hex_code, ac in aircraft.items()}
+
+
+# Funkcia na vytvorenie nového snímku s pohybom, pridaním, odstránením a zmenou len nestálych polí
+def next_data():
+    data = copy.deepcopy(old_data)
+    data["now"] = 101.0
+    data["messages"] = 520
+    data["aircraft"][0].update(lat=48.01, seen=0.0, seen_pos=0.0, messages=45, rssi=-19.5)  # Pohyb
+    data["aircraft"][1].update(seen=0.2, messages=12, rssi=-24.0)  # Len nestále polia
+    del data["aircraft"][2]  # Odstránené lietadlo
+    data["aircraft"].append({"hex": "a4", "lat": 47.9, "lon": 20.9, "alt_baro": 1000})  # Nové lietadlo
+    return data
+
+
+def test_delta_round_trip():
+    new_data = next_data()
+    delta = aircraft_feed.snapshot_delta(old_data, new_data)
+    assert [ac["hex"] for ac in delta["added"]] == ["a4"]
+    assert [ac["hex"] for ac in delta["changed"]] == ["a1"]
+    assert delta["removed"] == ["a3"]
+    assert delta["now"] == 101.0
+
+    expected = {ac["hex"]: ac for ac in new_data["aircraft"]}
+    assert stable(apply_delta(old_data, delta)) == stable(expected)
+
+
+def test_volatile_fields_only_are_not_changes():
+    new_data = copy.deepcopy(old_data)
+    for ac in new_data["aircraft"]:
+        ac["seen"] = ac.get("seen", 0) + 1
+        ac["messages"] = ac.get("messages", 0) + 3
+    delta = aircraft_feed.snapshot_delta(old_data, new_data)
+    assert delta["added"] == delta["changed"] == delta["removed"] == []
+
+
+@pytest.mark.parametrize("key, value", [("squawk", "7700"), ("alt_baro", 3100), ("flight", "OK124")])
+def test_added_or_changed_tracked_field_is_a_change(key, value):
+    new_data = copy.deepcopy(old_data)
+    new_data["aircraft"][1][key] = value
+    assert [ac["hex"] for ac in aircraft_feed.snapshot_delta(old_data, new_data)["changed"]] == ["a2"]
+
+
+def test_removed_field_is_a_change():
+    new_data = copy.deepcopy(old_data)
+    del new_data["aircraft"][0]["track"]
+    assert [ac["hex"] for ac in aircraft_feed.snapshot_delta(old_data, new_data)["changed"]] == ["a1"]
+
+
+# Každý test /data začína s prázdnou históriou verzií a cache odpovedí
+@pytest.fixture
+def feed(monkeypatch):
+    monkeypatch.setattr(aircraft_feed, "snapshot", dict(aircraft_feed.snapshot))
+    monkeypatch.setattr(aircraft_feed, "history", OrderedDict())
+    main.encoded_cache.clear()
+    yield
+    main.encoded_cache.clear()
+
+
+def test_data_since_round_trip(feed):
+    client = main.app.test_client()
+    aircraft_feed.publish(version=1, data=old_data, checked_at=time.time())
+    full = client.get('/data?since=').json
+    assert full["full"] is True
+    assert full["version"] == 1
+
+    new_data = next_data()
+    aircraft_feed.publish(version=2, data=new_data, checked_at=time.time())
+    delta = client.get('/data?since=1').json
+    assert delta["full"] is False
+    assert delta["since"] == 1
+    assert delta["version"] == 2
+    expected = {ac["hex"]: ac for ac in new_data["aircraft"]}
+    assert stable(apply_delta({"aircraft": full["aircraft"]}, delta)) == stable(expected)
+
+
+def test_data_since_history_miss_returns_full_snapshot(feed):
+    client = main.app.test_client()
+    aircraft_feed.publish(version=5, data=next_data(), checked_at=time.time())
+    response = client.get('/data?since=3').json
+    assert response["full"] is True
+    assert response["version"] == 5
+    assert response["aircraft"] == next_data()["aircraft"]
+
+
+# Funkcia na zlúčený záznam lietadla podľa hex kódu
+def merged_aircraft(datas):
+    return {ac["hex"]: ac for ac in aircraft_feed.merge_sources(datas)["aircraft"]}
+
+
+def test_merge_picks_freshest_position():
+    # Poloha z prvého prijímača je z času 98, z druhého z času 98.5 (rozdielne 'now' prijímačov)
+    first = {"now": 100.0, "messages": 10, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0, "seen": 0.5,
+                                                          "seen_pos": 2.0}]}
+    second = {"now": 101.0, "messages": 20, "aircraft": [{"hex": "a1", "lat": 48.1, "lon": 21.1, "seen": 0.1,
+                                                           "seen_pos": 2.5}]}
+    merged = aircraft_feed.merge_sources([first, second])
+    assert merged["now"] == 101.0
+    assert merged["messages"] == 30
+    assert merged["aircraft"] == second["aircraft"]
+
+    # Staršia poloha druhého prijímača prehrá, časy víťaza sa posunú na spoločný čas 'now'
+    second["aircraft"][0]["seen_pos"] = 3.5
+    [ac] = aircraft_feed.merge_sources([first, second])["aircraft"]
+    assert ac["lat"] == 48.0
+    assert (ac["seen"], ac["seen_pos"]) == (1.5, 3.0)
+    # Záznam v pôvodnom snímku prijímača sa nezmení
+    assert first["aircraft"][0]["seen_pos"] == 2.0
+
+
+def test_merge_position_beats_fresher_message_without_position():
+    with_position = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0, "seen": 30, "seen_pos": 30}]}
+    without_position = {"now": 100.0, "aircraft": [{"hex": "a1", "seen": 0.1}]}
+    assert merged_aircraft([without_position, with_position])["a1"]["lat"] == 48.0
+
+
+def test_merge_position_rank_ties():
+    # Rovnaký čas polohy, rozhoduje novšia správa
+    older = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0, "seen": 1.0, "seen_pos": 2.0}]}
+    newer = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.1, "lon": 21.1, "seen": 0.5, "seen_pos": 2.0}]}
+    assert merged_aircraft([older, newer])["a1"]["lat"] == 48.1
+    assert merged_aircraft([newer, older])["a1"]["lat"] == 48.1
+
+    # Úplná zhoda, ostane záznam prijímača, ktorý je v zozname skôr
+    same = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.2, "lon": 21.2, "seen": 1.0, "seen_pos": 2.0}]}
+    assert merged_aircraft([older, same])["a1"]["lat"] == 48.0
+    assert merged_aircraft([same, older])["a1"]["lat"] == 48.2
+    assert aircraft_feed.position_rank(older["aircraft"][0], 100.0) == aircraft_feed.position_rank(
+        same["aircraft"][0], 100.0)
+
+
+def test_merge_missing_seen_pos():
+    # Bez seen_pos sa čas polohy odhadne zo seen, bez oboch je poloha najstaršia možná
+    estimated = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0, "seen": 1.0}]}
+    reported = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.1, "lon": 21.1, "seen": 0.5, "seen_pos": 3.0}]}
+    unknown = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.2, "lon": 21.2}]}
+    assert merged_aircraft([reported, estimated])["a1"]["lat"] == 48.0
+    assert merged_aircraft([unknown, reported])["a1"]["lat"] == 48.1
+    assert aircraft_feed.position_rank(unknown["aircraft"][0], 100.0) == (True, float('-inf'), float('-inf'))
+    # Záznam bez seen sa pri posune na spoločný čas nemení
+    later = {"now": 102.0, "aircraft": []}
+    assert merged_aircraft([unknown, later])["a1"] == unknown["aircraft"][0]
+
+
+def test_merge_keeps_aircraft_seen_by_one_receiver():
+    first = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0}]}
+    second = {"now": 100.0, "aircraft": [{"hex": "a2", "lat": 48.1, "lon": 21.1}]}
+    assert set(merged_aircraft([first, second])) == {"a1", "a2"}
+    # Jeden prijímač sa vracia bez zlučovania
+    assert aircraft_feed.merge_sources([first]) is first
+
+
+# Funkcia na vytvorenie stavu prijímača v tvare source_states
+def source_state(data=None, checked_at=None, error=None):
+    return {"data": data, "etag": None, "last_modified": None, "checked_at": checked_at, "error": error}
+
+
+def test_publish_merged_skips_failing_source(feed, monkeypatch):
+    now = time.time()
+    working = {"now": 100.0, "aircraft": [{"hex": "a1", "lat": 48.0, "lon": 21.0}]}
+    # Druhý prijímač má posledné dáta staršie ako stale_after a pri poslednom pokuse zlyhal
+    failing = {"now": 50.0, "aircraft": [{"hex": "a2", "lat": 48.1, "lon": 21.1}]}
+    monkeypatch.setattr(aircraft_feed, "source_states", {
+        "working": source_state(working, now),
+        "failing": source_state(failing, now - aircraft_feed.stale_after - 1, error="HTTP 500"),
+        "never": source_state(error="Connection refused"),
+    })
+    version = aircraft_feed.snapshot["version"]
+
+    aircraft_feed.publish_merged(changed=True)
+    snapshot = aircraft_feed.get_snapshot()
+    assert snapshot["version"] == version + 1
+    assert snapshot["data"] is working
+    assert snapshot["checked_at"] == now
+    assert snapshot["error"] == "failing: HTTP 500; never: Connection refused"
+    assert snapshot["sources"]["failing"] == {"aircraft": 1, "checked_at": now - aircraft_feed.stale_after - 1,
+                                              "error": "HTTP 500"}
+    assert snapshot["sources"]["never"]["aircraft"] == 0
+
+
+def test_publish_merged_without_fresh_source_keeps_last_data(feed, monkeypatch):
+    monkeypatch.setattr(aircraft_feed, "source_states", {"failing": source_state(error="timeout")})
+    aircraft_feed.publish(version=7, data=old_data, checked_at=time.time() - 60, error=None)
+    aircraft_feed.publish_merged(changed=True)
+    snapshot = aircraft_feed.get_snapshot()
+    assert snapshot["version"] == 7
+    assert snapshot["data"] is old_data
+    assert snapshot["error"] == "failing: timeout"
+    assert aircraft_feed.is_stale(snapshot)
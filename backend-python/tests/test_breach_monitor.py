@@ -0,0 +1,186 @@
+import itertools  # Importuje itertools pre jedinečné verzie testovacích snímkov
+import sys  # Importuje sys pre cestu k modulom back-endu
+import time  # Importuje time pre časy kontaktu so serverom
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import aircraft_feed  # noqa: E402
+import breach_monitor  # noqa: E402
+import main  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_breach_monitor.py
+Testy monitora narušení (udalosti nové, eskalované a zrušené, zastaraný snímok, registrácia zón cez API)
+"""
+
+zone = {"lat": 48.6631, "lng": 21.2411}
+settings = {"flightRange": 500, "warningOverhead": 5, "duration": 5, "altitude": 120}
+
+# Verzie snímkov sa neopakujú medzi testami (cache výsledkov v check_breach je podľa verzie)
+versions = itertools.count(10 ** 6)
+
+
+# Každý test začína bez zón, stavov a udalostí
+@pytest.fixture(autouse=True)
+def empty_monitor(monkeypatch):
+    monkeypatch.setattr(breach_monitor, "zones", {})
+    monkeypatch.setattr(breach_monitor, "zone_states", {})
+    breach_monitor.events.clear()
+    breach_monitor.stop_event.clear()
+    yield
+    breach_monitor.events.clear()
+    breach_monitor.stop_event.clear()
+
+
+# Funkcia na vytvorenie stojaceho lietadla v danej vzdialenosti severne od stredu zóny (v metroch)
+def aircraft_at(hex_code, distance):
+    return {"hex": hex_code, "lat": zone["lat"] + distance / 111195, "lon": zone["lng"], "gs": 0, "alt_baro": 100}
+
+
+# Funkcia na vytvorenie snímku v tvare aircraft_feed
+def snapshot(aircraft, checked_at=None):
+    return {"version": next(versions), "data": {"now": 0, "aircraft": aircraft},
+            "checked_at": time.time() if checked_at is None else checked_at, "error": None}
+
+
+# Funkcia na vyhodnotenie snímku rovnako ako monitor (prírastkovo voči predchádzajúcemu snímku)
+def evaluate(previous, current):
+    delta = aircraft_feed.snapshot_delta(previous["data"], current["data"]) if previous else None
+    breach_monitor.evaluate_snapshot(current, delta)
+    return current
+
+
+# Funkcia na zoznam udalostí ako dvojíc (typ, hex)
+def event_kinds():
+    return [(event["type"], event["hex"]) for event in breach_monitor.get_events()]
+
+
+def test_new_escalated_and_cleared_events():
+    zone_id = breach_monitor.register_zone(settings, zone_info=zone)
+
+    first = evaluate(None, snapshot([aircraft_at("a1", 5000)]))
+    assert event_kinds() == [("new", "a1")]
+    assert breach_monitor.get_events()[0]["breach"][1] == 'Warning zone proximity'
+    assert breach_monitor.get_events()[0]["zone_id"] == zone_id
+
+    second = evaluate(first, snapshot([aircraft_at("a1", 0)]))
+    assert event_kinds()[1:] == [("escalated", "a1")]
+
+    evaluate(second, snapshot([]))
+    assert event_kinds()[2:] == [("cleared", "a1")]
+    assert breach_monitor.list_zones()[zone_id]["alerts"] == []
+
+
+def test_unchanged_alert_publishes_nothing():
+    breach_monitor.register_zone(settings, zone_info=zone)
+    first = evaluate(None, snapshot([aircraft_at("a1", 0), aircraft_at("a2", 50000)]))
+    evaluate(first, snapshot([aircraft_at("a1", 0), aircraft_at("a2", 49000)]))
+    assert event_kinds() == [("new", "a1")]
+
+
+def test_incremental_matches_full_evaluation():
+    zone_id = breach_monitor.register_zone(settings, zone_info=zone)
+    first = evaluate(None, snapshot([aircraft_at("a1", 0), aircraft_at("a2", 5000), aircraft_at("a3", 8000)]))
+    evaluate(first, snapshot([aircraft_at("a1", 0), aircraft_at("a3", 50000), aircraft_at("a4", 300)]))
+    incremental = sorted(breach_monitor.list_zones()[zone_id]["alerts"])
+
+    breach_monitor.zone_states.clear()
+    evaluate(None, snapshot([aircraft_at("a1", 0), aircraft_at("a3", 50000), aircraft_at("a4", 300)]))
+    assert sorted(breach_monitor.list_zones()[zone_id]["alerts"]) == incremental
+    assert [breach[0] for breach in incremental] == ["a1", "a4"]
+
+
+def test_unregister_clears_active_alerts():
+    zone_id = breach_monitor.register_zone(settings, zone_info=zone)
+    evaluate(None, snapshot([aircraft_at("a1", 0)]))
+    assert breach_monitor.unregister_zone(zone_id)
+    assert event_kinds() == [("new", "a1"), ("cleared", "a1")]
+    assert not breach_monitor.unregister_zone(zone_id)
+
+
+# Funkcia na spustenie slučky monitora nad zadanou postupnosťou snímkov
+def run_loop(monkeypatch, snapshots):
+    remaining = list(snapshots)
+
+    def wait_for_update(version, timeout=None):
+        if len(remaining) == 1:
+            breach_monitor.stop_event.set()
+        return remaining.pop(0)
+
+    monkeypatch.setattr(aircraft_feed, "wait_for_update", wait_for_update)
+    breach_monitor.monitor_loop()
+
+
+def test_stale_feed_suspends_and_resumes_alerts(monkeypatch):
+    breach_monitor.register_zone(settings, zone_info=zone)
+    fresh = snapshot([aircraft_at("a1", 0)])
+    stale = dict(fresh, checked_at=time.time() - aircraft_feed.stale_after - 1)
+    # Po obnovení sa rovnaká verzia snímku vyhodnotí znovu
+    resumed = dict(fresh, checked_at=time.time())
+    run_loop(monkeypatch, [fresh, stale, stale, resumed])
+
+    assert event_kinds() == [("new", "a1"), ("stale", None), ("cleared", "a1"), ("resumed", None), ("new", "a1")]
+
+
+def test_missing_data_counts_as_stale(monkeypatch):
+    breach_monitor.register_zone(settings, zone_info=zone)
+    fresh = snapshot([aircraft_at("a1", 0)])
+    run_loop(monkeypatch, [fresh, dict(fresh, version=next(versions), data=None)])
+    assert event_kinds() == [("new", "a1"), ("stale", None), ("cleared", "a1")]
+
+
+def test_failed_evaluation_forces_full_pass(monkeypatch):
+    breach_monitor.register_zone(settings, zone_info=zone)
+    deltas = []
+    evaluate_snapshot = breach_monitor.evaluate_snapshot
+
+    def failing_once(current, delta):
+        deltas.append(delta)
+        if len(deltas) == 2:
+            raise RuntimeError("evaluation failed")
+        evaluate_snapshot(current, delta)
+
+    monkeypatch.setattr(breach_monitor, "evaluate_snapshot", failing_once)
+    run_loop(monkeypatch, [snapshot([]), snapshot([aircraft_at("a1", 0)]), snapshot([aircraft_at("a1", 0)])])
+
+    # Po chybe sa nepoužije rozdiel, ktorý by zmeny zlyhaného snímku vynechal
+    assert deltas[0] is None
+    assert deltas[1] is not None
+    assert deltas[2] is None
+    assert event_kinds() == [("new", "a1")]
+
+
+def test_zone_api_register_list_delete():
+    client = main.app.test_client()
+    response = client.post('/monitor/zones', json={"id": "z1", "zoneData": zone, "settings": settings})
+    assert response.status_code == 200
+    assert response.json == {"id": "z1"}
+    assert client.post('/monitor/zones', json={"settings": settings}).status_code == 404
+    assert client.post('/monitor/zones', json={"zoneData": zone}).status_code == 400
+
+    listed = client.get('/monitor/zones').json
+    assert list(listed) == ["z1"]
+    assert listed["z1"]["zoneData"] == zone
+    assert listed["z1"]["alerts"] == []
+
+    assert client.delete('/monitor/zones/z1').status_code == 200
+    assert client.delete('/monitor/zones/z1').status_code == 404
+    assert client.get('/monitor/zones').json == {}
@@ -0,0 +1,209 @@
+import itertools  # Importuje itertools pre jedinečné verzie testovacích snímkov
+import json  # Importuje json pre porovnanie s odpoveďou endpointu
+import math  # Importuje math pre výpočet polôh na hranici zóny
+import random  # Importuje random pre náhodné riedke snímky
+import sys  # Importuje sys pre cestu k modulom back-endu
+import time  # Importuje time pre čas kontaktu so serverom
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import numpy as np  # Importuje numpy pre polia dvojíc zóna × lietadlo
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import aircraft_feed  # noqa: E402
+import check_breach  # noqa: E402
+import main  # noqa: E402
+from check_breach import check_aircraft_zone_violations, check_aircraft_zone_violations_scalar  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_check_breach.py
+Testy zhody vektorizovanej kontroly narušení zóny s pôvodnou skalárnou implementáciou
+a dávkovej kontroly viacerých zón s kontrolou po jednej zóne
+"""
+
+zone = {"lat": 48.6631, "lng": 21.2411}
+settings = {"flightRange": 500, "warningOverhead": 5, "duration": 5, "altitude": 120}
+
+
+# Funkcia na porovnanie výsledkov oboch implementácií (poradie lietadiel sa nemusí zhodovať)
+def assert_equivalent(aircraft_data, zone_info=zone, zone_settings=settings):
+    expected = sorted(check_aircraft_zone_violations_scalar(zone_info, zone_settings, aircraft_data))
+    actual = sorted(check_aircraft_zone_violations(zone_info, zone_settings, aircraft_data))
+    assert [breach[:2] for breach in actual] == [breach[:2] for breach in expected]
+    for got, want in zip(actual, expected):
+        assert float(got[2]) == pytest.approx(float(want[2]), rel=1e-6, abs=1e-6)
+        assert float(got[3]) == pytest.approx(float(want[3]), rel=1e-6, abs=1e-6)
+
+
+# Funkcia na vytvorenie náhodného lietadla okolo zóny s náhodne chýbajúcimi poľami
+def random_aircraft(rng, index):
+    aircraft = {"hex": f"{index:06x}"}
+    if rng.random() < 0.9:
+        aircraft["lat"] = zone["lat"] + rng.uniform(-0.3, 0.3)
+        aircraft["lon"] = zone["lng"] + rng.uniform(-0.4, 0.4)
+    if rng.random() < 0.8:
+        aircraft["gs"] = rng.uniform(0, 500)
+    for key in ("track", "nav_heading", "mag_heading"):
+        if rng.random() < 0.5:
+            aircraft[key] = rng.uniform(0, 360)
+    altitude = rng.random()
+    if altitude < 0.15:
+        aircraft["alt_baro"] = "ground"
+    elif altitude < 0.85:
+        aircraft["alt_baro"] = rng.choice([rng.uniform(0, 3000), rng.uniform(0, 40000)])
+    if rng.random() < 0.6:
+        aircraft["baro_rate"] = rng.uniform(-3000, 3000)
+    return aircraft
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_random_sparse_feeds(seed):
+    rng = random.Random(seed)
+    aircraft_data = {"now": 0, "aircraft": [random_aircraft(rng, index) for index in range(rng.randint(0, 60))]}
+    assert_equivalent(aircraft_data)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_zone_settings(seed):
+    rng = random.Random(1000 + seed)
+    zone_settings = {"flightRange": rng.uniform(25, 5000), "warningOverhead": rng.uniform(5, 20),
+                     "duration": rng.uniform(15, 120), "altitude": rng.uniform(30, 2000)}
+    aircraft_data = {"now": 0, "aircraft": [random_aircraft(rng, index) for index in range(40)]}
+    assert_equivalent(aircraft_data, zone_settings=zone_settings)
+
+
+def test_missing_fields():
+    aircraft_data = {"now": 0, "aircraft": [
+        {"hex": "a00001"},  # Bez polohy
+        {"hex": "a00002", "lat": zone["lat"]},  # Len zemepisná šírka
+        {"hex": "a00003", "lat": zone["lat"], "lon": zone["lng"]},  # Bez rýchlosti, smeru a výšky
+        {"hex": "a00004", "lat": zone["lat"], "lon": zone["lng"], "gs": 120},  # Bez smeru
+        {"hex": "a00005", "lat": zone["lat"], "lon": zone["lng"], "alt_baro": 300},  # Bez vertikálnej rýchlosti
+        {"hex": "a00006", "lat": zone["lat"], "lon": zone["lng"], "baro_rate": -500},  # Bez výšky
+    ]}
+    assert_equivalent(aircraft_data)
+
+
+def test_ground_altitude():
+    aircraft_data = {"now": 0, "aircraft": [
+        {"hex": "b00001", "lat": zone["lat"], "lon": zone["lng"], "alt_baro": "ground"},
+        {"hex": "b00002", "lat": zone["lat"] + 0.01, "lon": zone["lng"], "alt_baro": "ground", "gs": 15,
+         "track": 180, "baro_rate": 0},
+    ]}
+    assert_equivalent(aircraft_data)
+
+
+def test_empty_feed():
+    assert_equivalent({"now": 0, "aircraft": []})
+
+
+@pytest.mark.parametrize("factor", [0.999, 1.0, 1.001])
+def test_zone_boundaries(factor):
+    # Lietadlá stojace presne na hranici letovej a varovnej zóny a tesne pred ňou a za ňou
+    flight_range = settings["flightRange"] * 2
+    warning_overhead = settings["flightRange"] + settings["warningOverhead"] * 2000
+    aircraft = []
+    for index, radius in enumerate((flight_range, warning_overhead)):
+        for bearing in (0, 90, 180, 270):
+            distance = radius * factor
+            dlat = distance * math.cos(math.radians(bearing)) / 6371000 * 180 / math.pi
+            dlon = distance * math.sin(math.radians(bearing)) / (6371000 * math.cos(math.radians(zone["lat"]))) \
+                * 180 / math.pi
+            aircraft.append({"hex": f"c{index}{bearing:04d}", "lat": zone["lat"] + dlat, "lon": zone["lng"] + dlon,
+                             "gs": 0, "alt_baro": 100})
+    assert_equivalent({"now": 0, "aircraft": aircraft})
+
+
+# Verzie snímkov sa neopakujú medzi testami (cache výsledkov v check_breach je podľa verzie)
+versions = itertools.count(2 * 10 ** 6)
+
+
+# Funkcia na vytvorenie zoznamu zón s rôznymi nastaveniami a neplatnými zónami medzi nimi
+def random_zones(rng, count):
+    zones = []
+    for index in range(count):
+        zone_data = {"lat": zone["lat"] + rng.uniform(-0.2, 0.2), "lng": zone["lng"] + rng.uniform(-0.3, 0.3)}
+        zone_settings = {"flightRange": rng.uniform(25, 5000), "warningOverhead": rng.uniform(5, 20),
+                         "duration": rng.uniform(1, 10), "altitude": rng.uniform(30, 2000)}
+        if index % 5 == 3:
+            del zone_settings[rng.choice(list(zone_settings))]  # Neplatná zóna bez jedného nastavenia
+        zones.append({"id": f"z{index}", "zoneData": zone_data, "settings": zone_settings})
+    return zones
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_batch_endpoint_matches_single_zone_calls(monkeypatch, seed):
+    rng = random.Random(2000 + seed)
+    aircraft_data = {"now": 0, "aircraft": [random_aircraft(rng, index) for index in range(80)]}
+    zones = random_zones(rng, 12)
+    # Klient nemusí posielať identifikátor zóny
+    del zones[0]["id"]
+    monkeypatch.setattr(aircraft_feed, "snapshot", dict(aircraft_feed.snapshot))
+    version = next(versions)
+    aircraft_feed.publish(version=version, data=aircraft_data, checked_at=time.time(), error=None)
+
+    response = main.app.test_client().post('/check_breach_batch', json={"zones": zones})
+    assert response.status_code == 200
+    assert response.json["version"] == version
+    results = response.json["results"]
+    assert [result["id"] for result in results] == [zone_item.get("id") for zone_item in zones]
+    for zone_item, result in zip(zones, results):
+        expected = check_aircraft_zone_violations(zone_item["zoneData"], zone_item["settings"], aircraft_data)
+        if expected is None:
+            assert result["breaches"] is None
+        else:
+            # Poradie narušení v zóne je poradie lietadiel v snímku v oboch prípadoch
+            assert result["breaches"] == json.loads(json.dumps(expected))
+    assert any(result["breaches"] is None for result in results)
+    assert any(result["breaches"] for result in results)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_evaluate_pairs_in_any_blocks(seed):
+    rng = random.Random(3000 + seed)
+    aircraft_data = {"now": 0, "aircraft": [random_aircraft(rng, index) for index in range(50)]}
+    zones = [zone_item for zone_item in random_zones(rng, 8) if len(zone_item["settings"]) == 4]
+    params_list = [check_breach.zone_parameters(zone_item["zoneData"], zone_item["settings"]) for zone_item in zones]
+    arrays = check_breach.aircraft_arrays(aircraft_data)
+
+    # Všetky dvojice zóna × lietadlo v náhodnom poradí a v blokoch náhodnej veľkosti
+    pairs = [(z, a) for z in range(len(params_list)) for a in range(len(arrays["hex"]))]
+    rng.shuffle(pairs)
+    results = [[] for _ in params_list]
+    start = 0
+    while start < len(pairs):
+        block = pairs[start:start + rng.randint(1, 40)]
+        check_breach.evaluate_pairs(arrays, params_list, np.array([z for z, _ in block], dtype=np.int64),
+                                    np.array([a for _, a in block], dtype=np.int64), results)
+        start += len(block)
+
+    for zone_item, result in zip(zones, results):
+        expected = check_aircraft_zone_violations(zone_item["zoneData"], zone_item["settings"], aircraft_data)
+        assert sorted(result) == sorted(expected)
+
+
+def test_small_batch_cells_match_single_zone_calls(monkeypatch):
+    rng = random.Random(4000)
+    aircraft_data = {"now": 0, "aircraft": [random_aircraft(rng, index) for index in range(60)]}
+    zones = random_zones(rng, 10)
+    expected = [check_aircraft_zone_violations(zone_item["zoneData"], zone_item["settings"], aircraft_data)
+                for zone_item in zones]
+    # Dvojice sa rozdelia do mnohých blokov, ktoré končia uprostred zón
+    monkeypatch.setattr(check_breach, "batch_cells", 7)
+    assert check_breach.check_multiple_zone_violations(zones, aircraft_data) == expected
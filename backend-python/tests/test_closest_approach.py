@@ -0,0 +1,155 @@
+import math  # Importuje math pre prepočet vzdialeností na stupne
+import sys  # Importuje sys pre cestu k modulom back-endu
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from check_breach import check_aircraft_cpa, closest_approach, earth_radius  # noqa: E402
+from check_breach import aircraft_arrays, vertical_overhead, zone_parameters  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_closest_approach.py
+Testy najbližšieho priblíženia (CPA) na prípadoch s analytickým riešením
+"""
+
+zone = {"lat": 48.6631, "lng": 21.2411}
+# Letová zóna má polomer 1000 m, varovná zóna 10 500 m, výška zóny 120 m
+settings = {"flightRange": 500, "warningOverhead": 5, "altitude": 120}
+flight_radius, warning_radius = 1000, 10500
+horizons = [1, 2, 5]
+
+
+# Funkcia na vytvorenie lietadla vo vzdialenosti north (v metroch) severne od stredu zóny
+# Smer 90° je pohyb na sever (konvencia predict_position), rýchlosť v m/s, výška 'ground' len vodorovne
+def aircraft(hex_code, north, speed=0.0, track=90, altitude_m=None, vertical_mps=0.0):
+    ac = {"hex": hex_code, "lat": zone["lat"] + math.degrees(north / earth_radius), "lon": zone["lng"],
+          "gs": speed / 0.514444, "track": track}
+    if altitude_m is None:
+        ac["alt_baro"] = "ground"
+    else:
+        ac["alt_baro"] = altitude_m / 0.3048
+        ac["baro_rate"] = vertical_mps * 60 / 0.3048
+    return ac
+
+
+# Funkcia na výpočet CPA pre zoznam lietadiel
+def cpa(*aircraft_list, zone_horizons=horizons):
+    return check_aircraft_cpa(zone, settings, {"now": 0, "aircraft": list(aircraft_list)}, zone_horizons)
+
+
+# Funkcia na porovnanie výsledku jedného horizontu s očakávanými hodnotami (None musí sedieť presne)
+def assert_horizon(result, horizon, min_separation, time_to_cpa, flight_entry, warning_entry):
+    assert result["horizon"] == horizon
+    assert result["min_separation"] == pytest.approx(min_separation, abs=1e-3)
+    assert result["time_to_cpa"] == pytest.approx(time_to_cpa, abs=1e-6)
+    for key, expected in (("flight_entry", flight_entry), ("warning_entry", warning_entry)):
+        if expected is None:
+            assert result[key] is None
+        else:
+            assert result[key] == pytest.approx(expected, abs=1e-6)
+
+
+def test_head_on():
+    # 20 km južne, 100 m/s na sever: CPA v strede zóny za 200 s, vstup do varovnej zóny za 95 s a letovej za 190 s
+    [result] = cpa(aircraft("a1", -20000, speed=100))
+    assert result["hex"] == "a1"
+    assert result["altitude"] is None
+    flight_entry, warning_entry = (20000 - flight_radius) / 100, (20000 - warning_radius) / 100
+    one, two, five = result["horizons"]
+    # Vstup sa hlási len v horizonte, ktorý ho stihne, CPA sa oreže na koniec horizontu
+    assert_horizon(one, 1, 14000, 60, None, None)
+    assert_horizon(two, 2, 8000, 120, None, warning_entry)
+    assert_horizon(five, 5, 0, 200, flight_entry, warning_entry)
+
+
+def test_stationary_inside_warning_zone():
+    [result] = cpa(aircraft("a1", 5000))
+    for horizon, item in zip(horizons, result["horizons"]):
+        assert_horizon(item, horizon, 5000, 0, None, 0)
+
+
+def test_stationary_inside_flight_zone():
+    [result] = cpa(aircraft("a1", -300))
+    for horizon, item in zip(horizons, result["horizons"]):
+        assert_horizon(item, horizon, 300, 0, 0, 0)
+
+
+def test_stationary_outside_is_not_reported():
+    assert cpa(aircraft("a1", 20000)) == []
+
+
+def test_diverging_inside_warning_zone():
+    # Lietadlo sa vzďaľuje, najbližšie je hneď teraz a v zóne je od začiatku
+    [result] = cpa(aircraft("a1", 5000, speed=100))
+    for horizon, item in zip(horizons, result["horizons"]):
+        assert_horizon(item, horizon, 5000, 0, None, 0)
+
+
+def test_diverging_outside_is_not_reported():
+    assert cpa(aircraft("a1", 15000, speed=100)) == []
+
+
+def test_passing_beside_flight_zone():
+    # Trať 3 km východne od stredu: CPA 3 km za 200 s, do letovej zóny nevstúpi
+    passing = aircraft("a1", -20000, speed=100)
+    passing["lon"] = zone["lng"] + math.degrees(3000 / (earth_radius * math.cos(math.radians(zone["lat"]))))
+    [result] = cpa(passing)
+    warning_entry = (20000 - math.sqrt(warning_radius ** 2 - 3000 ** 2)) / 100
+    assert_horizon(result["horizons"][2], 5, 3000, 200, None, warning_entry)
+
+
+def test_descending_above_zone():
+    # Nad stredom zóny 1000 m nad jej výškou, klesá 10 m/s: CPA za 100 s, vstup pod hornú hranicu za 50 s
+    altitude = settings["altitude"] + 1000
+    [result] = cpa(aircraft("a1", 0, altitude_m=altitude, vertical_mps=-10))
+    assert result["altitude"] == pytest.approx(altitude)
+    entry = (altitude - settings["altitude"] - vertical_overhead) / 10
+    one, two, five = result["horizons"]
+    assert_horizon(one, 1, 400, 60, entry, entry)
+    assert_horizon(two, 2, 0, 100, entry, entry)
+    assert_horizon(five, 5, 0, 100, entry, entry)
+
+
+def test_climbing_away_is_not_reported():
+    assert cpa(aircraft("a1", 0, altitude_m=settings["altitude"] + 1000, vertical_mps=10)) == []
+
+
+def test_entries_sorted_by_warning_entry():
+    result = cpa(aircraft("far", -20000, speed=100), aircraft("inside", 5000), aircraft("near", -15000, speed=100))
+    assert [item["hex"] for item in result] == ["inside", "near", "far"]
+
+
+def test_horizons_are_sorted_and_defaulted():
+    [result] = cpa(aircraft("a1", -20000, speed=100), zone_horizons=[5, 1])
+    assert [item["horizon"] for item in result["horizons"]] == [1, 5]
+    [result] = cpa(aircraft("a1", -20000, speed=100), zone_horizons=None)
+    assert [item["horizon"] for item in result["horizons"]] == [1, 2, 5]
+
+
+def test_invalid_zone():
+    assert check_aircraft_cpa({"lat": zone["lat"]}, settings, {"now": 0, "aircraft": []}) is None
+
+
+def test_closest_approach_without_spatial_index():
+    # Polia bez indexu (aircraft_arrays) dajú rovnaký výsledok ako stav snímku s indexom
+    aircraft_data = {"now": 0, "aircraft": [aircraft("a1", -20000, speed=100), aircraft("a2", 5000)]}
+    params = zone_parameters(zone, {"duration": None, **settings})
+    assert closest_approach(aircraft_arrays(aircraft_data), params, horizons) == \
+        check_aircraft_cpa(zone, settings, aircraft_data, horizons)
@@ -0,0 +1,112 @@
+import sys  # Importuje sys pre cestu k modulom back-endu
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import drone_store  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_drone_store.py
+Testy úložiska telemetrie dronov (identifikátory, kruhový buffer, časové okno a limit počtu dronov)
+"""
+
+
+# Každý test začína s prázdnym registrom a malým bufferom
+@pytest.fixture(autouse=True)
+def empty_store(monkeypatch):
+    monkeypatch.setattr(drone_store, "drones", {})
+    monkeypatch.setattr(drone_store, "history_capacity", 4)
+    monkeypatch.setattr(drone_store, "max_drones", 3)
+
+
+# Funkcia na vytvorenie vzorky telemetrie
+def sample(timestamp=None, **extra):
+    data = {"latitude": 48.0, "longitude": 21.0, "altitude": 100}
+    if timestamp is not None:
+        data["timestamp"] = timestamp
+    data.update(extra)
+    return data
+
+
+def test_missing_drone_id_falls_back_to_default():
+    assert drone_store.ingest(sample())
+    assert list(drone_store.drones) == [drone_store.default_drone_id]
+    assert drone_store.latest()["altitude"] == 100
+
+
+@pytest.mark.parametrize("drone_id", [None, "", "   ", "x" * 65, True, 1.5, ["a"]])
+def test_invalid_explicit_drone_id_is_rejected(drone_id):
+    assert not drone_store.ingest(sample(drone_id=drone_id))
+    assert drone_store.drones == {}
+
+
+def test_numeric_drone_id_is_stored_as_string():
+    assert drone_store.ingest(sample(drone_id=7))
+    assert drone_store.latest(7) is drone_store.latest("7")
+
+
+def test_ring_buffer_wraps_around():
+    for timestamp in range(10):
+        assert drone_store.ingest(sample(timestamp=timestamp, drone_id="a"))
+    drone = drone_store.drones["a"]
+    assert drone["count"] == 4
+    assert [row["timestamp"] for row in drone_store.window("a")] == [6, 7, 8, 9]
+    assert drone_store.latest("a")["timestamp"] == 9
+
+
+def test_window_since_until_are_inclusive():
+    drone_store.ingest_batch([sample(timestamp=timestamp, drone_id="a") for timestamp in (10, 20, 30, 40)])
+    assert [row["timestamp"] for row in drone_store.window("a", since=20)] == [20, 30, 40]
+    assert [row["timestamp"] for row in drone_store.window("a", until=30)] == [10, 20, 30]
+    assert [row["timestamp"] for row in drone_store.window("a", since=15, until=35)] == [20, 30]
+    assert drone_store.window("a", since=50) == []
+    assert drone_store.window("missing") is None
+
+
+def test_window_is_sorted_by_time():
+    drone_store.ingest_batch([sample(timestamp=timestamp, drone_id="a") for timestamp in (30, 10, 20)])
+    assert [row["timestamp"] for row in drone_store.window("a")] == [10, 20, 30]
+
+
+def test_registry_rejects_new_drones_at_max_drones():
+    for drone_id in ("a", "b", "c"):
+        assert drone_store.ingest(sample(drone_id=drone_id))
+    assert not drone_store.ingest(sample(drone_id="d"))
+    # Známy dron sa prijme aj pri plnom registri
+    assert drone_store.ingest(sample(drone_id="a"))
+    assert sorted(drone_store.drones) == ["a", "b", "c"]
+
+
+def test_registry_evicts_idle_drones_when_full():
+    for drone_id in ("a", "b", "c"):
+        drone_store.ingest(sample(drone_id=drone_id))
+    drone_store.drones["b"]["updated_at"] -= drone_store.drone_expiry + 1
+    assert drone_store.ingest(sample(drone_id="d"))
+    assert sorted(drone_store.drones) == ["a", "c", "d"]
+
+
+def test_batch_reports_invalid_and_over_limit_samples():
+    for drone_id in ("a", "b", "c"):
+        drone_store.ingest(sample(drone_id=drone_id))
+    accepted, rejected = drone_store.ingest_batch([
+        sample(drone_id="a"), sample(drone_id="d"), {"latitude": 1}, sample(), sample(drone_id="d")
+    ])
+    assert accepted == 1
+    assert rejected == [1, 2, 3, 4]
@@ -0,0 +1,75 @@
+import json  # Importuje json pre zápis JSON zálohy
+import sys  # Importuje sys pre cestu k modulom back-endu
+from datetime import datetime  # Importuje datetime pre časy snímkov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import feed_replay  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_feed_replay.py
+Testy prehrávania záloh loggera v oboch formátoch (JSON po riadkoch a stĺpcový archív .agc)
+"""
+
+
+# Funkcia na vytvorenie snímku aircraft.json v danom čase
+def snapshot(moment, source_id=1):
+    return {"now": moment.timestamp(), "source_id": source_id, "aircraft": [
+        {"hex": "a00001", "lat": 48.5, "lon": 21.2, "alt_baro": 3000, "gs": 210.5, "flight": "OK123"},
+        {"hex": "a00002", "lat": 48.7, "lon": 21.4, "alt_baro": "ground"},
+    ]}
+
+
+# Funkcia na zápis záloh: hodina 10 ako JSON, hodina 11 ako stĺpcový archív
+def write_backups(base_dir):
+    archive = feed_replay.archive_module()
+    day_dir = base_dir / '20240501'
+    day_dir.mkdir()
+    with open(day_dir / 'aircraft_10.json', 'w') as file:
+        for second in (0, 5):
+            file.write(json.dumps(snapshot(datetime(2024, 5, 1, 10, 0, second))) + '\n')
+    with archive.ArchiveWriter(day_dir / f'aircraft_11{archive.archive_suffix}', batch_rows=1) as writer:
+        for second in (0, 5):
+            data = snapshot(datetime(2024, 5, 1, 11, 0, second))
+            # Riadky v tvare snapshot_rows loggera
+            rows = [{'capture_time': datetime.fromtimestamp(data['now']), 'source_id': 1, 'hex_code': ac['hex'],
+                     **{f'{key}_num': value for key, value in ac.items() if key in ('lat', 'lon', 'gs')}}
+                    for ac in data['aircraft']]
+            writer.append(rows)
+
+
+def test_replay_reads_json_and_columnar_archives(tmp_path):
+    write_backups(tmp_path)
+    files = list(feed_replay.archive_files(tmp_path))
+    assert [file.name for file in files] == ['aircraft_10.json', 'aircraft_11.agc']
+
+    snapshots = list(feed_replay.read_snapshots(files))
+    assert [datetime.fromtimestamp(data['now']) for data in snapshots] == [
+        datetime(2024, 5, 1, 10, 0, 0), datetime(2024, 5, 1, 10, 0, 5),
+        datetime(2024, 5, 1, 11, 0, 0), datetime(2024, 5, 1, 11, 0, 5)]
+    assert snapshots[2]['source_id'] == 1
+    assert snapshots[2]['aircraft'][0] == {'hex': 'a00001', 'lat': 48.5, 'lon': 21.2, 'gs': 210.5}
+
+
+def test_replay_time_range_applies_to_archives(tmp_path):
+    write_backups(tmp_path)
+    start, end = datetime(2024, 5, 1, 10, 0, 5), datetime(2024, 5, 1, 11, 0, 5)
+    snapshots = list(feed_replay.read_snapshots(feed_replay.archive_files(tmp_path, start, end), start, end))
+    assert [datetime.fromtimestamp(data['now']) for data in snapshots] == [
+        datetime(2024, 5, 1, 10, 0, 5), datetime(2024, 5, 1, 11, 0, 0)]
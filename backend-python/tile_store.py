@@ -0,0 +1,167 @@
+import os  # Importuje os modul na prácu so súborovým systémom
+import sqlite3  # Importuje sqlite3 na čítanie zbalených dlaždíc vo formáte MBTiles
+import threading  # Importuje threading pre zámok nad cache a spojenia pre jednotlivé vlákna
+import hashlib  # Importuje hashlib na výpočet ETag dlaždíc
+import time  # Importuje time pre interval kontroly zbalených súborov
+from collections import OrderedDict  # Importuje OrderedDict pre LRU cache dlaždíc
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: tile_store.py
+Čítanie heatmapových dlaždíc zo zbalených MBTiles súborov (jeden súbor na vrstvu) s LRU cache v pamäti
+"""
+
+# Základný adresár s dlaždicami
+# Vrstva <included>/res_<resolution>/<height> je v súbore <included>/res_<resolution>/<height>.mbtiles,
+# ak súbor neexistuje, dlaždice sa hľadajú v pôvodnej adresárovej štruktúre <height>/<z>/<x>/<y>.png
+tiles_folder = 'path/to/your/root/tiles/folder'
+
+# Maximálna veľkosť cache dlaždíc v bajtoch
+cache_max_bytes = 64 * 1024 * 1024
+
+# Odhad réžie jednej položky cache v bajtoch (obmedzuje aj počet záznamov o neexistujúcich dlaždiciach)
+entry_overhead = 128
+
+# LRU cache: kľúč dlaždice -> (dáta, etag), dáta None znamenajú neexistujúcu dlaždicu
+tile_cache = OrderedDict()
+cache_bytes = 0
+cache_lock = threading.Lock()
+
+# Počítadlá zásahov a výpadkov cache
+cache_stats = {"hits": 0, "misses": 0}
+
+# Interval v sekundách, po ktorom sa znovu overí MBTiles súbor vrstvy (nová vrstva alebo prebalený súbor)
+layer_check_interval = 10
+
+# Spojenia s MBTiles súbormi, každé vlákno má vlastné (sqlite spojenia sa medzi vláknami nezdieľajú)
+# kľúč vrstvy -> (spojenie alebo None, identita súboru, čas kontroly, generácia)
+thread_local = threading.local()
+
+# Generácia spojení, zvýšenie v clear_cache prinúti všetky vlákna otvoriť súbory znovu
+layer_generation = 0
+
+
+# Funkcia na zistenie identity súboru (inode a čas zmeny, None ak súbor neexistuje)
+def layer_identity(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+# Funkcia na získanie spojenia s MBTiles súborom vrstvy (None, ak vrstva nie je zbalená)
+def layer_connection(included, resolution, height):
+    connections = getattr(thread_local, "connections", None)
+    if connections is None:
+        connections = thread_local.connections = {}
+
+    key = (included, resolution, height)
+    now = time.monotonic()
+    generation = layer_generation
+    entry = connections.get(key)
+    if entry is not None and entry[3] == generation and now - entry[2] < layer_check_interval:
+        return entry[0]
+
+    # Súbor sa overí znovu: vrstva mohla byť medzitým zbalená alebo nahradená cez os.replace (nový inode)
+    path = os.path.join(tiles_folder, included, f'res_{resolution}', f'{height}.mbtiles')
+    identity = layer_identity(path)
+    if entry is not None and entry[3] == generation and entry[1] == identity:
+        connections[key] = (entry[0], identity, now, generation)
+        return entry[0]
+
+    if entry is not None and entry[0] is not None:
+        entry[0].close()
+    connection = None
+    if identity is not None:
+        connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+    connections[key] = (connection, identity, now, generation)
+    if entry is not None and entry[3] == generation:
+        # Zmenená vrstva: dlaždice z pôvodného súboru sa z cache odstránia
+        clear_layer(key)
+    return connection
+
+
+# Funkcia na načítanie dlaždice z úložiska (MBTiles alebo súbor)
+def read_tile(connection, included, resolution, height, z, x, y):
+    if connection is not None:
+        # MBTiles ukladá riadky v schéme TMS, URL používa schému XYZ
+        row = connection.execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+            (z, x, (1 << z) - 1 - y)).fetchone()
+        return bytes(row[0]) if row else None
+
+    path = os.path.join(tiles_folder, included, f'res_{resolution}', str(height), str(z), str(x), f'{y}.png')
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+# Funkcia na odhad veľkosti položky cache
+def entry_size(data):
+    return entry_overhead + (len(data) if data is not None else 0)
+
+
+# Funkcia na získanie dlaždice s využitím LRU cache
+def get_tile(included, resolution, height, z, x, y):
+    """
+    Získanie heatmapovej dlaždice
+    :return: Dvojica (dáta PNG, etag), alebo (None, None) ak dlaždica neexistuje
+    """
+    global cache_bytes
+    key = (included, resolution, height, z, x, y)
+    # Kontrola súboru vrstvy ešte pred cache, aby sa po prebalení neposielali dlaždice z pôvodného súboru
+    connection = layer_connection(included, resolution, height)
+    with cache_lock:
+        if key in tile_cache:
+            tile_cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return tile_cache[key]
+        cache_stats["misses"] += 1
+
+    data = read_tile(connection, included, resolution, height, z, x, y)
+    entry = (data, hashlib.md5(data).hexdigest() if data is not None else None)
+
+    with cache_lock:
+        if key not in tile_cache:
+            tile_cache[key] = entry
+            cache_bytes += entry_size(data)
+            while cache_bytes > cache_max_bytes and tile_cache:
+                _, (evicted, _) = tile_cache.popitem(last=False)
+                cache_bytes -= entry_size(evicted)
+    return entry
+
+
+# Funkcia na odstránenie dlaždíc jednej vrstvy z cache
+def clear_layer(layer_key):
+    global cache_bytes
+    with cache_lock:
+        for key in [key for key in tile_cache if key[:3] == layer_key]:
+            data, _ = tile_cache.pop(key)
+            cache_bytes -= entry_size(data)
+
+
+# Funkcia na vyprázdnenie cache a zatvorenie spojení so súbormi (napríklad po pregenerovaní dlaždíc)
+def clear_cache():
+    global cache_bytes, layer_generation
+    with cache_lock:
+        tile_cache.clear()
+        cache_bytes = 0
+        layer_generation += 1
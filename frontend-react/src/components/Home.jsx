@@ -26,7 +26,7 @@ import '../styles/Home.css'; // Importuje štýly pre Home komponent
 import Typography from '@mui/material/Typography'; // Importuje komponent Typography z Material-UI
 import Zone from "./Zone.jsx"; // Importuje komponent Zone
 import Heatmap from "./Heatmap.jsx"; // Importuje komponent Heatmap
-import { checkForBreaches, getAircraftData, getDroneData, checkDroneProximityToBreach } from "./ProcessData.jsx"; // Importuje funkcie na spracovanie dát
+import { checkForBreaches, getAircraftData, getDroneData, checkDroneProximityToBreach, subscribeToStream } from "./ProcessData.jsx"; // Importuje funkcie na spracovanie dát
 import BreachStatusComponent from "./BreachStatusComponent.jsx"; // Importuje komponent BreachStatusComponent
 import IcecastPlayer from "./IcecastPlayer.jsx"; // Importuje komponent IcecastPlayer
 import { calculateDistance } from "./Utils.jsx"; // Importuje funkciu calculateDistance
@@ -55,9 +55,12 @@ const Home = () => {
 
     const mapInstance = useRef(null); // Referencia na inštanciu mapy
 
+    // Prehliadač podporuje Server-Sent Events, lietadlá a narušenia potom posiela backend sám
+    const streamSupported = typeof window !== 'undefined' && 'EventSource' in window;
+
     // Wrapper na získanie dát o lietadlách a dronoch
     const getAircraftDataWrapper = useCallback(async () => {
-        const aircraft = await getAircraftData(); // Načíta dáta lietadiel
+        const aircraft = streamSupported ? null : await getAircraftData(); // Načíta dáta lietadiel, ak nejdú cez stream
         const drone = await getDroneData(); // Načíta dáta dronu
         if (aircraft) {
             setAircraftData(aircraft); // Nastaví stav s prijatými dátami
@@ -65,7 +68,7 @@ const Home = () => {
         if (drone) {
             setDroneData(drone); // Nastaví stav s prijatými dátami dronu
         }
-    }, []);
+    }, [streamSupported]);
 
     // Wrapper na kontrolu narušení
     const checkForBreachesWrapper = useCallback(async () => {
@@ -89,14 +92,31 @@ const Home = () => {
         };
     }, [getAircraftDataWrapper]);
 
-    // Hook na kontrolu narušení
+    // Hook na odber streamu lietadiel a narušení, pri zmene zóny alebo nastavení sa odber obnoví
+    useEffect(() => {
+        if (!streamSupported) {
+            return undefined;
+        }
+        const settings = {
+            flightRange: mapSettings.flightRange,
+            warningOverhead: mapSettings.warningOverhead,
+            duration: mapSettings.duration,
+            altitude: mapSettings.altitude
+        };
+        return subscribeToStream(settings, zoneData, setAircraftData, setBreachData); // Ukončí odber pri zmene
+    }, [streamSupported, zoneData, mapSettings.flightRange, mapSettings.warningOverhead, mapSettings.duration, mapSettings.altitude]);
+
+    // Hook na kontrolu narušení (len bez streamu)
     useEffect(() => {
+        if (streamSupported) {
+            return undefined;
+        }
         const intervalId = setInterval(checkForBreachesWrapper, 5000); // Nastaví interval na kontrolu narušení každých 5 sekúnd
 
         return () => {
             clearInterval(intervalId); // Vyčistí interval pri unmountingu komponentu
         };
-    }, [checkForBreachesWrapper]);
+    }, [streamSupported, checkForBreachesWrapper]);
 
     // Hook na aktualizáciu zóny a varovaní pri zmene dát dronu
     useEffect(() => {
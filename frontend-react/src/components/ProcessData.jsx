@@ -21,18 +21,36 @@ Funkcie na spracovávanie a komunikáciu s back-endom
 
 import {BackendIP, VerticalOverhead} from "./StaticSettings.jsx"; // Importuje BackendID a VerticalOverhead z modulu StaticSettings
 
-// Funkcia na získanie dát o lietadlách
+// Lokálna kópia posledného snímku pre rozdielové odpovede /data
+const polledAircraft = new Map();
+let polledVersion = null;
+
+// Funkcia na získanie dát o lietadlách (backend vracia len zmeny od poslednej prijatej verzie)
 export const getAircraftData = async () => {
     try {
-        const response = await fetch(`${BackendIP}/data`); // Vykonanie HTTP GET požiadavky na získanie dát o lietadlách
+        const query = polledVersion !== null ? `?since=${polledVersion}` : '?since=';
+        const response = await fetch(`${BackendIP}/data${query}`); // Vykonanie HTTP GET požiadavky na získanie dát o lietadlách
         if (!response.ok) {
             console.error(`HTTP error! Status: ${response.status}`);
+            polledVersion = null; // Po chybe sa vyžiada celý snímok
             return []; // Vrátenie prázdneho poľa v prípade chyby
         }
         const data = await response.json(); // Parsovanie odpovede ako JSON
-        return data.aircraft || []; // Vrátenie dát lietadiel alebo prázdneho poľa, ak sú dáta nedefinované
+        if (data.full || data.full === undefined) {
+            // Celý snímok nahradí lokálnu kópiu
+            polledAircraft.clear();
+            (data.aircraft || []).forEach(ac => polledAircraft.set(ac.hex, ac));
+        } else {
+            // Rozdiel pridá, nahradí a odstráni jednotlivé lietadlá
+            data.added.forEach(ac => polledAircraft.set(ac.hex, ac));
+            data.changed.forEach(ac => polledAircraft.set(ac.hex, ac));
+            data.removed.forEach(hex => polledAircraft.delete(hex));
+        }
+        polledVersion = data.version !== undefined ? data.version : null;
+        return Array.from(polledAircraft.values()); // Vrátenie dát lietadiel
     } catch (error) {
         console.error('Error during aircraft data fetch:', error); // Výpis chyby do konzoly
+        polledVersion = null; // Po chybe sa vyžiada celý snímok
         return []; // Vrátenie prázdneho poľa v prípade chyby
     }
 }
@@ -85,6 +103,55 @@ export const checkForBreaches = async (settings, zoneData) => {
     }
 };
 
+// Funkcia na odber streamu zmien lietadiel a narušení zóny, vracia funkciu na ukončenie odberu
+export const subscribeToStream = (settings, zoneData, onAircraft, onBreaches) => {
+    const params = new URLSearchParams();
+    if (zoneData && zoneData.lat && zoneData.lng) {
+        params.set('zoneData', JSON.stringify({ lat: zoneData.lat, lng: zoneData.lng })); // Stred zóny
+        params.set('settings', JSON.stringify({
+            flightRange: settings.flightRange,
+            warningOverhead: settings.warningOverhead,
+            duration: settings.duration,
+            altitude: settings.altitude
+        })); // Len nastavenia potrebné na výpočet narušení
+    }
+
+    const aircraftByHex = new Map(); // Lokálna kópia snímku, na ktorú sa aplikujú rozdiely
+    const source = new EventSource(`${BackendIP}/stream?${params.toString()}`);
+
+    // Celý snímok nahradí lokálnu kópiu
+    source.addEventListener('snapshot', (event) => {
+        const data = JSON.parse(event.data);
+        aircraftByHex.clear();
+        (data.aircraft || []).forEach(ac => aircraftByHex.set(ac.hex, ac));
+        onAircraft(Array.from(aircraftByHex.values()));
+    });
+
+    // Rozdiel pridá, nahradí a odstráni jednotlivé lietadlá
+    source.addEventListener('delta', (event) => {
+        const delta = JSON.parse(event.data);
+        delta.added.forEach(ac => aircraftByHex.set(ac.hex, ac));
+        delta.changed.forEach(ac => aircraftByHex.set(ac.hex, ac));
+        delta.removed.forEach(hex => aircraftByHex.delete(hex));
+        onAircraft(Array.from(aircraftByHex.values()));
+    });
+
+    source.addEventListener('breaches', (event) => {
+        onBreaches(JSON.parse(event.data).breaches || []);
+    });
+
+    // Zastaraný snímok sa nezobrazuje, rovnako ako pri chybe /data
+    source.addEventListener('stale', () => {
+        onAircraft([]);
+    });
+
+    source.onerror = (error) => {
+        console.error('Stream error, reconnecting:', error); // EventSource sa znovu pripojí automaticky
+    };
+
+    return () => source.close();
+};
+
 // Funkcia na kontrolu blízkosti dronu k narušeniu
 export const checkDroneProximityToBreach = (breaches, droneAltitude) => {
     const warnings = breaches.filter(breach => {
@@ -0,0 +1,194 @@
+import os  # Importuje os pre prácu so súborovým systémom
+import sys  # Importuje sys pre cesty k modulom back-endu a heatmapy
+import json  # Importuje json pre serializáciu snímkov a výsledkov
+import time  # Importuje time pre meranie času
+import argparse  # Importuje argparse pre parametre príkazového riadku
+import platform  # Importuje platform pre popis prostredia vo výsledkoch
+import statistics  # Importuje statistics pre medián a priemer meraní
+import subprocess  # Importuje subprocess pre zistenie aktuálneho commitu
+import tempfile  # Importuje tempfile pre dočasný adresár vykreslených heatmap
+import numpy as np  # Importuje numpy pre verziu vo výsledkoch
+from synthetic_data import synthetic_aircraft_json, synthetic_heatmap_grid  # Importuje generátory syntetických dát
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: run_benchmarks.py
+Benchmarky kontroly narušení zón, spracovania snímkov a vykresľovania heatmap nad syntetickými dátami,
+výsledky sa zapisujú do JSON súboru, ktorý sa dá porovnať s výsledkami iného commitu (--compare)
+"""
+
+repository_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(repository_root, 'backend-python'))
+sys.path.insert(0, os.path.join(repository_root, 'utilities', 'heatmap'))
+
+from check_breach import (check_aircraft_zone_violations, check_aircraft_zone_violations_scalar,  # noqa: E402
+                          check_multiple_zone_violations, check_aircraft_cpa, prepare_aircraft)
+
+# Predvolené veľkosti snímkov (počet lietadiel)
+default_sizes = [100, 1000, 5000, 20000, 50000]
+# Skalárna referenčná implementácia sa meria len do tejto veľkosti snímku
+scalar_max_size = 5000
+# Predvolené rozlíšenia heatmapy a hranice oblasti (rovnaké ako v generate_heatmaps_main.py)
+default_resolutions = [100, 250, 500]
+bounds = [(48.5, 49.5), (21.0, 22.0)]
+
+# Zóna a nastavenia používané v benchmarkoch kontroly narušení
+zone_info = {"lat": 48.66, "lng": 21.24}
+settings = {"flightRange": 500, "warningOverhead": 5, "duration": 5, "altitude": 120}
+# Počet zón pri dávkovej kontrole
+batch_zones = 10
+
+
+# Funkcia na opakované meranie času behu funkcie
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings)
+    }
+
+
+# Funkcia na zistenie aktuálneho commitu repozitára (None mimo git repozitára)
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=repository_root,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Benchmarky spracovania snímku a kontroly narušení pre jednu veľkosť snímku
+def breach_benchmarks(size, repeat, seed):
+    data = synthetic_aircraft_json(size, seed=seed)
+    encoded = json.dumps(data).encode()
+    zones = [{"zoneData": {"lat": zone_info["lat"] + 0.05 * i, "lng": zone_info["lng"] + 0.05 * i},
+              "settings": settings} for i in range(batch_zones)]
+
+    cases = {
+        # Dekódovanie aircraft.json tak, ako ho prijme poller
+        "snapshot_parse": lambda: json.loads(encoded),
+        # Prevod snímku na polia a priestorový index (raz pre každú verziu snímku)
+        "snapshot_prepare": lambda: prepare_aircraft(data),
+        # Kontrola jednej zóny bez cache (snímok sa spracuje pri každom volaní)
+        "breach_single_zone": lambda: check_aircraft_zone_violations(zone_info, settings, data),
+        # Kontrola viacerých zón v jednom prechode
+        f"breach_batch_{batch_zones}_zones": lambda: check_multiple_zone_violations(zones, data),
+        # Najbližšie priblíženie pre horizonty 1, 2 a 5 minút
+        "cpa_three_horizons": lambda: check_aircraft_cpa(zone_info, settings, data, horizons=[1, 2, 5])
+    }
+    if size <= scalar_max_size:
+        cases["breach_single_zone_scalar"] = lambda: check_aircraft_zone_violations_scalar(zone_info, settings, data)
+
+    results = []
+    for name, function in cases.items():
+        results.append({"name": name, "size": size, **measure(function, repeat)})
+        print(f"{name:<28} {size:>6} aircraft  median {results[-1]['median'] * 1000:9.2f} ms")
+    return results
+
+
+# Benchmarky vykreslenia heatmapy pre jedno rozlíšenie
+def heatmap_benchmarks(resolution, repeat, seed):
+    import matplotlib
+    matplotlib.use('Agg')  # Vykresľovanie bez grafického prostredia
+    from generate_heatmaps import plot_heatmap
+
+    df = synthetic_heatmap_grid(resolution, bounds, seed=seed)
+    max_alt = int(df['lowalt'].max())
+    cells = len(df.drop_duplicates(['lowlat', 'lowlon']))
+
+    # plot_heatmap zapisuje obrázky relatívne k pracovnému adresáru, beží preto v dočasnom adresári
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            timing = measure(lambda: plot_heatmap((df.copy(), max_alt, resolution, 'cumulative_agl', None, True,
+                                                   bounds)), repeat)
+        finally:
+            os.chdir(working_directory)
+
+    print(f"{'plot_heatmap':<28} res {resolution:>4} ({cells} cells)  median {timing['median']:9.2f} s")
+    return [{"name": "plot_heatmap", "size": resolution, "rows": len(df), "cells": cells, **timing}]
+
+
+# Funkcia na porovnanie výsledkov s výsledkami iného commitu
+def compare(results, baseline_path):
+    with open(baseline_path) as file:
+        baseline = {(entry["name"], entry["size"]): entry for entry in json.load(file)["results"]}
+
+    print(f"\nComparison with {baseline_path} (median, >1.00 = slower)")
+    for entry in results:
+        previous = baseline.get((entry["name"], entry["size"]))
+        if previous and previous["median"] > 0:
+            print(f"{entry['name']:<28} {entry['size']:>6}  {entry['median'] / previous['median']:6.2f}x")
+
+
+# Hlavný blok, ktorý sa vykoná pri spustení skriptu
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AeroGuardian benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=default_sizes, help="Počty lietadiel v snímke")
+    parser.add_argument('--resolutions', type=int, nargs='+', default=default_resolutions,
+                        help="Rozlíšenia heatmapy")
+    parser.add_argument('--repeat', type=int, default=5, help="Počet opakovaní merania")
+    parser.add_argument('--heatmap-repeat', type=int, default=1, help="Počet opakovaní vykreslenia heatmapy")
+    parser.add_argument('--seed', type=int, default=0, help="Semienko generátora syntetických dát")
+    parser.add_argument('--skip-heatmap', action='store_true', help="Vynechá benchmarky heatmapy")
+    parser.add_argument('--output', help="Výstupný JSON súbor (predvolene benchmark_results/<commit>.json)")
+    parser.add_argument('--compare', help="JSON súbor s výsledkami iného commitu na porovnanie")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = []
+    for size in args.sizes:
+        results.extend(breach_benchmarks(size, args.repeat, args.seed))
+
+    skipped = None
+    if not args.skip_heatmap:
+        try:
+            for resolution in args.resolutions:
+                results.extend(heatmap_benchmarks(resolution, args.heatmap_repeat, args.seed))
+        except ImportError as e:
+            # Závislosti heatmapy (pandas, matplotlib, shapely, psycopg2) nemusia byť nainštalované
+            skipped = f"heatmap benchmarks skipped: {e}"
+            print(skipped)
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "seed": args.seed,
+        "skipped": skipped,
+        "results": results
+    }
+
+    output = args.output or os.path.join('benchmark_results', f'{(commit or "unknown")[:12]}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
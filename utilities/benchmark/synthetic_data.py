@@ -0,0 +1,127 @@
+import random  # Importuje random pre reprodukovateľné náhodné dáta
+import numpy as np  # Importuje numpy pre generovanie mriežky heatmapy
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: synthetic_data.py
+Generátory syntetických dát pre benchmarky: snímky aircraft.json a DataFrame tabuliek heatmap_grid
+"""
+
+# Stred a rozptyl generovanej prevádzky v stupňoch (okolie LZKZ)
+center = (48.66, 21.24)
+spread = (2.0, 3.0)
+
+# Pravdepodobnosti chýbajúcich polí, približne podľa reálnych snímkov SkyAware
+# (časť lietadiel vysiela len Mode S bez polohy, rýchlosť a kurz chýbajú pri starých správach)
+missing_position = 0.15
+missing_velocity = 0.10
+missing_altitude = 0.05
+ground_fraction = 0.03
+missing_rate = 0.20
+missing_callsign = 0.25
+
+
+# Funkcia na vygenerovanie jedného záznamu lietadla vo formáte aircraft.json
+def synthetic_aircraft(rng, hex_code):
+    ac = {
+        "hex": hex_code,
+        "type": "adsb_icao",
+        "messages": rng.randint(1, 50000),
+        "seen": round(rng.uniform(0, 30), 1),
+        "rssi": round(rng.uniform(-35, -3), 1)
+    }
+    if rng.random() >= missing_callsign:
+        ac["flight"] = f"{rng.choice(['RYR', 'WZZ', 'AUA', 'LOT', 'DLH', 'TVS'])}{rng.randint(1, 9999):<5}"
+        ac["squawk"] = f"{rng.randint(0, 7777):04d}"
+        ac["category"] = rng.choice(['A1', 'A2', 'A3', 'A5'])
+
+    if rng.random() < ground_fraction:
+        ac["alt_baro"] = "ground"
+    elif rng.random() >= missing_altitude:
+        altitude = rng.randint(0, 40000) // 25 * 25
+        ac["alt_baro"] = altitude
+        ac["alt_geom"] = altitude + rng.randint(-300, 300) // 25 * 25
+        if rng.random() >= missing_rate:
+            ac["baro_rate"] = rng.choice([0, 0, 0, rng.randint(-3000, 3000) // 64 * 64])
+
+    if rng.random() >= missing_velocity:
+        ac["gs"] = round(rng.uniform(60, 520), 1)
+        if rng.random() < 0.9:
+            ac["track"] = round(rng.uniform(0, 360), 1)
+        else:
+            ac["nav_heading"] = round(rng.uniform(0, 360), 1)
+
+    if rng.random() >= missing_position:
+        ac["lat"] = round(center[0] + rng.gauss(0, spread[0] / 3), 6)
+        ac["lon"] = round(center[1] + rng.gauss(0, spread[1] / 3), 6)
+        ac["nic"] = 8
+        ac["seen_pos"] = round(rng.uniform(0, ac["seen"] + 1), 1)
+    return ac
+
+
+# Funkcia na vygenerovanie syntetického snímku aircraft.json
+def synthetic_aircraft_json(count, seed=0, now=1714669200.0):
+    """
+    Syntetický snímok vo formáte aircraft.json s realistickou riedkosťou polí
+    :param count: Počet lietadiel v snímke
+    :param seed: Semienko generátora, rovnaké semienko dáva rovnaký snímok
+    :param now: Hodnota kľúča 'now' snímku
+    :return: Dictionary vo formáte aircraft.json
+    """
+    rng = random.Random(seed)
+    hex_codes = rng.sample(range(0x100000, 0xFFFFFF), count)
+    return {
+        "now": now,
+        "messages": rng.randint(10 ** 6, 10 ** 8),
+        "aircraft": [synthetic_aircraft(rng, f"{hex_code:06x}") for hex_code in hex_codes]
+    }
+
+
+# Funkcia na vygenerovanie syntetického výsledku fetch_data pre tabuľku heatmap_grid
+def synthetic_heatmap_grid(resolution, bounds, max_alt=5000, step=50, occupancy=0.3, seed=0):
+    """
+    Syntetický DataFrame v tvare výstupu fetch_data z generate_heatmaps.py
+    :param resolution: Rozlíšenie mriežky (počet buniek na stupeň)
+    :param bounds: Geografické hranice [(min_lat, max_lat), (min_lon, max_lon)]
+    :param max_alt: Maximálna výška v metroch
+    :param step: Vertikálny krok v metroch
+    :param occupancy: Podiel buniek mriežky, v ktorých sa vyskytuje prevádzka
+    :param seed: Semienko generátora
+    :return: pandas DataFrame so stĺpcami lowlat, lowlon, lowalt, cumulative_agl
+    """
+    import pandas as pd  # pandas je potrebný len pre benchmarky heatmapy
+
+    rng = np.random.default_rng(seed)
+    lats = np.floor(np.arange(bounds[0][0], bounds[0][1], 1 / resolution) * resolution) / resolution
+    lons = np.floor(np.arange(bounds[1][0], bounds[1][1], 1 / resolution) * resolution) / resolution
+    cell_lat, cell_lon = np.meshgrid(lats, lons, indexing='ij')
+    occupied = rng.random(cell_lat.shape) < occupancy
+    cell_lat, cell_lon = cell_lat[occupied], cell_lon[occupied]
+
+    # Prevádzka je hustejšia v nižších výškach, každá bunka má niekoľko výškových vrstiev
+    layers = rng.integers(1, max(2, max_alt // step // 10), size=len(cell_lat))
+    lat_col = np.repeat(cell_lat, layers)
+    lon_col = np.repeat(cell_lon, layers)
+    alt_col = (rng.exponential(max_alt / 4, size=len(lat_col)) // step * step).clip(0, max_alt)
+    counts = rng.poisson(20, size=len(lat_col)) + 1
+
+    df = pd.DataFrame({"lowlat": lat_col, "lowlon": lon_col, "lowalt": alt_col, "countagl": counts})
+    df = df.groupby(['lowlat', 'lowlon', 'lowalt'], as_index=False)['countagl'].sum()
+    df = df.sort_values(['lowlat', 'lowlon', 'lowalt'])
+    df['cumulative_agl'] = df.groupby(['lowlat', 'lowlon'])['countagl'].cumsum()
+    return df.drop(columns='countagl').reset_index(drop=True)
@@ -2,6 +2,7 @@ from preparation_sql import run_parallel_preparation # Import skriptu na predspr
 from generate_heatmaps import generate_heatmaps # Import skriptu na generovanie máp výskytu
 from generate_tiles import generate_tiles_main # Import skriptu na generovanie dlaždíc
 from flip_images import flip_images # Import skriptu na obracanie dlaždíc
+from pack_tiles import pack_tiles # Import skriptu na zbalenie dlaždíc do MBTiles
 
 """
 Technická univerzita v Košiciach
@@ -53,6 +54,8 @@ if __name__ == '__main__':
     bounds = [(48.5, 49.5), (21.0, 22.0)]
     # Úrovne priblíženia pre generovanie dlaždíc
     zoom_levels = '7-16'
+    # Odstránenie PNG dlaždíc po ich overenom zbalení do MBTiles (predvolene sa ponechajú)
+    remove_source_tiles = False
 
     # Spustí paralelné spracovanie SQL príprav pre rôzne rozlíšenia
     run_parallel_preparation(connection_parameters, airport, resolutions, grid_height_resolution, max_height,
@@ -61,8 +64,10 @@ if __name__ == '__main__':
     # Generuje mapy výskytu prevádzky
     generate_heatmaps(connection_parameters, airport, resolutions, max_drawing_height, vertical_step, bounds, processes=2)
 
-    # Pre každé rozlíšenie generuje dlaždice a otáča obrázky
+    # Pre každé rozlíšenie generuje dlaždice, otáča obrázky a balí výškové vrstvy do MBTiles
     for resolution in resolutions:
         generate_tiles_main(resolution, bounds, zoom_levels)
         flip_images(f'tiles/airport_excluded/res_{resolution}/')
         flip_images(f'tiles/airport_included/res_{resolution}/')
+        pack_tiles(f'tiles/airport_excluded/res_{resolution}/', remove_source_tiles)
+        pack_tiles(f'tiles/airport_included/res_{resolution}/', remove_source_tiles)
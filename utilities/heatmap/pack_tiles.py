@@ -0,0 +1,125 @@
+import argparse  # Importuje argparse pre parametre príkazového riadku
+import os  # Importuje knižnicu os pre prácu so súborovým systémom
+import shutil  # Importuje shutil pre odstránenie zbalených adresárov s dlaždicami
+import sqlite3  # Importuje knižnicu sqlite3 pre zápis MBTiles súborov
+from multiprocessing import Pool, cpu_count  # Importuje Pool a cpu_count pre paralelné spracovanie
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: pack_tiles.py
+Skript na zbalenie vygenerovaných dlaždíc do MBTiles súborov (jeden súbor na výškovú vrstvu). S prepínačom
+--remove-source sa po overení zbaleného súboru pôvodný adresár s PNG dlaždicami vrstvy odstráni (inak zostávajú
+milióny malých súborov), predvolene sa PNG dlaždice ponechajú.
+"""
+
+
+# Funkcia na zbalenie jednej výškovej vrstvy <height>/<z>/<x>/<y>.png do súboru <height>.mbtiles
+def pack_layer(layer_info):
+    layer_directory, output_path, remove_source = layer_info
+    temporary_path = output_path + '.tmp'
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    conn = sqlite3.connect(temporary_path)
+    conn.executescript("""
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+    """)
+    conn.executemany("INSERT INTO metadata (name, value) VALUES (?, ?)", [
+        ('name', os.path.basename(layer_directory)),
+        ('format', 'png'),
+        ('type', 'overlay')
+    ])
+
+    count = 0
+    for z_name in os.listdir(layer_directory):
+        z_path = os.path.join(layer_directory, z_name)
+        if not z_name.isdigit() or not os.path.isdir(z_path):
+            continue
+        z = int(z_name)
+        for x_name in os.listdir(z_path):
+            x_path = os.path.join(z_path, x_name)
+            if not x_name.isdigit() or not os.path.isdir(x_path):
+                continue
+            rows = []
+            for file in os.listdir(x_path):
+                name, extension = os.path.splitext(file)
+                # Iné PNG súbory (napr. preview.png) nie sú dlaždice
+                if extension.lower() != '.png' or not name.isdigit():
+                    continue
+                y = int(name)
+                with open(os.path.join(x_path, file), 'rb') as tile:
+                    # Backend používa v URL schému XYZ, MBTiles ukladá riadky v schéme TMS
+                    rows.append((z, int(x_name), (1 << z) - 1 - y, tile.read()))
+            conn.executemany("INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)",
+                             rows)
+            count += len(rows)
+
+    conn.execute("CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(temporary_path, output_path)  # Atomické nahradenie, backend nikdy nečíta rozpracovaný súbor
+
+    # Adresár s PNG dlaždicami sa odstráni, len ak zbalený súbor obsahuje všetky dlaždice a je neporušený
+    if remove_source:
+        if verify_layer(output_path, count):
+            shutil.rmtree(layer_directory)
+        else:
+            print(f"Verification of {output_path} failed, keeping {layer_directory}.")
+    return count
+
+
+# Funkcia na overenie zbaleného súboru (kontrola integrity a počtu dlaždíc)
+def verify_layer(output_path, expected_count):
+    conn = sqlite3.connect(f'file:{output_path}?mode=ro', uri=True)
+    try:
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        count = conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+    return integrity == 'ok' and count == expected_count
+
+
+# Funkcia na zbalenie všetkých výškových vrstiev v zadanom adresári (napr. tiles/airport_excluded/res_1000/)
+# remove_source=True po overení odstráni pôvodné PNG dlaždice, predvolene sa ponechajú
+def pack_tiles(directory_to_process, remove_source=False):
+    layers = [(os.path.join(directory_to_process, name), os.path.join(directory_to_process, f'{name}.mbtiles'),
+               remove_source)
+              for name in os.listdir(directory_to_process)
+              if name.isdigit() and os.path.isdir(os.path.join(directory_to_process, name))]
+
+    print(f"Found {len(layers)} layers that need packing.")  # Výpis počtu nájdených vrstiev
+
+    # Paralelné balenie vrstiev pomocou Pool
+    with Pool(processes=cpu_count()) as pool:
+        counts = pool.map(pack_layer, layers)
+
+    print(f"Packed {sum(counts)} tiles.")  # Výpis počtu zbalených dlaždíc
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Zbalenie výškových vrstiev dlaždíc do MBTiles")
+    parser.add_argument('directory', help="Adresár s výškovými vrstvami (napr. tiles/airport_excluded/res_1000/)")
+    parser.add_argument('--remove-source', action='store_true',
+                        help="Po overení zbaleného súboru odstráni adresár s PNG dlaždicami vrstvy")
+    args = parser.parse_args()
+
+    pack_tiles(args.directory, args.remove_source)
@@ -48,6 +48,10 @@ def run_preparation_sql(connection_parameters, airport, resolution, grid_height_
     minlat, maxlat = bounds[0]
     minlon, maxlon = bounds[1]
 
+    # Mapy sa počítajú len z úplných dát aircraft_pointcloud. Minútové súhrny (aircraft_track_minute) majú
+    # priemernú polohu za minútu, čo by rozmazalo hustotu v bunkách mriežky, preto sa sem nepridávajú.
+    # Logger v oblasti bounds riadky nekomprimuje (compression_exclude_bounds v logger.py musí bounds pokrývať).
+
     # SQL skript na odstránenie starých tabuliek
     sql_script = f"""
     DROP TABLE IF EXISTS aircraft_pointcloud_grid_{airport}_{resolution};
@@ -95,20 +99,30 @@ def run_preparation_sql(connection_parameters, airport, resolution, grid_height_
         p.hex_code,
         floor(p.lat_num * {resolution}) / {resolution} AS lowlat,
         floor(p.lon_num * {resolution}) / {resolution} AS lowlon,
-        LEAST(8000, GREATEST(g.groundheight, COALESCE(p.alt_geom_num * 0.3048, p.alt_baro_num * 0.3048))) AS alt_msl,
-        GREATEST(0, LEAST({max_height}, COALESCE(p.alt_geom_num * 0.3048, p.alt_baro_num * 0.3048)) - g.groundheight) AS alt_agl
-    FROM
-        aircraft_pointcloud p
+        LEAST(8000, GREATEST(g.groundheight, p.alt_m)) AS alt_msl,
+        GREATEST(0, LEAST({max_height}, p.alt_m) - g.groundheight) AS alt_agl
+    FROM (
+        -- Typované stĺpce (DOUBLE PRECISION/REAL) sa čítajú priamo, výška v metroch sa počíta raz
+        SELECT
+            capture_time,
+            hex_code,
+            lat_num,
+            lon_num,
+            COALESCE(alt_geom_num, alt_baro_num) * 0.3048 AS alt_m
+        FROM
+            aircraft_pointcloud
+        WHERE
+            lat_num BETWEEN {minlat} AND {maxlat} AND
+            lon_num BETWEEN {minlon} AND {maxlon} AND
+            capture_time <= {max_capture_time}
+    ) p
     LEFT JOIN
         grid_ground_height_{airport}_{grid_height_resolution} g ON (
             floor(p.lat_num * {grid_height_resolution}) / {grid_height_resolution} = g.lowlat AND
             floor(p.lon_num * {grid_height_resolution}) / {grid_height_resolution} = g.lowlon
         )
     WHERE
-        p.lat_num BETWEEN {minlat} AND {maxlat} AND
-        p.lon_num BETWEEN {minlon} AND {maxlon} AND
-        p.capture_time <= {max_capture_time}
-        AND (COALESCE(p.alt_geom_num * 0.3048, p.alt_baro_num * 0.3048) <= 8000);
+        p.alt_m <= 8000;
     """
 
     # SQL skript na vkladanie dát do tabuľky heatmap_grid (nadmorská výška)
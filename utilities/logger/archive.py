@@ -0,0 +1,314 @@
+import json  # Importuje knižnicu json pre hlavičky dávok a textové stĺpce
+import zlib  # Importuje zlib pre kompresiu stĺpcov
+import struct  # Importuje struct pre dĺžku hlavičky dávky
+import math  # Importuje math pre kontrolu NaN
+import time  # Importuje time pre interval vyprázdnenia bufferu
+import logging  # Importuje logging pre logovanie
+import os  # Importuje os pre veľkosť a skrátenie archívneho súboru
+from array import array  # Importuje array pre kompaktné číselné stĺpce
+from datetime import datetime  # Importuje datetime pre prevod časov záznamov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: archive.py
+Komprimovaný stĺpcový archív záznamov loggera (jeden riadok na pozorovanie lietadla, rovnaké stĺpce ako
+aircraft_pointcloud). Súbor je postupnosť samostatných dávok: značka, dĺžka hlavičky, hlavička JSON
+(počet riadkov, časový rozsah, stĺpce) a komprimované stĺpce. Čítanie vynechá dávky mimo časového rozsahu
+a nedekomprimuje stĺpce, ktoré nie sú potrebné.
+"""
+
+# Značka začiatku dávky a prípona archívnych súborov
+batch_magic = b'AGC1'
+archive_suffix = '.agc'
+
+# Úroveň kompresie zlib (6 je rozumný kompromis medzi rýchlosťou a veľkosťou)
+compression_level = 6
+
+
+# Funkcia na určenie typu stĺpca (celé čísla bez prázdnych hodnôt ako int64, čísla ako float64, inak JSON)
+def column_kind(name, values):
+    if name == 'capture_time':
+        return 'time'
+    numbers = [value for value in values if value is not None]
+    if not numbers or any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in numbers):
+        return 'json'
+    if len(numbers) == len(values) and all(isinstance(value, int) for value in numbers):
+        return 'i8'
+    return 'f8'
+
+
+# Funkcia na zakódovanie stĺpca (bajty float64 sa preusporiadajú po rovinách, čo zlib komprimuje omnoho lepšie)
+def encode_column(kind, values):
+    if kind == 'json':
+        raw = json.dumps(values, separators=(',', ':')).encode()
+    elif kind == 'i8':
+        numbers = array('q', values).tobytes()
+        raw = b''.join(numbers[plane::8] for plane in range(8))
+    else:
+        if kind == 'time':
+            values = [value.timestamp() for value in values]
+        numbers = array('d', (math.nan if value is None else value for value in values)).tobytes()
+        raw = b''.join(numbers[plane::8] for plane in range(8))
+    return zlib.compress(raw, compression_level)
+
+
+# Funkcia na dekódovanie stĺpca
+def decode_column(kind, blob, rows):
+    raw = zlib.decompress(blob)
+    if kind == 'json':
+        return json.loads(raw)
+    numbers = bytearray(rows * 8)
+    for plane in range(8):
+        numbers[plane::8] = raw[plane * rows:(plane + 1) * rows]
+    if kind == 'i8':
+        return array('q', bytes(numbers)).tolist()
+    values = array('d', bytes(numbers)).tolist()
+    if kind == 'time':
+        return [datetime.fromtimestamp(value) for value in values]
+    return [None if math.isnan(value) else value for value in values]
+
+
+# Funkcia na zakódovanie dávky riadkov do jedného rámca
+def encode_batch(rows):
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    header_columns = []
+    blobs = []
+    for name in columns:
+        values = [row.get(name) for row in rows]
+        kind = column_kind(name, values)
+        blob = encode_column(kind, values)
+        header_columns.append([name, kind, len(blob)])
+        blobs.append(blob)
+
+    times = [row['capture_time'].timestamp() for row in rows]
+    header = json.dumps({"rows": len(rows), "start": min(times), "end": max(times),
+                         "columns": header_columns}, separators=(',', ':')).encode()
+    return batch_magic + struct.pack('<I', len(header)) + header + b''.join(blobs)
+
+
+# Trieda na bufferovaný zápis hodinového archívu (dávka sa zapíše po batch_rows riadkoch alebo flush_interval)
+class ArchiveWriter:
+    def __init__(self, path, batch_rows=20000, flush_interval=60):
+        """
+        Zapisovač stĺpcového archívu
+        :param path: Cesta k archívnemu súboru (existujúci súbor sa doplní o ďalšie dávky)
+        :param batch_rows: Počet riadkov, po ktorom sa dávka zapíše
+        :param flush_interval: Najdlhší čas v sekundách, počas ktorého riadky čakajú v bufferi
+        """
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.rows = []
+        self.flushed_at = time.monotonic()
+        # Neúplná dávka po páde sa odstráni, inak by sa nové dávky zapísali za ňu a čítanie by ich nenašlo
+        if self.path.exists():
+            truncate_partial_frame(self.path)
+
+    # Pridanie riadkov (rovnaké dictionary ako pre insert_rows loggera)
+    def append(self, rows):
+        self.rows.extend(rows)
+        if len(self.rows) >= self.batch_rows or time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    # Zápis bufferovaných riadkov ako jednej dávky
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        if not self.rows:
+            return
+        frame = encode_batch(self.rows)
+        with open(self.path, 'ab') as file:
+            file.write(frame)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Funkcia na zistenie dĺžky platnej časti archívu (koniec poslednej úplnej dávky)
+def valid_length(path):
+    with open(path, 'rb') as file:
+        end = 0
+        while True:
+            prefix = file.read(8)
+            if len(prefix) < 8 or prefix[:4] != batch_magic:
+                return end
+            header_bytes = file.read(struct.unpack('<I', prefix[4:])[0])
+            try:
+                header = json.loads(header_bytes)
+                length = sum(column_length for _, _, column_length in header["columns"])
+            except (ValueError, KeyError, TypeError):
+                return end
+            frame_end = file.tell() + length
+            if frame_end > os.fstat(file.fileno()).st_size:
+                return end
+            file.seek(frame_end)
+            end = frame_end
+
+
+# Funkcia na odrezanie neúplnej dávky na konci archívu (napríklad po páde loggera počas zápisu)
+def truncate_partial_frame(path):
+    length = valid_length(path)
+    size = os.path.getsize(path)
+    if length < size:
+        logging.warning(f"Truncating {size - length} bytes of an incomplete batch at the end of {path}")
+        with open(path, 'r+b') as file:
+            file.truncate(length)
+    return length
+
+
+# Funkcia na nájdenie začiatku ďalšej dávky od danej pozície (None, ak už žiadna nie je)
+def find_next_frame(file, position):
+    chunk_size = 1 << 16
+    while True:
+        file.seek(position)
+        chunk = file.read(chunk_size + len(batch_magic) - 1)
+        if len(chunk) < len(batch_magic):
+            return None
+        index = chunk.find(batch_magic)
+        if index >= 0:
+            return position + index
+        position += chunk_size
+
+
+# Funkcia na postupné čítanie dávok archívu aj s pozíciou konca dávky v súbore (pre pokračovanie od pozície)
+# Poškodená dávka uprostred súboru sa preskočí a čítanie pokračuje od ďalšej značky dávky
+def read_frames(path, columns=None, start=None, end=None, offset=0):
+    """
+    Čítanie archívu po dávkach s projekciou stĺpcov a filtrom časového rozsahu
+    :param path: Cesta k archívnemu súboru
+    :param columns: Voliteľný zoznam stĺpcov (capture_time sa načíta vždy kvôli filtru)
+    :param start: Voliteľný začiatok (datetime, vrátane)
+    :param end: Voliteľný koniec (datetime, bez tohto času)
+    :param offset: Pozícia začiatku dávky v súbore, od ktorej sa číta
+    :return: Generátor dvojíc (pozícia konca dávky, dictionary stĺpec -> zoznam hodnôt)
+    """
+    start_ts = start.timestamp() if start is not None else None
+    end_ts = end.timestamp() if end is not None else None
+    wanted = None if columns is None else set(columns) | {'capture_time'}
+
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        position = offset
+        while position < size:
+            file.seek(position)
+            try:
+                frame_end, batch = read_frame(file, size, wanted, start_ts, end_ts)
+            except (ValueError, KeyError, TypeError, IndexError, struct.error, zlib.error) as e:
+                # Neúplná alebo poškodená dávka (napríklad po páde loggera počas zápisu)
+                next_frame = find_next_frame(file, position + 1)
+                logging.warning(f"Truncated or invalid batch at byte {position} in {path}: {e}"
+                                + (f", resuming at byte {next_frame}" if next_frame is not None else ""))
+                if next_frame is None:
+                    return
+                position = next_frame
+                continue
+            position = frame_end
+            if batch is None:
+                # Dávka mimo časového rozsahu sa preskočí bez dekompresie
+                continue
+
+            if start_ts is not None or end_ts is not None:
+                keep = [index for index, capture_time in enumerate(batch['capture_time'])
+                        if (start is None or capture_time >= start) and (end is None or capture_time < end)]
+                if len(keep) < len(batch['capture_time']):
+                    batch = {name: [values[index] for index in keep] for name, values in batch.items()}
+            yield frame_end, batch
+
+
+# Funkcia na načítanie jednej dávky od aktuálnej pozície (dávka None, ak je mimo časového rozsahu)
+def read_frame(file, size, wanted, start_ts, end_ts):
+    prefix = file.read(8)
+    if len(prefix) < 8 or prefix[:4] != batch_magic:
+        raise ValueError("missing batch marker")
+    header = json.loads(file.read(struct.unpack('<I', prefix[4:])[0]))
+    rows = header["rows"]
+    frame_end = file.tell() + sum(length for _, _, length in header["columns"])
+    if frame_end > size:
+        raise ValueError("batch extends past the end of the file")
+    if (start_ts is not None and header["end"] < start_ts) or (end_ts is not None and header["start"] >= end_ts):
+        return frame_end, None
+
+    batch = {}
+    for name, kind, length in header["columns"]:
+        if wanted is not None and name not in wanted:
+            file.seek(length, 1)
+            continue
+        batch[name] = decode_column(kind, file.read(length), rows)
+        if len(batch[name]) != rows:
+            raise ValueError(f"column {name} has {len(batch[name])} values instead of {rows}")
+    for name in wanted or ():
+        batch.setdefault(name, [None] * rows)
+    return frame_end, batch
+
+
+# Funkcia na postupné čítanie dávok archívu ako stĺpcov (stĺpec -> zoznam hodnôt)
+def read_batches(path, columns=None, start=None, end=None):
+    for _, batch in read_frames(path, columns, start, end):
+        if batch['capture_time']:
+            yield batch
+
+
+# Funkcia na prevod dávky stĺpcov na riadky (prázdne hodnoty sa vynechajú)
+def batch_rows(batch):
+    names = list(batch)
+    return [{name: value for name, value in zip(names, values) if value is not None}
+            for values in zip(*(batch[name] for name in names))]
+
+
+# Funkcia na postupné čítanie archívu po riadkoch (dictionary ako z funkcie snapshot_rows loggera)
+def read_rows(path, columns=None, start=None, end=None):
+    for batch in read_batches(path, columns, start, end):
+        yield from batch_rows(batch)
+
+
+# Funkcia na zloženie snímkov aircraft.json z riadkov archívu (riadky jedného snímku idú za sebou)
+def read_snapshots(path, start=None, end=None):
+    snapshot = None
+    for row in read_rows(path, start=start, end=end):
+        key = (row.get('source_id'), row['capture_time'])
+        if snapshot is None or key != (snapshot.get('source_id'), snapshot['capture_time']):
+            if snapshot is not None:
+                yield {"now": snapshot['capture_time'].timestamp(), "source_id": snapshot.get('source_id'),
+                       "aircraft": snapshot['aircraft']}
+            snapshot = {'source_id': row.get('source_id'), 'capture_time': row['capture_time'], 'aircraft': []}
+        snapshot['aircraft'].append(row_aircraft(row))
+    if snapshot is not None:
+        yield {"now": snapshot['capture_time'].timestamp(), "source_id": snapshot.get('source_id'),
+               "aircraft": snapshot['aircraft']}
+
+
+# Funkcia na prevod riadku archívu späť na záznam lietadla v tvare aircraft.json
+def row_aircraft(row):
+    aircraft = {'hex': row['hex_code']}
+    for name, value in row.items():
+        if name in ('capture_time', 'source_id', 'hex_code', 'on_ground', 'extra'):
+            continue
+        if name.endswith('_num'):
+            name = name[:-4]
+            if row.get('on_ground') and name in ('alt_baro', 'alt_geom') and value == 0:
+                value = 'ground'
+        aircraft[name] = value
+    aircraft.update(row.get('extra') or {})
+    return aircraft
@@ -1,10 +1,14 @@
+import argparse  # Importuje argparse pre parametre príkazového riadku
 import json  # Importuje knižnicu json pre prácu s JSON súbormi
 import psycopg2  # Importuje knižnicu psycopg2 pre prácu s PostgreSQL
-from psycopg2.extensions import AsIs  # Importuje AsIs pre bezpečné vkladanie názvov stĺpcov
 from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
 from datetime import datetime  # Importuje datetime pre prácu s dátumom a časom
+import time  # Importuje time pre meranie trvania
 import logging  # Importuje logging pre logovanie
-from concurrent.futures import ThreadPoolExecutor  # Importuje ThreadPoolExecutor pre paralelné spracovanie
+from multiprocessing import Pool  # Importuje Pool pre paralelné spracovanie v samostatných procesoch
+from logger import snapshot_rows, insert_rows  # Importuje prevod snímku na typované riadky a hromadný zápis z loggera
+from archive import read_frames, batch_rows, archive_suffix  # Importuje čítanie komprimovaného stĺpcového archívu
+from partition_manager import create_partition, partition_name  # Importuje vytváranie denných partícií
 
 """
 Technická univerzita v Košiciach
@@ -24,128 +28,218 @@ doc. Ing. Peter Papcun, PhD.
 
 """
 Súbor: json_to_postgre.py
-Skript na presun dát z uložených aircraft.json súborov do PostgreSQL
+Skript na presun dát zo záloh loggera (BASE_DIR/<YYYYMMDD>/aircraft_<HH>.json alebo .agc) do PostgreSQL.
+Súbory sa čítajú postupne (JSON po riadkoch, archív po dávkach), spracúvajú ich samostatné procesy s vlastným
+spojením a zápis ide cez COPY. Pozícia v každom súbore sa ukladá do tabuľky backfill_checkpoints v tej istej
+transakcii ako dáta, takže prerušený presun pokračuje presne tam, kde skončil.
 """
 
 # Konfigurácia logovania
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Parametre pripojenia k databáze
+connection_parameters = {
+    "host": "your_postgre_ip",  # IP adresa PostgreSQL servera
+    "port": "your_postgre_port",  # Port PostgreSQL servera
+    "database": "your_postgre_database_name",  # Názov databázy
+    "user": "your_postgre_username",  # Používateľské meno
+    "password": "your_postgre_password"  # Heslo
+}
+
+# Počet riadkov, po ktorých sa dávka zapíše a potvrdí spolu s pozíciou v súbore
+batch_rows_limit = 50000
+
+# Tabuľka s pozíciou spracovania každého súboru
+checkpoint_table = """
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    file_path TEXT PRIMARY KEY,
+    byte_offset BIGINT NOT NULL,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()
+);
+"""
 
-# Funkcia na vytvorenie dennej partície v databáze
-def create_daily_partition(conn, date_str):
-    partition_name = f"aircraft_pointcloud_{date_str}"
+# Spojenie s databázou a už overené partície v procese pracovníka
+worker_conn = None
+worker_partitions = set()
+
+
+# Funkcia na nájdenie súborov záloh v časovom poradí
+def backup_files(base_path):
+    files = [file for file in Path(base_path).rglob('aircraft_*') if file.suffix in ('.json', archive_suffix)]
+    return sorted(files)
+
+
+# Funkcia na načítanie uložených pozícií (cesta -> pozícia v bajtoch)
+def load_checkpoints(conn):
+    with conn.cursor() as cur:
+        cur.execute(checkpoint_table)
+        cur.execute("SELECT file_path, byte_offset FROM backfill_checkpoints;")
+        checkpoints = dict(cur.fetchall())
+    conn.commit()
+    return checkpoints
+
+
+# Funkcia na postupné čítanie snímkov z JSON súboru po riadkoch (dávky riadkov s pozíciou konca)
+def json_batches(path, offset):
+    rows = []
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        while True:
+            line = file.readline()
+            if not line:
+                break
+            if not line.endswith(b'\n'):
+                # Neúplný posledný riadok (logger práve zapisuje), spracuje sa pri ďalšom spustení
+                break
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                logging.warning(f"Skipping invalid line at byte {offset - len(line)} in {path}")
+                continue
+            if data.get("source_id") is None:
+                logging.warning(f"Skipping snapshot without source_id at byte {offset - len(line)} in {path}")
+                continue
+            rows.extend(snapshot_rows(data, data["source_id"]))
+            if len(rows) >= batch_rows_limit:
+                yield offset, rows
+                rows = []
+    yield offset, rows
+
+
+# Funkcia na postupné čítanie archívu po dávkach (dávky riadkov s pozíciou konca)
+def archive_batches(path, offset):
+    rows = []
+    for offset, batch in read_frames(path, offset=offset):
+        rows.extend(batch_rows(batch))
+        if len(rows) >= batch_rows_limit:
+            yield offset, rows
+            rows = []
+    yield offset, rows
+
+
+# Inicializácia procesu pracovníka (každý proces má vlastné spojenie)
+# Zlyhanie inicializácie by Pool opakoval donekonečna, spojenie sa preto otvorí znovu pri prvom súbore
+def init_worker():
+    global worker_conn
     try:
-        with conn.cursor() as cur:
-            cur.execute(f"""
-                CREATE TABLE IF NOT EXISTS {partition_name}
-                PARTITION OF aircraft_pointcloud
-                FOR VALUES FROM (%s) TO (%s);
-            """, (f'{date_str} 00:00:00', f'{date_str} 23:59:59'))
-            conn.commit()
-        logging.info(f"Partition {partition_name} created or verified.")
-    except Exception as e:
-        logging.error(f"Failed to create partition {partition_name}: {e}")
+        worker_conn = psycopg2.connect(**connection_parameters)
+    except psycopg2.Error as e:
+        logging.warning(f"Worker could not connect to the database: {e}")
+        worker_conn = None
 
 
-# Funkcia na získanie existujúcich stĺpcov v databáze
-def fetch_existing_columns(conn):
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name='aircraft_pointcloud';")
-            return {row[0] for row in cur.fetchall()}
-    except Exception as e:
-        logging.error(f"Failed to fetch existing columns: {e}")
-        return set()
+# Funkcia na získanie spojenia pracovníka (zatvorené alebo chýbajúce spojenie sa otvorí znovu)
+def worker_connection():
+    global worker_conn
+    if worker_conn is None or worker_conn.closed:
+        worker_conn = psycopg2.connect(**connection_parameters)
+    return worker_conn
 
 
-# Funkcia na pridanie nového stĺpca, ak neexistuje
-def add_column_if_not_exists(conn, existing_columns, column_name):
-    if column_name not in existing_columns:
+# Funkcia na zrušenie transakcie po chybe (ak spojenie zlyhalo, zatvorí sa a pri ďalšom súbore sa otvorí nové)
+def reset_worker_connection():
+    global worker_conn
+    if worker_conn is None:
+        return
+    try:
+        worker_conn.rollback()
+    except psycopg2.Error as e:
+        logging.warning(f"Rollback failed, reconnecting: {e}")
         try:
-            with conn.cursor() as cur:
-                cur.execute(f"ALTER TABLE aircraft_pointcloud ADD COLUMN {column_name} TEXT;")
-                existing_columns.add(column_name)
-                conn.commit()
-            logging.info(f"Added new column '{column_name}'.")
-        except Exception as e:
-            logging.error(f"Failed to add column '{column_name}': {e}")
-
-
-# Funkcia na spracovanie jednotlivého súboru
-def process_file(file_path, conn, existing_columns, date_str):
-    logging.info(f"Processing file: {file_path}")
-    partition_name = f"aircraft_pointcloud_{date_str.replace('-', '')}"  # Predpokladá, že date_str je vo formáte 'YYYY-MM-DD'
-
+            worker_conn.close()
+        except psycopg2.Error:
+            pass
+        worker_conn = None
+
+
+# Funkcia na zápis dávky a pozície v súbore v jednej transakcii
+def write_batch(conn, path, offset, rows):
+    # Riadky sa rozdelia podľa dennej partície podľa času záznamu
+    partitions = {}
+    for row in rows:
+        partitions.setdefault(row['capture_time'].date(), []).append(row)
+    for day in partitions:
+        if day not in worker_partitions and create_partition(conn, day):
+            worker_partitions.add(day)
+
+    inserted = 0
+    with conn.cursor() as cur:
+        for day, day_rows in partitions.items():
+            inserted += insert_rows(cur, partition_name(day), day_rows)
+        cur.execute("""
+            INSERT INTO backfill_checkpoints (file_path, byte_offset, updated_at) VALUES (%s, %s, now())
+            ON CONFLICT (file_path) DO UPDATE SET byte_offset = EXCLUDED.byte_offset, updated_at = now();
+        """, (str(path), offset))
+    conn.commit()
+    return inserted
+
+
+# Funkcia na spracovanie jedného súboru od uloženej pozície (beží v procese pracovníka)
+def process_file(task):
+    path, offset = task
+    started = time.perf_counter()
+    batches = archive_batches if path.suffix == archive_suffix else json_batches
+    inserted = 0
     try:
-        with open(file_path, 'r') as file:
-            data = json.load(file)  # Načíta dáta zo súboru
-        capture_time = datetime.fromtimestamp(data["now"])  # Konvertuje čas zachytenia na datetime
-
-        for aircraft in data.get("aircraft", []):
-            columns = ['capture_time', 'hex_code']
-            values = [capture_time, aircraft.get("hex", "unknown")]
-            for key, value in aircraft.items():
-                if key not in ['hex', 'capture_time']:  # Vylúči kľúče, ktoré sú primárne kľúče
-                    if key not in existing_columns:
-                        add_column_if_not_exists(conn, existing_columns, key)  # Pridá nový stĺpec, ak neexistuje
-                    columns.append(key)
-                    values.append(value)
-
-            insert_query = f"INSERT INTO {partition_name} ({', '.join(columns)}) VALUES ({', '.join(['%s']*len(values))}) ON CONFLICT (capture_time, hex_code) DO NOTHING;"
-            with conn.cursor() as cur:
-                cur.execute(insert_query, tuple(values))  # Vykoná dotaz na vloženie dát
-            conn.commit()
+        conn = worker_connection()
+        for end_offset, rows in batches(path, offset):
+            inserted += write_batch(conn, path, end_offset, rows)
     except Exception as e:
-        logging.error(f"Failed to process file {file_path}: {e}")
-
-
-# Funkcia na spracovanie súborov v hodinovom adresári
-def process_hour(directory_path, conn, existing_columns, date_str):
-    files = list(Path(directory_path).glob('aircraft_*.json'))  # Získanie zoznamu JSON súborov
-    if not files:
-        logging.info(f"No files to process in {directory_path}")
-    for file in files:
-        process_file(file, conn, existing_columns, date_str)  # Spracovanie každého súboru
-
-
-# Funkcia na spracovanie súborov za celý deň
-def process_day(directory_path):
-    date_str = Path(directory_path).name  # Predpokladá, že názov adresára je vo formáte 'YYYY-MM-DD'
-    logging.info(f"Processing day: {date_str}")
-    conn = psycopg2.connect(**connection_parameters)  # Spojenie s databázou
-    create_daily_partition(conn, date_str)  # Vytvorenie dennej partície
-    existing_columns = fetch_existing_columns(conn)  # Získanie existujúcich stĺpcov
-
+        logging.error(f"Failed to process file {path}: {e}")
+        # Chyba pri rollbacku nesmie ukončiť proces pracovníka (imap_unordered by spadol)
+        reset_worker_connection()
+        return path, None
+    logging.info(f"Processed {path}: {inserted} rows in {time.perf_counter() - started:.1f} s")
+    return path, inserted
+
+
+# Funkcia na spracovanie všetkých súborov záloh
+def process_directory(base_path, processes=None):
+    """
+    Presun záloh loggera do databázy
+    :param base_path: Základný adresár záloh (BASE_DIR loggera)
+    :param processes: Počet procesov pracovníkov (predvolene počet jadier)
+    """
+    logging.info(f"Starting processing in base directory: {base_path}")
+    conn = psycopg2.connect(**connection_parameters)
     try:
-        with ThreadPoolExecutor() as executor:
-            for hour_directory in Path(directory_path).iterdir():
-                if hour_directory.is_dir():
-                    logging.info(f"Processing hour directory: {hour_directory}")
-                    executor.submit(process_hour, hour_directory, conn, existing_columns, date_str)  # Paralelné spracovanie hodinových adresárov
-    except Exception as e:
-        logging.error(f"Error processing day {date_str}: {e}")
+        checkpoints = load_checkpoints(conn)
+
+        # Súbory spracované až po koniec sa preskočia, rozpracované pokračujú od uloženej pozície
+        tasks = []
+        for file in backup_files(base_path):
+            offset = checkpoints.get(str(file), 0)
+            if offset < file.stat().st_size:
+                tasks.append((file, offset))
+
+        # Partície pre dni podľa názvov adresárov sa vytvoria vopred, aby ich procesy nevytvárali súbežne
+        for day_name in sorted({file.parent.name for file, _ in tasks}):
+            try:
+                create_partition(conn, datetime.strptime(day_name, '%Y%m%d').date())
+            except ValueError:
+                continue
     finally:
-        conn.close()  # Zatvorenie spojenia s databázou
+        conn.close()
 
+    logging.info(f"{len(tasks)} files to process.")
+    failed = 0
+    total = 0
+    with Pool(processes=processes, initializer=init_worker) as pool:
+        for path, inserted in pool.imap_unordered(process_file, tasks):
+            if inserted is None:
+                failed += 1
+            else:
+                total += inserted
+    logging.info(f"Finished processing all files: {total} rows inserted, {failed} files failed.")
 
-# Funkcia na spracovanie všetkých denných adresárov
-def process_directory(base_path):
-    path = Path(base_path)
-    logging.info(f"Starting processing in base directory: {path}")
-    with ThreadPoolExecutor() as executor:
-        for day_directory in path.iterdir():
-            if day_directory.is_dir() and day_directory.name.isdigit():  # Kontrola, či je adresár a má názov vo formáte 'YYYYMMDD'
-                logging.info(f"Scheduling day directory for processing: {day_directory}")
-                executor.submit(process_day, day_directory)  # Paralelné spracovanie denných adresárov
-    logging.info("Finished processing all directories.")
 
 if __name__ == '__main__':
-    # Príklad použitia
-    connection_parameters = {
-        "host": "your_postgre_ip",  # IP adresa PostgreSQL servera
-        "port": "your_postgre_port",  # Port PostgreSQL servera
-        "database": "your_postgre_database_name",  # Názov databázy
-        "user": "your_postgre_username",  # Používateľské meno
-        "password": "your_postgre_password"  # Heslo
-    }
-    process_directory('/path/to/your/aircraft_json/directory')  # Spustenie spracovania adresára
+    parser = argparse.ArgumentParser(description="Presun záloh loggera do PostgreSQL")
+    parser.add_argument('base_path', help="Základný adresár záloh (BASE_DIR loggera)")
+    parser.add_argument('--processes', type=int, default=None, help="Počet procesov (predvolene počet jadier)")
+    args = parser.parse_args()
+
+    process_directory(args.base_path, args.processes)
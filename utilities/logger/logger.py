@@ -1,10 +1,19 @@
 import requests  # Importuje knižnicu requests pre HTTP požiadavky
 import json  # Importuje knižnicu json pre prácu s JSON súbormi
 import psycopg2  # Importuje knižnicu psycopg2 pre prácu s PostgreSQL
+from psycopg2 import errorcodes  # Importuje kódy chýb PostgreSQL pre rozlíšenie chýb schémy a dát
 from datetime import datetime, timedelta  # Importuje datetime a timedelta pre prácu s dátumom a časom
 import time  # Importuje knižnicu time pre časové operácie
 import logging  # Importuje logging pre logovanie
+import io  # Importuje io pre textový buffer príkazu COPY
+import math  # Importuje math pre zarovnanie časov na absolútne značky
+import queue  # Importuje queue pre ohraničenú frontu medzi načítaním a zápisom
+import threading  # Importuje threading pre zápis do databázy na pozadí
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # Importuje pool vlákien pre súbežné načítanie zdrojov
+from requests.adapters import HTTPAdapter  # Importuje HTTPAdapter pre zdieľaný pool keep-alive spojení
 from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+from archive import ArchiveWriter, archive_suffix  # Importuje zapisovač komprimovaného stĺpcového archívu
+from partition_manager import create_partition, ensure_partitions, partition_name, repair_partition_bounds  # Importuje správu denných partícií
 
 """
 Technická univerzita v Košiciach
@@ -39,24 +48,55 @@ connection_parameters = {
 # Základný adresár pre ukladanie JSON záloh
 BASE_DIR = Path('/path/to/save/JSON/backups')
 
-# Nastavenie denného režimu (hodiny od-do vrátane)
-day = (6, 21)
-
-
-# Funkcia na vytvorenie dennej partície v databáze
-def create_daily_partition(conn, date_str):
-    partition_name = f"aircraft_pointcloud_{date_str}"
-    try:
-        with conn.cursor() as cur:
-            cur.execute(f"""
-                CREATE TABLE IF NOT EXISTS {partition_name}
-                PARTITION OF aircraft_pointcloud
-                FOR VALUES FROM (%s) TO (%s);
-            """, (f'{date_str} 00:00:00', f'{date_str} 23:59:59'))
-            conn.commit()
-        logging.info(f"Partition {partition_name} created or verified.")
-    except Exception as e:
-        logging.error(f"Failed to create partition {partition_name}: {e}")
+# Formát hodinových záloh: "columnar" (komprimovaný stĺpcový archív .agc, modul archive.py, menší a rýchlejší
+# na čítanie) alebo "json" (pôvodný riadok JSON na snímok), oba formáty čítajú feed_replay.py aj json_to_postgre.py
+archive_format = "columnar"
+
+# Adaptívne načítanie: interval každého zdroja sa určuje podľa prevádzky v jeho poslednom snímku
+# Hranice intervalu v sekundách (najkratší pri hustej prevádzke, najdlhší pri prázdnej oblohe)
+poll_interval_bounds = (2, 30)
+# Počet lietadiel so zmenenou polohou, pri ktorom sa dosiahne najkratší interval
+traffic_reference = 20
+# Násobok, o ktorý sa interval najviac predĺži po jednom načítaní (zrýchlenie je okamžité)
+interval_growth = 1.5
+# Oblasti záujmu (napríklad letiská), lietadlo v oblasti vynúti najkratší interval: lat, lon, polomer v metroch
+areas_of_interest = [
+    # {"lat": 48.6631, "lon": 21.2411, "radius": 15000},  # Letisko Košice
+]
+
+# Časový limit HTTP požiadavky na zdroj v sekundách (pripojenie, čítanie)
+request_timeout = (3.05, 5)
+# Maximálny počet súbežne načítaných zdrojov (a veľkosť poolu spojení)
+max_workers = 8
+# Maximálny odstup medzi pokusmi o načítanie nedostupného zdroja v sekundách
+backoff_max = 300
+
+# Kompresia stopy (dead-band): riadok sa do databázy zapíše, len ak sa stav lietadla zmenil o viac ako tolerancia
+# alebo od posledného zapísaného riadku uplynul keep_alive, JSON zálohy ostávajú úplné
+compression_enabled = False
+compression_tolerances = {
+    "position": 25,  # Posun polohy v metroch
+    "altitude": 100,  # Zmena výšky v stopách
+    "speed": 5,  # Zmena rýchlosti v uzloch
+    "heading": 5,  # Zmena kurzu v stupňoch
+    "keep_alive": 60  # Maximálny čas medzi zapísanými riadkami lietadla v sekundách
+}
+# Stav lietadla, ktoré sa neozvalo dlhšie ako tento čas v sekundách, sa zabudne
+compression_state_ttl = 600
+# Oblasti máp výskytu prevádzky (bounds ako v generate_heatmaps_main.py): [(minlat, maxlat), (minlon, maxlon)]
+# Heatmapa počíta lietadlá v bunkách mriežky z každého riadku, preto sa riadky v týchto oblastiach nekomprimujú
+compression_exclude_bounds = [
+    [(48.5, 49.5), (21.0, 22.0)],
+]
+
+# Fronta medzi načítaním zdrojov a zápisom do databázy (počet kôl načítania, pri 5 s asi hodina výpadku databázy)
+write_queue_size = 720
+# Správanie pri plnej fronte: "drop_oldest" (zahodí najstaršie kolo), "drop_newest" (zahodí nové kolo)
+# alebo "block" (načítanie počká na zápis)
+overflow_policy = "drop_oldest"
+# Skupinový commit: riadky z viacerých kôl sa zapíšu jednou transakciou (najviac riadkov, najdlhšie čakanie v s)
+group_commit_rows = 20000
+group_commit_interval = 1.0
 
 
 # Funkcia na získanie zdrojov z databáze
@@ -70,143 +110,641 @@ def fetch_sources(conn):
         return []
 
 
+# Funkcia na načítanie zdrojov s opakovaním s odstupom (pri výpadku databázy najneskôr do času deadline)
+def fetch_sources_with_retry(conn, deadline):
+    attempt = 0
+    while True:
+        conn = ensure_connection(conn)
+        sources = fetch_sources(conn) if conn is not None else []
+        if sources:
+            return conn, sources
+        if conn is not None:
+            reset_connection(conn)
+        attempt += 1
+        delay = min(backoff_max, 2 ** attempt, (deadline - datetime.now()).total_seconds())
+        if delay <= 0:
+            return conn, sources
+        logging.warning(f"No sources fetched (attempt {attempt}), retrying in {delay:.0f} s")
+        time.sleep(delay)
+
+
+# Funkcia na rozlíšenie chýb, ktoré opakovanie môže opraviť (výpadok spojenia alebo chyba schémy, napríklad
+# chýbajúca partícia), od chýb konkrétnych riadkov (dáta, obmedzenia), pri ktorých sa skupina delí
+def retryable_error(e):
+    if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return True
+    pgcode = getattr(e, 'pgcode', None) or ''
+    return pgcode[:2] == errorcodes.CLASS_SYNTAX_ERROR_OR_ACCESS_RULE_VIOLATION
+
+
+# Funkcia na obnovenie spojenia s databázou (nové spojenie, ak pôvodné chýba alebo je zatvorené)
+def ensure_connection(conn):
+    if conn is not None and not conn.closed:
+        return conn
+    try:
+        return psycopg2.connect(**connection_parameters)
+    except psycopg2.Error as e:
+        logging.error(f"Failed to connect to the database: {e}")
+        return None
+
+
+# Funkcia na zrušenie transakcie po chybe, nepoužiteľné spojenie sa zatvorí a neskôr obnoví
+def reset_connection(conn):
+    try:
+        conn.rollback()
+    except psycopg2.Error:
+        conn.close()
+
+
+# Funkcia na vytvorenie HTTP session so zdieľaným poolom keep-alive spojení
+def create_session(pool_size=max_workers):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 # Funkcia na získanie JSON dát zo zdroja
-def fetch_json_from_source(url):
+def fetch_json_from_source(url, session=None, timeout=request_timeout):
     try:
-        response = requests.get(url)
+        response = (session or requests).get(url, timeout=timeout)
+        response.raise_for_status()
         return response.json()
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         logging.error("Failed to fetch data from {0}: {1}".format(url, e))
         return None
 
 
-# Funkcia na získanie existujúcich stĺpcov v databáze
-def fetch_existing_columns(conn):
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name='aircraft_pointcloud';")
-            return {row[0] for row in cur.fetchall()}
-    except Exception as e:
-        logging.error(f"Failed to fetch existing columns: {e}")
-        return set()
+# Funkcia na výpočet približnej vzdialenosti dvoch bodov v metroch (ekvirektangulárna aproximácia)
+def distance_m(lat1, lon1, lat2, lon2):
+    dy = math.radians(lat2 - lat1) * 6371000
+    dx = math.radians(lon2 - lon1) * 6371000 * math.cos(math.radians((lat1 + lat2) / 2))
+    return math.hypot(dx, dy)
+
+
+# Funkcia na určenie intervalu načítania zdroja podľa prevádzky v jeho poslednom snímku
+def traffic_interval(schedule, rows):
+    """
+    Adaptívny interval načítania v hraniciach poll_interval_bounds
+    :param schedule: Rozvrh zdroja (uchováva polohy lietadiel z predchádzajúceho snímku a aktuálny interval)
+    :param rows: Riadky posledného snímku zdroja
+    :return: Nový interval v sekundách
+    """
+    minimum, maximum = poll_interval_bounds
+    positions = {row['hex_code']: (row['lat_num'], row['lon_num']) for row in rows
+                 if row.get('lat_num') is not None and row.get('lon_num') is not None}
+    previous = schedule.get("positions", {})
+    schedule["positions"] = positions
+
+    # Nové lietadlá a lietadlá so zmenenou polohou (stojace lietadlá na zemi sa nepočítajú)
+    moving = sum(1 for hex_code, position in positions.items() if previous.get(hex_code) != position)
+    near = any(distance_m(lat, lon, area["lat"], area["lon"]) <= area["radius"]
+               for lat, lon in positions.values() for area in areas_of_interest)
+    if near:
+        target = minimum
+    else:
+        target = maximum - (maximum - minimum) * min(1.0, moving / traffic_reference)
 
+    # Pri náraste prevádzky sa zrýchli hneď, pri poklese sa spomaľuje postupne
+    current = schedule.get("interval", minimum)
+    return round(target if target <= current else min(target, current * interval_growth), 1)
 
-# Funkcia na pridanie nového stĺpca, ak neexistuje
-def add_column_if_not_exists(conn, existing_columns, column_name):
-    if column_name not in existing_columns:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(f"ALTER TABLE aircraft_pointcloud ADD COLUMN {column_name} TEXT;")
-                existing_columns.add(column_name)
-                conn.commit()
-            logging.info(f"Added new column '{column_name}'.")
-        except Exception as e:
-            logging.error(f"Failed to add column '{column_name}': {e}")
 
+# Funkcia na zarovnanie času na najbližšiu absolútnu značku intervalu (násobok intervalu od epochy)
+def align_tick(timestamp, interval):
+    return math.ceil(timestamp / interval) * interval
 
-# Funkcia na spracovanie dát z JSON
-def process_data(data, conn, existing_columns, date_str, source_id):
-    logging.info("Processing data for source_id: {source_id}")
-    partition_name = f"aircraft_pointcloud_{date_str.replace('-', '')}"
 
-    try:
-        if "now" in data:  # Zabezpečí, že timestamp "now" je prítomný
-            capture_time = datetime.fromtimestamp(data["now"])
+# Funkcia na naplánovanie ďalšieho načítania zdroja, pri chybách s exponenciálnym odstupom
+def schedule_next(schedule, success, now):
+    interval = schedule["interval"]
+    if success:
+        schedule["failures"] = 0
+        delay = interval
+    else:
+        schedule["failures"] += 1
+        delay = min(backoff_max, interval * 2 ** schedule["failures"])
+    # Zmeškané značky sa preskočia, aby sa zdroj nenačítal viackrát za sebou
+    schedule["next_tick"] = align_tick(max(schedule["next_tick"] + delay, now), interval)
+
+
+# Známe číselné polia aircraft.json (dump1090/readsb), ukladajú sa do stĺpcov <kľúč>_num s daným typom
+numeric_fields = {
+    "lat": "DOUBLE PRECISION", "lon": "DOUBLE PRECISION",
+    "alt_baro": "REAL", "alt_geom": "REAL", "baro_rate": "REAL", "geom_rate": "REAL",
+    "gs": "REAL", "ias": "REAL", "tas": "REAL", "mach": "REAL",
+    "track": "REAL", "track_rate": "REAL", "roll": "REAL", "mag_heading": "REAL", "true_heading": "REAL",
+    "nav_qnh": "REAL", "nav_altitude_mcp": "REAL", "nav_altitude_fms": "REAL", "nav_heading": "REAL",
+    "version": "REAL", "nic": "REAL", "rc": "REAL", "nic_baro": "REAL", "nac_p": "REAL", "nac_v": "REAL",
+    "sil": "REAL", "gva": "REAL", "sda": "REAL",
+    "messages": "REAL", "seen": "REAL", "seen_pos": "REAL", "rssi": "REAL"
+}
+# Známe textové polia, ukladajú sa do stĺpcov s rovnakým menom
+text_fields = ["type", "flight", "squawk", "emergency", "category", "sil_type"]
+# Známe polia so zoznamami hodnôt (TEXT[])
+array_fields = ["nav_modes", "mlat", "tisb"]
 
-            for aircraft in data.get("aircraft", []):
-                columns = ['capture_time', 'hex_code', 'source_id']  # Inicializuje s povinnými stĺpcami
-                values = [capture_time, aircraft.get("hex", "unknown"), source_id]
 
-                for key, value in aircraft.items():
-                    if key not in ['hex', 'capture_time']:  # Preskočí už spracované kľúče
-                        if key + "_num" in existing_columns:
-                            process_numeric_value(key, value, columns, values)
-                        else:
-                            if key not in existing_columns:
-                                add_column_if_not_exists(conn, existing_columns, key)
-                            columns.append(key)
-                            values.append(value)
-
-                insert_query = f"INSERT INTO {partition_name} ({', '.join(columns)}) " \
-                               f"VALUES ({', '.join(['%s'] * len(values))}) " \
-                               f"ON CONFLICT (source_id, capture_time, hex_code) DO NOTHING"
-
-                with conn.cursor() as cur:
-                    cur.execute(insert_query, tuple(values))
-                conn.commit()
-    except Exception as e:
-        logging.error(f"Failed to process data for source_id {source_id}: {e}")
-        if conn:
-            conn.rollback()
+# Funkcia na prevod hodnoty číselného poľa (None, ak hodnota nie je číslo)
+def numeric_value(key, value):
+    if key in ['alt_baro', 'alt_geom'] and value == 'ground':
+        return 0
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
-# Funkcia na spracovanie numerických hodnôt
-def process_numeric_value(key, value, columns, values):
-    num_key = key + "_num"
-    if key in ['alt_baro', 'alt_geom'] and value == 'ground':
-        num_value = 0
-    elif value is not None:
-        try:
-            num_value = float(value)
-        except ValueError:
-            num_value = None
+# Funkcia na prevod jedného lietadla na riadok tabuľky aircraft_pointcloud (stĺpec -> hodnota)
+def aircraft_row(aircraft, capture_time, source_id):
+    row = {'capture_time': capture_time, 'hex_code': aircraft.get("hex", "unknown"), 'source_id': source_id}
+    extra = {}
+
+    for key, value in aircraft.items():
+        if key in ['hex', 'capture_time']:  # Preskočí už spracované kľúče
+            continue
+        if key in numeric_fields:
+            number = numeric_value(key, value)
+            if number is None:
+                # Nečíselná hodnota známeho poľa sa nestratí, uloží sa do doplnkového stĺpca
+                extra[key] = value
+            else:
+                row[key + "_num"] = number
+                if value == 'ground':
+                    row['on_ground'] = True
+        elif key in text_fields and not isinstance(value, (list, dict)):
+            row[key] = value
+        elif key in array_fields and isinstance(value, list):
+            row[key] = value
+        else:
+            # Neznáme polia sa ukladajú do kompaktného JSONB stĺpca bez zmeny schémy
+            extra[key] = value
+
+    if extra:
+        row['extra'] = extra
+    return row
+
+
+# Funkcia na prevod snímku z jedného zdroja na riadky tabuľky aircraft_pointcloud
+def snapshot_rows(data, source_id):
+    if "now" not in data:  # Zabezpečí, že timestamp "now" je prítomný
+        return []
+    capture_time = datetime.fromtimestamp(data["now"])
+    return [aircraft_row(aircraft, capture_time, source_id) for aircraft in data.get("aircraft", [])]
+
+
+# Posledný zapísaný riadok pre každú dvojicu (zdroj, hex kód)
+last_stored = {}
+
+# Polia, ktorých zmena sa zapíše vždy (zmena identifikácie alebo núdzového stavu)
+state_fields = ['on_ground', 'flight', 'squawk', 'emergency']
+
+
+# Funkcia na zistenie, či sa číselná hodnota zmenila o viac ako toleranciu (aj zmena medzi None a hodnotou)
+def exceeds(previous, current, tolerance):
+    if previous is None or current is None:
+        return previous is not current
+    return abs(current - previous) > tolerance
+
+
+# Funkcia na zistenie, či sa lietadlo od posledného zapísaného riadku zmenilo nad tolerancie
+def significant_change(previous, row, tolerances):
+    if (row['capture_time'] - previous['capture_time']).total_seconds() >= tolerances["keep_alive"]:
+        return True
+    if any(previous.get(field) != row.get(field) for field in state_fields):
+        return True
+
+    lat, lon = row.get('lat_num'), row.get('lon_num')
+    previous_lat, previous_lon = previous.get('lat_num'), previous.get('lon_num')
+    if (lat is None) != (previous_lat is None):
+        return True
+    if lat is not None:
+        if distance_m(previous_lat, previous_lon, lat, lon) > tolerances["position"]:
+            return True
+
+    for field in ('alt_baro_num', 'alt_geom_num'):
+        if exceeds(previous.get(field), row.get(field), tolerances["altitude"]):
+            return True
+    if exceeds(previous.get('gs_num'), row.get('gs_num'), tolerances["speed"]):
+        return True
+
+    track, previous_track = row.get('track_num'), previous.get('track_num')
+    if (track is None) != (previous_track is None):
+        return True
+    if track is not None and abs((track - previous_track + 180) % 360 - 180) > tolerances["heading"]:
+        return True
+    return False
+
+
+# Funkcia na zistenie, či riadok leží v oblasti máp výskytu prevádzky
+def in_heatmap_bounds(row, bounds):
+    lat, lon = row.get('lat_num'), row.get('lon_num')
+    if lat is None or lon is None:
+        return False
+    return any(minlat <= lat <= maxlat and minlon <= lon <= maxlon
+               for (minlat, maxlat), (minlon, maxlon) in bounds)
+
+
+# Funkcia na kompresiu riadkov (ponechá len riadky so zmenou nad tolerancie)
+def compress_rows(rows, tolerances=None, exclude_bounds=None):
+    """
+    Dead-band kompresia stôp lietadiel voči poslednému zapísanému stavu
+    :param rows: Riadky z funkcie snapshot_rows
+    :param tolerances: Tolerancie, predvolene compression_tolerances
+    :param exclude_bounds: Oblasti, v ktorých sa zapíšu všetky riadky, predvolene compression_exclude_bounds
+    :return: Riadky, ktoré sa majú zapísať do databázy
+    """
+    tolerances = tolerances or compression_tolerances
+    exclude_bounds = compression_exclude_bounds if exclude_bounds is None else exclude_bounds
+    kept = []
+    latest_time = None
+    for row in rows:
+        key = (row['source_id'], row['hex_code'])
+        previous = last_stored.get(key)
+        if previous is None or in_heatmap_bounds(row, exclude_bounds) or \
+                significant_change(previous, row, tolerances):
+            kept.append(row)
+            last_stored[key] = row
+        latest_time = max(latest_time, row['capture_time']) if latest_time else row['capture_time']
+
+    # Zabudnutie lietadiel, ktoré sa dlho neozvali (pri návrate sa zapíšu hneď)
+    if latest_time is not None and len(last_stored) > 2 * len(rows):
+        cutoff = latest_time - timedelta(seconds=compression_state_ttl)
+        for key in [key for key, row in last_stored.items() if row['capture_time'] < cutoff]:
+            del last_stored[key]
+    return kept
+
+
+# Funkcia na zápis poľa ako literálu PostgreSQL poľa (rovnaký text, aký vznikal pri INSERT cez psycopg2)
+def array_literal(values):
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append('NULL')
+            continue
+        text = 'true' if value is True else 'false' if value is False else str(value)
+        if text == '' or text.upper() == 'NULL' or any(char in text for char in ' {},"\\\t\n'):
+            text = '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        elements.append(text)
+    return '{' + ','.join(elements) + '}'
+
+
+# Funkcia na prevod hodnoty do textového formátu príkazu COPY
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        text = 'true' if value else 'false'
+    elif isinstance(value, (list, tuple)):
+        text = array_literal(value)
+    elif isinstance(value, dict):
+        text = json.dumps(value)
     else:
-        num_value = None
-
-    if num_value is not None:
-        if num_key not in columns:
-            columns.append(key)
-            values.append(value)
-            columns.append(num_key)
-            values.append(num_value)
+        text = str(value)
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+# Funkcia na zápis riadkov do partície (COPY do dočasnej tabuľky a jeden INSERT ... SELECT)
+def insert_rows(cur, partition_name, rows):
+    """
+    Zápis riadkov do partície bez commitu (viac volaní sa dá potvrdiť jedným commitom)
+    :param cur: Kurzor otvorenej transakcie
+    :param partition_name: Názov dennej partície
+    :param rows: Zoznam riadkov ako dictionary stĺpec -> hodnota
+    :return: Počet nových riadkov v partícii
+    """
+    if not rows:
+        return 0
+
+    # Zjednotenie stĺpcov všetkých riadkov, chýbajúce hodnoty sú NULL rovnako ako pri INSERT
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_value(row.get(column)) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    column_list = ', '.join(columns)
+    # Dočasná tabuľka bez obmedzení, po vložení sa zmaže (pri chybe ju zruší rollback)
+    cur.execute("CREATE TEMP TABLE aircraft_pointcloud_staging (LIKE aircraft_pointcloud);")
+    cur.copy_expert(f"COPY aircraft_pointcloud_staging ({column_list}) FROM STDIN", buffer)
+    cur.execute(f"""
+        INSERT INTO {partition_name} ({column_list})
+        SELECT DISTINCT ON (source_id, capture_time, hex_code) {column_list}
+        FROM aircraft_pointcloud_staging
+        ON CONFLICT (source_id, capture_time, hex_code) DO NOTHING;
+    """)
+    inserted = cur.rowcount
+    cur.execute("DROP TABLE aircraft_pointcloud_staging;")
+    return inserted
+
+
+# Trieda na zápis riadkov do databázy na pozadí (ohraničená fronta, skupinový commit, opakovanie po výpadku)
+class BackgroundWriter:
+    def __init__(self, connection_parameters, maxsize=write_queue_size, policy=overflow_policy):
+        """
+        Zapisovač riadkov s vlastným spojením s databázou
+        :param connection_parameters: Parametre pripojenia k databáze
+        :param maxsize: Kapacita fronty v kolách načítania
+        :param policy: Správanie pri plnej fronte ("drop_oldest", "drop_newest" alebo "block")
+        """
+        self.connection_parameters = connection_parameters
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.dropped_rows = 0
+        self.overflowing = False
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="logger-db-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    # Zaradenie riadkov jedného kola do fronty podľa zvoleného správania pri plnej fronte
+    def put(self, rows):
+        if not rows:
+            return
+        item = rows
+        if self.policy == "block":
+            self.queue.put(item)
+            return
+        dropped_any = False
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                break
+            except queue.Full:
+                if self.policy == "drop_oldest":
+                    try:
+                        dropped = self.queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                else:
+                    dropped = rows
+                self.dropped_rows += len(dropped)
+                dropped_any = True
+                if dropped is rows:
+                    break
+        # Varovanie sa zaloguje raz na začiatku každého preplnenia
+        if dropped_any and not self.overflowing:
+            logging.warning(f"Write queue full, dropping rows ({self.policy}, {self.dropped_rows} dropped so far)")
+        self.overflowing = dropped_any
+
+    # Zber kôl z fronty do jednej skupiny (najviac group_commit_rows riadkov alebo group_commit_interval sekúnd)
+    # Riadky sa rozdelia podľa dňa capture_time (čas prijímača sa môže okolo polnoci líšiť od času loggera)
+    def collect(self):
+        try:
+            rows = self.queue.get(timeout=group_commit_interval)
+        except queue.Empty:
+            return {}
+        group = {}
+        count = 0
+        deadline = time.monotonic() + group_commit_interval
+        while True:
+            for row in rows:
+                group.setdefault(row['capture_time'].date(), []).append(row)
+            count += len(rows)
+            if count >= group_commit_rows:
+                break
+            try:
+                rows = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+        return group
+
+    # Zápis skupiny jednou transakciou
+    def commit_group(self, conn, group):
+        with conn.cursor() as cur:
+            for day, rows in group.items():
+                insert_rows(cur, partition_name(day), rows)
+        conn.commit()
+
+    # Zápis riadkov po poloviciach, riadky, ktoré nejdú zapísať ani samostatne, sa zahodia
+    # Pri chybe, ktorú opraví opakovanie, ostanú v zozname rows len ešte nezapísané riadky
+    def commit_bisect(self, conn, day, rows):
+        pending = [list(rows)]
+        try:
+            while pending:
+                part = pending.pop()
+                try:
+                    with conn.cursor() as cur:
+                        insert_rows(cur, partition_name(day), part)
+                    conn.commit()
+                except psycopg2.Error as e:
+                    if retryable_error(e):
+                        pending.append(part)
+                        raise
+                    conn.rollback()
+                    if len(part) == 1:
+                        self.dropped_rows += 1
+                        logging.warning(f"Dropping row {part[0].get('hex_code')} at {part[0].get('capture_time')} "
+                                        f"for {partition_name(day)}: {e}")
+                        continue
+                    middle = len(part) // 2
+                    pending.append(part[middle:])
+                    pending.append(part[:middle])
+        finally:
+            rows[:] = [row for part in reversed(pending) for row in part]
+
+    # Slučka zápisu, pri výpadku spojenia alebo chybe schémy sa skupina drží v pamäti a opakuje s odstupom
+    # (fronta medzitým zachytáva nové kolá), chýbajúca partícia sa vytvorí, skupina s chybnými dátami
+    # sa rozdelí a zapíše bez chybných riadkov
+    def run(self):
+        conn = None
+        group = {}
+        failures = 0
+        while not (self.stop_event.is_set() and self.queue.empty() and not group):
+            if not group:
+                group = self.collect()
+                if not group:
+                    continue
+            try:
+                if conn is None or conn.closed:
+                    conn = psycopg2.connect(**self.connection_parameters)
+                try:
+                    self.commit_group(conn, group)
+                except psycopg2.Error as e:
+                    if retryable_error(e):
+                        raise
+                    # Chyba dát alebo obmedzenia sa opakovaním neopraví
+                    logging.error(f"Failed to write {sum(len(rows) for rows in group.values())} rows, "
+                                  f"retrying in parts: {e}")
+                    conn.rollback()
+                    # Zapísané dni sa zo skupiny odoberú, pri opakovaní po výpadku sa zopakujú len zvyšné
+                    for day in list(group):
+                        self.commit_bisect(conn, day, group[day])
+                        del group[day]
+                if failures:
+                    logging.info(f"Database writes recovered after {failures} failed attempts")
+                group = {}
+                failures = 0
+            except Exception as e:
+                if conn is not None and not conn.closed:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        conn.close()
+                if not isinstance(e, psycopg2.Error) or not retryable_error(e):
+                    # Neočakávaná chyba by sa opakovala donekonečna, skupina sa zahodí
+                    self.dropped_rows += sum(len(rows) for rows in group.values())
+                    logging.error(f"Dropping {sum(len(rows) for rows in group.values())} rows after unexpected "
+                                  f"error: {e}")
+                    group = {}
+                    continue
+                failures += 1
+                logging.error(f"Failed to write {sum(len(rows) for rows in group.values())} rows "
+                              f"(attempt {failures}, {self.queue.qsize()} rounds queued): {e}")
+                # Chýbajúca partícia (napríklad logger štartoval bez databázy) sa vytvorí, prvé opakovanie je hneď
+                if e.pgcode == errorcodes.UNDEFINED_TABLE and not conn.closed:
+                    if all([create_partition(conn, day) for day in group]) and failures == 1:
+                        continue
+                # Pri zastavení sa neúspešná skupina po niekoľkých pokusoch zahodí, aby logger mohol skončiť
+                if self.stop_event.is_set() and failures >= 3:
+                    self.dropped_rows += sum(len(rows) for rows in group.values())
+                    group = {}
+                    continue
+                time.sleep(min(backoff_max, 2 ** failures))
+        if conn is not None:
+            conn.close()
+
+    # Zastavenie zapisovača po zapísaní zvyšku fronty
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        if self.dropped_rows:
+            logging.warning(f"Database writer dropped {self.dropped_rows} rows in total")
 
 
 # Hlavná funkcia skriptu
 def main():
     logging.basicConfig(level=logging.INFO)
-    conn = psycopg2.connect(**connection_parameters)
+    conn = None
 
-    # Pôvodne nastaví last_processed_day na None, aby sa zabezpečilo vytvorenie partície pri prvom spustení
+    # Spojenia so zdrojmi sa udržiavajú v zdieľanom poole, požiadavky bežia súbežne
+    session = create_session()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    schedules = {}
+
+    # Zápis do databázy beží na pozadí s vlastným spojením, pomalý commit nezdrží načítanie
+    writer = BackgroundWriter(connection_parameters).start()
+
+    # Pôvodne nastaví last_processed_day na None, aby sa zabezpečilo vytvorenie partícií pri prvom spustení
     last_processed_day = None
 
-    while True:
-        current_dt = datetime.now()
-        current_day_str = current_dt.strftime('%Y%m%d')
-        current_hour = current_dt.hour
-        # Toto zabezpečí, že nová partícia sa vytvorí na začiatku nového dňa
-        if last_processed_day != current_day_str:
-            create_daily_partition(conn, current_day_str)
-            last_processed_day = current_day_str
-        next_hour = (current_dt + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-
-        day_dir = BASE_DIR / current_day_str
-        day_dir.mkdir(parents=True, exist_ok=True)
-
-        hourly_file = day_dir / f"aircraft_{current_hour:02}.json"
-        if not hourly_file.exists():
-            hourly_file.touch()
-
-        sources = fetch_sources(conn)
-        existing_columns = fetch_existing_columns(conn)
-
-        while datetime.now() < next_hour:
+    archive = None
+    try:
+        while True:
+            current_dt = datetime.now()
+            current_day_str = current_dt.strftime('%Y%m%d')
+            current_hour = current_dt.hour
+            next_hour = (current_dt + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+
+            day_dir = BASE_DIR / current_day_str
+            day_dir.mkdir(parents=True, exist_ok=True)
+
+            if archive_format == "columnar":
+                # Riadky sa bufferujú a zapisujú po dávkach, súbor sa neotvára pri každom načítaní
+                archive = ArchiveWriter(day_dir / f"aircraft_{current_hour:02}{archive_suffix}")
+            else:
+                archive = None
+                hourly_file = day_dir / f"aircraft_{current_hour:02}.json"
+                if not hourly_file.exists():
+                    hourly_file.touch()
+
+            # Spojenie sa po výpadku databázy obnoví na začiatku každej hodiny, bez známych zdrojov (štart
+            # počas výpadku databázy) sa načítanie zdrojov opakuje s odstupom, kým sa nepodarí
+            conn, sources = fetch_sources_with_retry(conn, next_hour if not schedules else current_dt)
+            # Partície sa vytvárajú vopred na niekoľko dní, pri zmene dňa sa rozsah len posunie
+            if conn is not None and last_processed_day != current_day_str:
+                try:
+                    if last_processed_day is None:
+                        # Pri prvom spustení sa opravia aj staršie partície s hranicou deň 23:59:59
+                        repair_partition_bounds(conn)
+                    created = ensure_partitions(conn, current_dt.date())
+                except psycopg2.Error as e:
+                    logging.error(f"Failed to ensure partitions: {e}")
+                    created = False
+                if created:
+                    last_processed_day = current_day_str
+                else:
+                    reset_connection(conn)
+
+            # Každý zdroj má vlastný rozvrh na absolútnych značkách, stav (odstup po chybách) sa zachová medzi hodinami
+            if not sources and schedules:
+                # Pri výpadku databázy sa pokračuje so zdrojmi z predchádzajúcej hodiny
+                logging.warning("No sources fetched, keeping the previous sources")
+                sources = [(source_id, None, None) for source_id in schedules]
+            schedules = {source_id: schedules.get(source_id) or {
+                "next_tick": align_tick(time.time(), poll_interval_bounds[0]),
+                "interval": poll_interval_bounds[0],
+                "failures": 0,
+                "future": None
+            } for source_id, _, _ in sources}
             for source_id, _, website in sources:
-                # Opraviť URL adresu, ak je potrebné
-                url = f"{website}/data/aircraft.json"
-
-                data = fetch_json_from_source(url)
-                if data:
-                    # Pridať source_id do dát pred ich uložením do súboru
-                    data['source_id'] = source_id
-                    with open(hourly_file, 'a') as file:
-                        json.dump(data, file)
-                        file.write('\n')
-
-                    process_data(data, conn, existing_columns, current_day_str, source_id)
-
-            # Určenie trvania spánku na základe aktuálnej hodiny (noc vs. deň)
-            sleep_duration = 20 if day[1] <= current_hour or current_hour < day[0] else 5
-            time.sleep(sleep_duration)
+                if website is not None:
+                    # Opraviť URL adresu, ak je potrebné
+                    schedules[source_id]["url"] = f"{website}/data/aircraft.json"
+
+            while datetime.now() < next_hour:
+                now = time.time()
+                for schedule in schedules.values():
+                    # Zdroj, ktorého predchádzajúca požiadavka ešte beží, značku vynechá a nezdržiava ostatné
+                    if schedule["future"] is None and schedule["next_tick"] <= now:
+                        schedule["future"] = executor.submit(fetch_json_from_source, schedule["url"], session)
+
+                # Čakanie na dokončenú požiadavku alebo na najbližšiu značku (najneskôr do konca hodiny)
+                running = [schedule["future"] for schedule in schedules.values() if schedule["future"] is not None]
+                idle_ticks = [schedule["next_tick"] for schedule in schedules.values() if schedule["future"] is None]
+                timeout = min(idle_ticks + [next_hour.timestamp()]) - time.time()
+                if running:
+                    wait(running, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(max(0.0, timeout))
+
+                # Riadky zo všetkých dokončených požiadaviek idú do fronty zapisovača ako jedno kolo
+                rows = []
+                now = time.time()
+                for source_id, schedule in schedules.items():
+                    future = schedule["future"]
+                    if future is None or not future.done():
+                        continue
+                    schedule["future"] = None
+                    data = future.result()
+                    if data:
+                        # Interval zdroja sa prispôsobí prevádzke v práve načítanom snímku
+                        snapshot = snapshot_rows(data, source_id)
+                        schedule["interval"] = traffic_interval(schedule, snapshot)
+                    schedule_next(schedule, data is not None, now)
+                    if data:
+                        if archive is not None:
+                            archive.append(snapshot)
+                        else:
+                            # Pridať source_id do dát pred ich uložením do súboru
+                            data['source_id'] = source_id
+                            with open(hourly_file, 'a') as file:
+                                json.dump(data, file)
+                                file.write('\n')
+
+                        rows.extend(snapshot)
+
+                # Archív ostáva úplný, kompresia stopy sa týka len zápisu do databázy
+                if compression_enabled:
+                    rows = compress_rows(rows)
+                writer.put(rows)
+
+            if archive is not None:
+                archive.close()
+    finally:
+        # Pri ukončení sa zapíše zvyšok archívu aj fronty
+        if archive is not None:
+            archive.close()
+        writer.stop()
+        executor.shutdown(wait=False)
+        if conn is not None:
+            conn.close()
 
 
 if __name__ == "__main__":
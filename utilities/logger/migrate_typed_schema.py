@@ -0,0 +1,197 @@
+import argparse  # Importuje argparse pre parametre príkazového riadku
+import logging  # Importuje logging pre logovanie
+import psycopg2  # Importuje knižnicu psycopg2 pre prácu s PostgreSQL
+from logger import numeric_fields, text_fields, array_fields  # Importuje typovanú schému loggera
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: migrate_typed_schema.py
+Skript na prevod tabuľky aircraft_pointcloud so stĺpcami TEXT (pridávanými pre každý nový kľúč) na typovanú schému
+s doplnkovým stĺpcom extra (JSONB). Partície sa prevádzajú po jednej, prerušený prevod pokračuje od nedokončenej
+partície. Počas prevodu má byť logger zastavený.
+"""
+
+# Konfigurácia logovania
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Parametre pripojenia k databáze
+connection_parameters = {
+    "host": "your_postgre_ip",
+    "port": "your_postgre_port",
+    "database": "your_postgre_database_name",
+    "user": "your_postgre_username",
+    "password": "your_postgre_password"
+}
+
+# Stĺpce primárneho kľúča, ktoré sa prenášajú bez zmeny
+key_columns = ['source_id', 'capture_time', 'hex_code']
+
+# Pomocná funkcia na bezpečný prevod textu na číslo (nečíselný text je NULL)
+number_function = r"""
+CREATE OR REPLACE FUNCTION pg_temp.to_number(value TEXT) RETURNS DOUBLE PRECISION AS $$
+    SELECT CASE WHEN value ~ '^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$'
+                THEN value::DOUBLE PRECISION END
+$$ LANGUAGE sql IMMUTABLE;
+"""
+
+
+# Funkcia na vytvorenie definície stĺpcov typovanej schémy (rovnaká ako v aeroguardian-init.sql)
+def typed_columns():
+    columns = [('source_id', 'INTEGER'), ('capture_time', 'TIMESTAMP WITHOUT TIME ZONE'), ('hex_code', 'VARCHAR')]
+    columns += [(key, 'TEXT') for key in text_fields]
+    columns += [(key, 'TEXT[]') for key in array_fields]
+    columns += [('on_ground', 'BOOLEAN')]
+    columns += [(f'{key}_num', sql_type) for key, sql_type in numeric_fields.items()]
+    columns += [('extra', 'JSONB')]
+    return columns
+
+
+# Funkcia na získanie stĺpcov pôvodnej tabuľky
+def legacy_columns(conn, table_name):
+    with conn.cursor() as cur:
+        cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = %s;", (table_name,))
+        return {row[0] for row in cur.fetchall()}
+
+
+# Funkcia na získanie partícií tabuľky s ich hranicami
+def partitions(conn, parent):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s
+            ORDER BY c.relname;
+        """, (parent,))
+        return cur.fetchall()
+
+
+# Funkcia na zistenie, či tabuľka existuje
+def table_exists(conn, table_name):
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (table_name,))
+        return cur.fetchone()[0]
+
+
+# Funkcia na vytvorenie SQL výrazov, ktoré z pôvodných stĺpcov vypočítajú stĺpce typovanej schémy
+def conversion_expressions(legacy):
+    expressions = {column: column for column in key_columns}
+
+    for key in text_fields:
+        expressions[key] = f"{key}::TEXT" if key in legacy else "NULL"
+    for key in array_fields:
+        # Pri vkladaní cez psycopg2 sa zoznamy uložili ako text literálu poľa, napríklad '{adsb,mlat}'
+        expressions[key] = f"CASE WHEN {key}::TEXT ~ '^\\{{.*\\}}$' THEN {key}::TEXT::TEXT[] END" \
+            if key in legacy else "NULL"
+    expressions['on_ground'] = "CASE WHEN alt_baro::TEXT = 'ground' THEN TRUE END" if 'alt_baro' in legacy else "NULL"
+
+    for key, sql_type in numeric_fields.items():
+        candidates = []
+        if f'{key}_num' in legacy:
+            candidates.append(f"pg_temp.to_number({key}_num::TEXT)")
+        if key in legacy:
+            if key in ('alt_baro', 'alt_geom'):
+                candidates.append(f"CASE WHEN {key}::TEXT = 'ground' THEN 0 END")
+            candidates.append(f"pg_temp.to_number({key}::TEXT)")
+        expressions[f'{key}_num'] = f"COALESCE({', '.join(candidates)})::{sql_type}" if candidates else "NULL"
+
+    # Neznáme stĺpce sa zlúčia do JSONB (jsonb_build_object prijme najviac 100 argumentov)
+    known = set(expressions) | {f'{key}_num' for key in numeric_fields} | set(numeric_fields)
+    unknown = sorted(column for column in legacy if column not in known)
+    parts = []
+    for start in range(0, len(unknown), 50):
+        pairs = ', '.join(f"'{column}', {column}" for column in unknown[start:start + 50])
+        parts.append(f"jsonb_build_object({pairs})")
+    expressions['extra'] = f"NULLIF(jsonb_strip_nulls({' || '.join(parts)}), '{{}}'::JSONB)" if parts else "NULL"
+    return expressions
+
+
+# Funkcia na prevod jednej partície do typovanej tabuľky (v jednej transakcii, hotová partícia sa preskočí)
+def migrate_partition(conn, name, bound, expressions):
+    typed_name = f"{name}_typed"
+    if table_exists(conn, typed_name):
+        logging.info(f"Partition {name} already migrated.")
+        return
+
+    columns = [column for column, _ in typed_columns()]
+    try:
+        with conn.cursor() as cur:
+            cur.execute(number_function)
+            cur.execute(f"CREATE TABLE {typed_name} PARTITION OF aircraft_pointcloud_typed {bound};")
+            cur.execute(f"""
+                INSERT INTO {typed_name} ({', '.join(columns)})
+                SELECT {', '.join(expressions[column] for column in columns)}
+                FROM {name}
+                ON CONFLICT (source_id, capture_time, hex_code) DO NOTHING;
+            """)
+            copied = cur.rowcount
+        conn.commit()
+        logging.info(f"Partition {name} migrated ({copied} rows).")
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"Failed to migrate partition {name}: {e}")
+        raise
+
+
+# Hlavná funkcia migrácie
+def migrate(conn, drop_legacy=False):
+    legacy = legacy_columns(conn, 'aircraft_pointcloud')
+    if 'extra' in legacy:
+        logging.info("Table aircraft_pointcloud already uses the typed schema.")
+        return
+
+    with conn.cursor() as cur:
+        definitions = ', '.join(f"{column} {sql_type}" for column, sql_type in typed_columns())
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS aircraft_pointcloud_typed (
+                {definitions},
+                PRIMARY KEY (source_id, capture_time, hex_code),
+                FOREIGN KEY (source_id) REFERENCES sources(source_id)
+            ) PARTITION BY RANGE (capture_time);
+        """)
+    conn.commit()
+
+    expressions = conversion_expressions(legacy)
+    legacy_partitions = partitions(conn, 'aircraft_pointcloud')
+    for name, bound in legacy_partitions:
+        migrate_partition(conn, name, bound, expressions)
+
+    # Výmena tabuliek prebehne naraz, pôvodné tabuľky ostanú s príponou _legacy
+    with conn.cursor() as cur:
+        cur.execute("ALTER TABLE aircraft_pointcloud RENAME TO aircraft_pointcloud_legacy;")
+        for name, _ in legacy_partitions:
+            cur.execute(f"ALTER TABLE {name} RENAME TO {name}_legacy;")
+            cur.execute(f"ALTER TABLE {name}_typed RENAME TO {name};")
+        cur.execute("ALTER TABLE aircraft_pointcloud_typed RENAME TO aircraft_pointcloud;")
+        if drop_legacy:
+            cur.execute("DROP TABLE aircraft_pointcloud_legacy CASCADE;")
+    conn.commit()
+    logging.info(f"Migrated {len(legacy_partitions)} partitions to the typed schema.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Prevod aircraft_pointcloud na typovanú schému")
+    parser.add_argument('--drop-legacy', action='store_true', help="Po prevode zmaže pôvodné tabuľky")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(**connection_parameters)
+    try:
+        migrate(connection, drop_legacy=args.drop_legacy)
+    finally:
+        connection.close()
@@ -0,0 +1,261 @@
+import argparse  # Importuje argparse pre parametre príkazového riadku
+import logging  # Importuje logging pre logovanie
+import re  # Importuje re pre čítanie hraníc existujúcich partícií
+import psycopg2  # Importuje knižnicu psycopg2 pre prácu s PostgreSQL
+from datetime import datetime, date, timedelta  # Importuje datetime, date a timedelta pre hranice partícií
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: partition_manager.py
+Správa denných partícií tabuľky aircraft_pointcloud: vytváranie partícií vopred s polootvorenými hranicami
+[deň 00:00, nasledujúci deň 00:00), indexy pre časové a priestorové podmienky a zhrnutie starých partícií
+do minútových súhrnov stôp (aircraft_track_minute) podľa retenčnej politiky. Logger volá ensure_partitions,
+údržbu s retenciou je vhodné spúšťať raz denne (napríklad cron) ako samostatný skript.
+Súhrny obsahujú priemernú polohu za minútu, takže slúžia len na históriu stôp, nie na mapy výskytu prevádzky.
+Heatmapy sa počítajú len z úplných dát, preto sa úplné partície predvolene nemažú (raw_retention_days = None).
+Staršie partície s hranicou [deň 00:00, deň 23:59:59) opraví repair_partition_bounds na polootvorené.
+"""
+
+# Parametre pripojenia k databáze
+connection_parameters = {
+    "host": "your_postgre_ip",
+    "port": "your_postgre_port",
+    "database": "your_postgre_database_name",
+    "user": "your_postgre_username",
+    "password": "your_postgre_password"
+}
+
+# Počet dní, pre ktoré sa partície vytvoria vopred
+partitions_ahead = 7
+# Počet dní, počas ktorých sa uchovávajú úplné dáta (staršie partície sa zhrnú a zmažú, None = neobmedzene)
+# Zmazané dni sa už nedajú použiť pre mapy výskytu prevádzky, mazanie je preto len na výslovné zapnutie
+raw_retention_days = None
+# Počet dní, počas ktorých sa uchovávajú minútové súhrny (None = neobmedzene)
+rollup_retention_days = None
+
+# Indexy na rodičovskej tabuľke sa automaticky vytvoria aj na všetkých (aj budúcich) partíciách
+# BRIN nad capture_time je malý a stačí, lebo riadky sa zapisujú v časovom poradí
+index_statements = [
+    "CREATE INDEX IF NOT EXISTS aircraft_pointcloud_capture_time_brin ON aircraft_pointcloud USING BRIN (capture_time);",
+    "CREATE INDEX IF NOT EXISTS aircraft_pointcloud_position_idx ON aircraft_pointcloud (lat_num, lon_num);",
+]
+
+# Minútové súhrny stôp (jeden riadok na lietadlo, zdroj a minútu, nepoužiteľné pre heatmapy)
+rollup_table = """
+CREATE TABLE IF NOT EXISTS aircraft_track_minute (
+    source_id INTEGER,
+    minute TIMESTAMP WITHOUT TIME ZONE,
+    hex_code VARCHAR,
+    samples INTEGER,
+    flight TEXT,
+    squawk TEXT,
+    on_ground BOOLEAN,
+    lat_num DOUBLE PRECISION,
+    lon_num DOUBLE PRECISION,
+    alt_baro_num REAL,
+    alt_geom_num REAL,
+    gs_num REAL,
+    track_num REAL,
+    PRIMARY KEY (source_id, minute, hex_code)
+);
+CREATE INDEX IF NOT EXISTS aircraft_track_minute_minute_brin ON aircraft_track_minute USING BRIN (minute);
+"""
+
+
+# Funkcia na vytvorenie názvu dennej partície
+def partition_name(day):
+    return f"aircraft_pointcloud_{day:%Y%m%d}"
+
+
+# Funkcia na vytvorenie dennej partície s polootvorenými hranicami (posledná sekunda dňa patrí do partície)
+def create_partition(conn, day):
+    name = partition_name(day)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {name}
+                PARTITION OF aircraft_pointcloud
+                FOR VALUES FROM (%s) TO (%s);
+            """, (f'{day:%Y-%m-%d} 00:00:00', f'{day + timedelta(days=1):%Y-%m-%d} 00:00:00'))
+        conn.commit()
+        return True
+    except Exception as e:
+        logging.error(f"Failed to create partition {name}: {e}")
+        conn.rollback()
+        return False
+
+
+# Funkcia na vytvorenie partícií od daného dňa na partitions_ahead dní dopredu
+def ensure_partitions(conn, start=None, days=partitions_ahead):
+    start = start or date.today()
+    created = [create_partition(conn, start + timedelta(days=offset)) for offset in range(days + 1)]
+    logging.info(f"Partitions from {start} for {days} days ahead verified.")
+    return all(created)
+
+
+# Funkcia na vytvorenie indexov a tabuľky súhrnov
+def ensure_indexes(conn):
+    with conn.cursor() as cur:
+        for statement in index_statements:
+            cur.execute(statement)
+        cur.execute(rollup_table)
+    conn.commit()
+
+
+# Funkcia na získanie denných partícií (deň -> názov partície)
+def daily_partitions(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'aircraft_pointcloud';
+        """)
+        names = [row[0] for row in cur.fetchall()]
+    partitions = {}
+    for name in names:
+        try:
+            partitions[datetime.strptime(name.rsplit('_', 1)[-1], '%Y%m%d').date()] = name
+        except ValueError:
+            continue
+    return partitions
+
+
+# Funkcia na získanie hraníc denných partícií (názov -> (deň, horná hranica ako text))
+def partition_bounds(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'aircraft_pointcloud';
+        """)
+        rows = cur.fetchall()
+    bounds = {}
+    for name, expression in rows:
+        match = re.search(r"TO \('([^']*)'\)", expression or '')
+        try:
+            day = datetime.strptime(name.rsplit('_', 1)[-1], '%Y%m%d').date()
+        except ValueError:
+            continue
+        if match:
+            bounds[name] = (day, match.group(1))
+    return bounds
+
+
+# Funkcia na opravu starších partícií s hornou hranicou deň 23:59:59 (časy v poslednej sekunde dňa nemali partíciu)
+def repair_partition_bounds(conn):
+    repaired = 0
+    for name, (day, upper) in sorted(partition_bounds(conn).items()):
+        expected = f'{day + timedelta(days=1):%Y-%m-%d} 00:00:00'
+        if upper == expected:
+            continue
+        try:
+            with conn.cursor() as cur:
+                # Odpojenie a pripojenie s novými hranicami v jednej transakcii, dáta partície zostanú
+                cur.execute(f"ALTER TABLE aircraft_pointcloud DETACH PARTITION {name};")
+                cur.execute(f"""
+                    ALTER TABLE aircraft_pointcloud ATTACH PARTITION {name}
+                    FOR VALUES FROM (%s) TO (%s);
+                """, (f'{day:%Y-%m-%d} 00:00:00', expected))
+            conn.commit()
+            repaired += 1
+            logging.info(f"Partition {name} bounds changed from upper bound {upper} to {expected}.")
+        except Exception as e:
+            logging.error(f"Failed to repair bounds of partition {name}: {e}")
+            conn.rollback()
+    return repaired
+
+
+# Funkcia na zhrnutie partície do minútových súhrnov a jej zmazanie (v jednej transakcii)
+def rollup_partition(conn, name):
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                INSERT INTO aircraft_track_minute (source_id, minute, hex_code, samples, flight, squawk, on_ground,
+                                                   lat_num, lon_num, alt_baro_num, alt_geom_num, gs_num, track_num)
+                SELECT
+                    source_id,
+                    date_trunc('minute', capture_time) AS minute,
+                    hex_code,
+                    COUNT(*),
+                    MAX(flight),
+                    MAX(squawk),
+                    BOOL_OR(on_ground),
+                    AVG(lat_num),
+                    AVG(lon_num),
+                    AVG(alt_baro_num),
+                    AVG(alt_geom_num),
+                    AVG(gs_num),
+                    -- Kurz sa nepriemeruje (prechod cez 0°), použije sa posledná hodnota v minúte
+                    (ARRAY_AGG(track_num ORDER BY capture_time DESC) FILTER (WHERE track_num IS NOT NULL))[1]
+                FROM {name}
+                GROUP BY source_id, minute, hex_code
+                ON CONFLICT (source_id, minute, hex_code) DO NOTHING;
+            """)
+            summarized = cur.rowcount
+            cur.execute(f"DROP TABLE {name};")
+        conn.commit()
+        logging.info(f"Partition {name} rolled up into {summarized} minute summaries and dropped.")
+    except Exception as e:
+        logging.error(f"Failed to roll up partition {name}: {e}")
+        conn.rollback()
+
+
+# Funkcia na uplatnenie retenčnej politiky
+def apply_retention(conn, today=None):
+    today = today or date.today()
+    if raw_retention_days is not None:
+        cutoff = today - timedelta(days=raw_retention_days)
+        for day, name in sorted(daily_partitions(conn).items()):
+            if day < cutoff:
+                rollup_partition(conn, name)
+    if rollup_retention_days is not None:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM aircraft_track_minute WHERE minute < %s;",
+                        (today - timedelta(days=rollup_retention_days),))
+            logging.info(f"Deleted {cur.rowcount} expired minute summaries.")
+        conn.commit()
+
+
+# Hlavná funkcia údržby (indexy, partície dopredu a retencia)
+def maintain(conn, today=None):
+    ensure_indexes(conn)
+    repair_partition_bounds(conn)
+    ensure_partitions(conn, today)
+    apply_retention(conn, today)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Údržba partícií tabuľky aircraft_pointcloud")
+    parser.add_argument('--no-retention', action='store_true', help="Len vytvorí indexy a partície dopredu")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(**connection_parameters)
+    try:
+        if args.no_retention:
+            ensure_indexes(connection)
+            repair_partition_bounds(connection)
+            ensure_partitions(connection)
+        else:
+            maintain(connection)
+    finally:
+        connection.close()
@@ -0,0 +1,150 @@
+import sys  # Importuje sys pre cestu k modulom loggera
+from datetime import datetime, timedelta  # Importuje datetime a timedelta pre časy záznamov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import archive  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_archive.py
+Testy komprimovaného stĺpcového archívu (kódovanie, projekcia stĺpcov, časový filter a poškodené dávky)
+"""
+
+start_time = datetime(2024, 5, 1, 10, 0, 0)
+
+
+# Funkcia na vytvorenie riadkov jedného snímku (rovnaké dictionary ako snapshot_rows loggera)
+def snapshot_rows(second, count=3, source_id=1):
+    capture_time = start_time + timedelta(seconds=second)
+    rows = []
+    for index in range(count):
+        row = {'capture_time': capture_time, 'source_id': source_id, 'hex_code': f'a{index:05d}',
+               'lat_num': 48.0 + index * 0.01 + second * 1e-4, 'lon_num': 21.0 + index * 0.01,
+               'alt_baro_num': 1000 * index, 'on_ground': index == 0, 'flight': f'OK{index}'}
+        if index == 1:
+            row['gs_num'] = 250.5
+            row['extra'] = {'nic': 8}
+        rows.append(row)
+    return rows
+
+
+# Funkcia na zápis archívu, každý snímok ako samostatná dávka
+def write_archive(path, seconds):
+    with archive.ArchiveWriter(path, batch_rows=1) as writer:
+        for second in seconds:
+            writer.append(snapshot_rows(second))
+
+
+def test_encode_decode_round_trip(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0, 1])
+    assert list(archive.read_rows(path)) == snapshot_rows(0) + snapshot_rows(1)
+
+
+@pytest.mark.parametrize("kind, values", [
+    ('i8', [0, -1, 2 ** 40, 7]),
+    ('f8', [1.5, None, -0.25, 1e300]),
+    ('json', ['OK1', None, {'a': [1, 2]}, True]),
+])
+def test_column_encoding(kind, values):
+    assert archive.column_kind('column', values) == kind
+    assert archive.decode_column(kind, archive.encode_column(kind, values), len(values)) == values
+
+
+def test_projection_reads_only_requested_columns(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0])
+    batches = list(archive.read_batches(path, columns=['hex_code', 'missing_column']))
+    assert len(batches) == 1
+    assert set(batches[0]) == {'capture_time', 'hex_code', 'missing_column'}
+    assert batches[0]['hex_code'] == ['a00000', 'a00001', 'a00002']
+    assert batches[0]['missing_column'] == [None, None, None]
+
+
+def test_time_filter_is_half_open(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, range(10))
+    rows = list(archive.read_rows(path, start=start_time + timedelta(seconds=3),
+                                  end=start_time + timedelta(seconds=6)))
+    assert sorted({row['capture_time'] for row in rows}) == [start_time + timedelta(seconds=second)
+                                                             for second in (3, 4, 5)]
+
+
+def test_time_filter_inside_one_batch(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    with archive.ArchiveWriter(path, batch_rows=1000) as writer:
+        for second in range(5):
+            writer.append(snapshot_rows(second))
+    rows = list(archive.read_rows(path, start=start_time + timedelta(seconds=2)))
+    assert len(rows) == 9
+
+
+def test_read_snapshots_restores_aircraft(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0])
+    [snapshot] = archive.read_snapshots(path)
+    assert snapshot['now'] == start_time.timestamp()
+    assert snapshot['source_id'] == 1
+    assert snapshot['aircraft'][0] == {'hex': 'a00000', 'lat': 48.0, 'lon': 21.0, 'alt_baro': 'ground',
+                                       'flight': 'OK0'}
+    assert snapshot['aircraft'][1]['nic'] == 8
+
+
+def test_frame_offsets_allow_resuming(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, range(4))
+    offsets = [offset for offset, _ in archive.read_frames(path)]
+    resumed = [batch['capture_time'][0] for _, batch in archive.read_frames(path, offset=offsets[1])]
+    assert resumed == [start_time + timedelta(seconds=second) for second in (2, 3)]
+
+
+def test_writer_truncates_partial_frame_before_appending(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0, 1])
+    valid = path.stat().st_size
+    # Pád loggera počas zápisu zanechá na konci neúplnú dávku
+    with open(path, 'ab') as file:
+        file.write(archive.encode_batch(snapshot_rows(2))[:40])
+
+    write_archive(path, [3])
+    seconds = [batch['capture_time'][0] for batch in archive.read_batches(path)]
+    assert seconds == [start_time + timedelta(seconds=second) for second in (0, 1, 3)]
+    assert archive.valid_length(path) == path.stat().st_size > valid
+
+
+def test_reader_resyncs_after_corrupt_frame(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0])
+    # Neúplná dávka uprostred súboru (zapísaná pred opravou zapisovača)
+    with open(path, 'ab') as file:
+        file.write(archive.encode_batch(snapshot_rows(1))[:60])
+        file.write(archive.encode_batch(snapshot_rows(2)))
+        file.write(archive.encode_batch(snapshot_rows(3)))
+    seconds = [batch['capture_time'][0] for batch in archive.read_batches(path)]
+    assert seconds == [start_time + timedelta(seconds=second) for second in (0, 2, 3)]
+
+
+def test_reader_stops_at_partial_last_frame(tmp_path):
+    path = tmp_path / 'aircraft_10.agc'
+    write_archive(path, [0])
+    with open(path, 'ab') as file:
+        file.write(archive.encode_batch(snapshot_rows(1))[:-5])
+    assert len(list(archive.read_batches(path))) == 1
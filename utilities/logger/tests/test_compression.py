@@ -0,0 +1,130 @@
+import sys  # Importuje sys pre cestu k modulom loggera
+from datetime import datetime, timedelta  # Importuje datetime a timedelta pre časy záznamov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+pytest.importorskip("psycopg2")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import logger  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_compression.py
+Testy dead-band kompresie stopy (tolerancie, vynútené riadky a oblasti máp výskytu prevádzky)
+"""
+
+start_time = datetime(2024, 5, 1, 10, 0, 0)
+tolerances = {"position": 25, "altitude": 100, "speed": 5, "heading": 5, "keep_alive": 60}
+# Poloha stopy mimo predvolených oblastí máp výskytu prevádzky
+lat, lon = 50.0, 23.0
+
+
+# Každý test začína bez zapísaného stavu lietadiel
+@pytest.fixture(autouse=True)
+def empty_state(monkeypatch):
+    monkeypatch.setattr(logger, "last_stored", {})
+
+
+# Funkcia na vytvorenie riadku v tvare snapshot_rows
+def row(second, **fields):
+    values = {'capture_time': start_time + timedelta(seconds=second), 'source_id': 1, 'hex_code': 'a00001',
+              'lat_num': lat, 'lon_num': lon, 'alt_baro_num': 3000, 'gs_num': 200, 'track_num': 90,
+              'on_ground': False, 'flight': 'OK123'}
+    values.update(fields)
+    return values
+
+
+# Funkcia na kompresiu jedného riadku po prvom (referenčnom) riadku
+def kept_after_first(second, **fields):
+    assert logger.compress_rows([row(0)], tolerances, [])
+    return bool(logger.compress_rows([row(second, **fields)], tolerances, []))
+
+
+def test_first_row_is_kept():
+    assert logger.compress_rows([row(0)], tolerances, []) == [row(0)]
+
+
+def test_unchanged_row_is_dropped():
+    assert not kept_after_first(5)
+
+
+# Posun o 20 m a 30 m na sever (1 stupeň zemepisnej šírky je asi 111 195 m)
+@pytest.mark.parametrize("fields, kept", [
+    ({'lat_num': lat + 20 / 111195}, False),
+    ({'lat_num': lat + 30 / 111195}, True),
+    ({'alt_baro_num': 3090}, False),
+    ({'alt_baro_num': 3110}, True),
+    ({'alt_geom_num': 3000}, True),
+    ({'gs_num': 204}, False),
+    ({'gs_num': 206}, True),
+    ({'track_num': 94}, False),
+    ({'track_num': 96}, True),
+    ({'track_num': None}, True),
+    ({'lat_num': None, 'lon_num': None}, True),
+])
+def test_tolerances(fields, kept):
+    assert kept_after_first(5, **fields) == kept
+
+
+def test_heading_wraps_around_north():
+    assert logger.compress_rows([row(0, track_num=358)], tolerances, [])
+    assert not logger.compress_rows([row(5, track_num=2)], tolerances, [])
+    assert logger.compress_rows([row(10, track_num=5)], tolerances, [])
+
+
+@pytest.mark.parametrize("fields", [
+    {'on_ground': True}, {'flight': 'OK124'}, {'squawk': '7700'}, {'emergency': 'general'},
+])
+def test_state_change_is_forced_through(fields):
+    assert kept_after_first(5, **fields)
+
+
+def test_keep_alive_forces_keyframe():
+    assert not kept_after_first(tolerances["keep_alive"] - 1)
+    # Interval sa počíta od posledného zapísaného riadku, nie od posledného prijatého
+    assert logger.compress_rows([row(tolerances["keep_alive"])], tolerances, [])
+    assert not logger.compress_rows([row(tolerances["keep_alive"] + 1)], tolerances, [])
+
+
+def test_small_steps_accumulate_against_last_stored_row():
+    steps = [row(second, lat_num=lat + second * 10 / 111195) for second in range(6)]
+    kept = logger.compress_rows(steps, tolerances, [])
+    # Každý krok má 10 m, zapíše sa prvý riadok a potom každý tretí (30 m od posledného zapísaného)
+    assert [item['capture_time'].second for item in kept] == [0, 3]
+
+
+def test_aircraft_are_compressed_independently():
+    rows = [row(0), row(0, hex_code='a00002'), row(0, source_id=2)]
+    assert len(logger.compress_rows(rows, tolerances, [])) == 3
+    assert logger.compress_rows([row(5), row(5, hex_code='a00002', gs_num=250)], tolerances, []) == \
+        [row(5, hex_code='a00002', gs_num=250)]
+
+
+def test_heatmap_bounds_are_not_compressed():
+    # Oblasť končí 10 m severne od stopy
+    bounds = [[(lat - 0.5, lat + 10 / 111195), (lon - 0.5, lon + 0.5)]]
+    rows = [row(second) for second in range(5)]
+    assert logger.compress_rows(rows, tolerances, bounds) == rows
+    # Po opustení oblasti sa porovnáva s posledným riadkom z oblasti (posun 15 m je pod toleranciou)
+    assert not logger.compress_rows([row(5, lat_num=lat + 15 / 111195)], tolerances, bounds)
+    assert not logger.in_heatmap_bounds(row(0, lat_num=None), bounds)
+
+
+def test_default_bounds_cover_heatmap_area():
+    assert logger.in_heatmap_bounds(row(0, lat_num=48.6631, lon_num=21.2411), logger.compression_exclude_bounds)
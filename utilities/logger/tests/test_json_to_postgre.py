@@ -0,0 +1,213 @@
+import json  # Importuje json pre zápis JSON záloh
+import re  # Importuje re pre čítanie stĺpcov príkazu COPY
+import sys  # Importuje sys pre cestu k modulom loggera
+from datetime import datetime  # Importuje datetime pre časy snímkov
+from pathlib import Path  # Importuje Path pre prácu s cestami k súborom
+
+import pytest  # Importuje pytest pre testy
+
+psycopg2 = pytest.importorskip("psycopg2")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import archive  # noqa: E402
+import json_to_postgre  # noqa: E402
+from logger import snapshot_rows  # noqa: E402
+
+"""
+Technická univerzita v Košiciach
+Fakulta elektrotechniky a informatiky
+Katedra kybernetiky a umelej inteligencie
+
+Zvyšovanie bezpečnosti integrácie dronov do leteckého priestoru - Bakalárska práca
+
+Autor:
+Štefan Kando
+
+Vedúci práce:
+doc. Ing. Peter Papcun, PhD.
+
+2024
+"""
+
+"""
+Súbor: test_json_to_postgre.py
+Testy prerušeného a obnoveného presunu záloh (backfill_checkpoints, pozície v bajtoch, stratené spojenie)
+"""
+
+snapshot_count = 10
+aircraft_count = 4
+
+
+# Testovacia databáza: potvrdené riadky (aj duplicitné) a pozície súborov, pád po danom počte dávok
+class FakeDatabase:
+    def __init__(self, crash_after=None):
+        self.rows = []
+        self.checkpoints = {}
+        self.batches = 0
+        self.crash_after = crash_after
+        self.connections = 0
+
+    def connect(self, **parameters):
+        self.connections += 1
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.closed = 0
+        self.dead = False
+        self.staged = []
+        self.pending_rows = []
+        self.pending_checkpoints = {}
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        if self.dead:
+            raise psycopg2.InterfaceError("connection already closed")
+        self.database.rows.extend(self.pending_rows)
+        self.database.checkpoints.update(self.pending_checkpoints)
+        if self.pending_checkpoints:
+            self.database.batches += 1
+        self.rollback()
+
+    def rollback(self):
+        if self.dead:
+            raise psycopg2.InterfaceError("connection already closed")
+        self.staged, self.pending_rows, self.pending_checkpoints = [], [], {}
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, query, params=None):
+        database = self.conn.database
+        if "INSERT INTO aircraft_pointcloud_" in query:
+            if database.crash_after is not None and database.batches >= database.crash_after:
+                # Výpadok databázy uprostred dávky, spojenie ostane mŕtve
+                database.crash_after = None
+                self.conn.dead = True
+                raise psycopg2.OperationalError("server closed the connection unexpectedly")
+            self.conn.pending_rows.extend(self.conn.staged)
+            self.rowcount = len(self.conn.staged)
+            self.conn.staged = []
+        elif "INSERT INTO backfill_checkpoints" in query:
+            self.conn.pending_checkpoints[params[0]] = params[1]
+        elif "SELECT file_path, byte_offset" in query:
+            self.result = list(database.checkpoints.items())
+
+    def copy_expert(self, query, buffer):
+        columns = [column.strip() for column in re.search(r'\(([^)]*)\)', query).group(1).split(',')]
+        for line in buffer.getvalue().splitlines():
+            values = dict(zip(columns, line.split('\t')))
+            self.conn.staged.append((values['source_id'], values['capture_time'], values['hex_code']))
+
+    def fetchall(self):
+        return self.result
+
+
+# Pool bez procesov (pracovníci bežia postupne v tomto procese a zdieľajú testovaciu databázu)
+class SerialPool:
+    def __init__(self, processes=None, initializer=None):
+        if initializer is not None:
+            initializer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def imap_unordered(self, function, tasks):
+        return map(function, tasks)
+
+
+# Funkcia na vytvorenie snímku aircraft.json
+def snapshot(index, source_id):
+    return {"now": datetime(2024, 5, 1, 10, 0, index).timestamp(), "source_id": source_id, "aircraft": [
+        {"hex": f"a{number:05d}", "lat": 48.5 + index * 0.001, "lon": 21.2, "alt_baro": 3000 + number}
+        for number in range(aircraft_count)]}
+
+
+# Funkcia na zápis záloh v oboch formátoch, vráti kľúče všetkých riadkov, ktoré sa majú presunúť
+def write_backups(base_dir):
+    day_dir = base_dir / '20240501'
+    day_dir.mkdir()
+    expected = []
+    with open(day_dir / 'aircraft_10.json', 'w') as file:
+        for index in range(snapshot_count):
+            data = snapshot(index, source_id=1)
+            file.write(json.dumps(data) + '\n')
+            expected += [(1, row['capture_time'], row['hex_code']) for row in snapshot_rows(data, 1)]
+        # Neúplný posledný riadok (logger práve zapisuje) sa nespracuje
+        file.write('{"now": 1714557600, "aircr')
+    with archive.ArchiveWriter(day_dir / f'aircraft_11{archive.archive_suffix}', batch_rows=aircraft_count) as writer:
+        for index in range(snapshot_count):
+            rows = snapshot_rows(snapshot(index, source_id=2), 2)
+            writer.append(rows)
+            expected += [(2, row['capture_time'], row['hex_code']) for row in rows]
+    return sorted((str(source_id), str(capture_time), hex_code) for source_id, capture_time, hex_code in expected)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(json_to_postgre.psycopg2, "connect", database.connect)
+    monkeypatch.setattr(json_to_postgre, "Pool", SerialPool)
+    monkeypatch.setattr(json_to_postgre, "worker_conn", None)
+    monkeypatch.setattr(json_to_postgre, "worker_partitions", set())
+    # Dávka má tri snímky, každý súbor sa zapíše v štyroch transakciách
+    monkeypatch.setattr(json_to_postgre, "batch_rows_limit", 3 * aircraft_count)
+    return database
+
+
+def test_full_run_inserts_every_row_once(tmp_path, database):
+    expected = write_backups(tmp_path)
+    json_to_postgre.process_directory(tmp_path)
+    assert sorted(database.rows) == expected
+
+    # Druhé spustenie nič nezapíše, JSON s neúplným riadkom sa len znovu otvorí od uloženej pozície
+    json_to_postgre.process_directory(tmp_path)
+    assert sorted(database.rows) == expected
+
+
+@pytest.mark.parametrize("crash_after", [0, 1, 3, 5, 7])
+def test_resume_after_interruption(tmp_path, database, crash_after):
+    expected = write_backups(tmp_path)
+    database.crash_after = crash_after
+    json_to_postgre.process_directory(tmp_path)
+    assert len(database.rows) < len(expected)
+
+    json_to_postgre.process_directory(tmp_path)
+    assert sorted(database.rows) == expected
+
+
+@pytest.mark.parametrize("suffix", ['.json', archive.archive_suffix])
+def test_checkpoint_is_committed_with_rows(tmp_path, database, suffix):
+    write_backups(tmp_path)
+    path = next(tmp_path.rglob(f'aircraft_*{suffix}'))
+    database.crash_after = 2
+    assert json_to_postgre.process_file((path, 0)) == (path, None)
+    # Mŕtve spojenie sa zahodí a ďalší súbor si otvorí nové
+    assert json_to_postgre.worker_conn is None
+    connections = database.connections
+
+    # Pozícia zodpovedá presne potvrdeným riadkom (dve dávky po troch snímkoch)
+    offset = database.checkpoints[str(path)]
+    assert len(database.rows) == 2 * 3 * aircraft_count
+    assert json_to_postgre.process_file((path, offset)) == (path, (snapshot_count - 6) * aircraft_count)
+    assert len(set(database.rows)) == len(database.rows) == snapshot_count * aircraft_count
+    assert database.connections == connections + 1
@@ -34,10 +34,81 @@ CREATE TABLE sources (
 );
 
 -- Vytvorenie tabuľky aircraft_pointcloud
+-- Známe polia aircraft.json majú pevné typované stĺpce (číselné polia ako <kľúč>_num),
+-- neznáme polia sa ukladajú do stĺpca extra (JSONB), denné partície vopred vytvára utilities/logger/partition_manager.py
+-- Existujúcu databázu so stĺpcami TEXT prevedie skript utilities/logger/migrate_typed_schema.py
 CREATE TABLE aircraft_pointcloud (
     source_id INTEGER,
     capture_time TIMESTAMP WITHOUT TIME ZONE,
     hex_code VARCHAR,
+    type TEXT,
+    flight TEXT,
+    squawk TEXT,
+    emergency TEXT,
+    category TEXT,
+    sil_type TEXT,
+    nav_modes TEXT[],
+    mlat TEXT[],
+    tisb TEXT[],
+    on_ground BOOLEAN,
+    lat_num DOUBLE PRECISION,
+    lon_num DOUBLE PRECISION,
+    alt_baro_num REAL,
+    alt_geom_num REAL,
+    baro_rate_num REAL,
+    geom_rate_num REAL,
+    gs_num REAL,
+    ias_num REAL,
+    tas_num REAL,
+    mach_num REAL,
+    track_num REAL,
+    track_rate_num REAL,
+    roll_num REAL,
+    mag_heading_num REAL,
+    true_heading_num REAL,
+    nav_qnh_num REAL,
+    nav_altitude_mcp_num REAL,
+    nav_altitude_fms_num REAL,
+    nav_heading_num REAL,
+    version_num REAL,
+    nic_num REAL,
+    rc_num REAL,
+    nic_baro_num REAL,
+    nac_p_num REAL,
+    nac_v_num REAL,
+    sil_num REAL,
+    gva_num REAL,
+    sda_num REAL,
+    messages_num REAL,
+    seen_num REAL,
+    seen_pos_num REAL,
+    rssi_num REAL,
+    extra JSONB,
     PRIMARY KEY (source_id, capture_time, hex_code),
     FOREIGN KEY (source_id) REFERENCES sources(source_id)
+) PARTITION BY RANGE (capture_time);
+
+-- Indexy pre časové a priestorové podmienky (vytvoria sa aj na všetkých partíciách)
+CREATE INDEX aircraft_pointcloud_capture_time_brin ON aircraft_pointcloud USING BRIN (capture_time);
+CREATE INDEX aircraft_pointcloud_position_idx ON aircraft_pointcloud (lat_num, lon_num);
+
+-- Vytvorenie tabuľky aircraft_track_minute
+-- Minútové súhrny stôp z partícií starších ako retencia úplných dát (plní partition_manager.py)
+-- Poloha je priemer za minútu, preto sa súhrny nepoužívajú pri výpočte heatmáp
+CREATE TABLE aircraft_track_minute (
+    source_id INTEGER,
+    minute TIMESTAMP WITHOUT TIME ZONE,
+    hex_code VARCHAR,
+    samples INTEGER,
+    flight TEXT,
+    squawk TEXT,
+    on_ground BOOLEAN,
+    lat_num DOUBLE PRECISION,
+    lon_num DOUBLE PRECISION,
+    alt_baro_num REAL,
+    alt_geom_num REAL,
+    gs_num REAL,
+    track_num REAL,
+    PRIMARY KEY (source_id, minute, hex_code)
 );
+CREATE INDEX aircraft_track_minute_minute_brin ON aircraft_track_minute USING BRIN (minute);